@@ -0,0 +1,470 @@
+# ast_binario.py
+"""
+Formato binário compacto da AST (ast_nodes), para guardar uma AST em disco
+e retomar a compilação na análise semântica ou na geração de código:
+
+    with open("programa.tsast", "wb") as arquivo:
+        dump(ast, arquivo)
+    with open("programa.tsast", "rb") as arquivo:
+        ast = load(arquivo)
+    GeradorCodigoVisitor().gerar_codigo(ast)
+
+Estrutura do arquivo:
+
+    cabeçalho   MAGICO, VERSAO (varint) e a tabela de tags: o número de
+                classes e, para cada uma, o nome e os campos (textos varint)
+    corpo       os valores em pós-ordem, uma palavra de 32 bits (little
+                endian) para cada um: a operação no byte baixo e o argumento
+                nos 24 bits altos. Um nó vem depois dos valores dos seus
+                campos e tem a linha da última palavra LINHA antes dele
+    constantes  os textos, inteiros grandes, reais e pares (tipo, valor) de
+                Literal usados pelo corpo, cada um uma vez, na ordem do
+                primeiro uso
+    total       o número de palavras do corpo (4 bytes, little endian)
+
+Os nós mais comuns (Name, Literal, BinOp, Call e Assign) levam no argumento
+o índice da constante do seu campo escalar (nome, operador, comando ou o par
+de Literal). Inteiros pequenos vão no próprio argumento; nas constantes,
+inteiros são varints zigzag, textos são UTF-8 precedidos do tamanho e reais
+têm 8 bytes.
+
+dump escreve o corpo em blocos, à medida que percorre a árvore, e as
+constantes no fim. load lê o arquivo inteiro (bem menor que a AST que ele
+descreve), converte o corpo em inteiros de uma vez (array) e decodifica cada
+palavra numa volta do laço. Os dois usam pilhas explícitas (árvores profundas
+não esbarram no limite de recursão).
+"""
+import sys
+import struct
+from array import array
+from operator import attrgetter
+
+import ast_nodes
+from utils import pausar_coletor
+from ast_nodes import No, Assign, Call, BinOp, Name, Literal
+
+MAGICO = b"TSAST"
+VERSAO = 2
+
+# Operações do corpo (byte baixo de cada palavra) e o seu argumento
+NONE = 0
+FALSO = 1
+VERDADEIRO = 2
+INTEIRO = 3 # o próprio valor, zigzag
+CONSTANTE = 4 # índice na tabela de constantes
+LISTA = 5 # número de itens, que são os últimos valores lidos
+LINHA = 6 # linha dos nós seguintes
+NO = 16 # NO + índice da tag
+NO_CURTO = 64 # NO_CURTO + índice da tag; índice da constante do campo escalar
+
+# Tipos das entradas da tabela de constantes (um byte antes de cada uma)
+TEXTO = 0
+INTEIRO_LONGO = 1
+REAL = 2
+LOGICO = 3 # um byte, 0 ou 1
+PAR_LITERAL = 4 # texto e outra constante
+
+MAX_TAGS = NO_CURTO - NO
+MAX_ARGUMENTO = 1 << 24
+BLOCO = 1 << 14
+
+_DOUBLE = struct.Struct("<d")
+_TOTAL = struct.Struct("<I")
+_TROCAR_BYTES = sys.byteorder == "big"
+
+# Classes de nó conhecidas, na ordem da tabela de tags
+CLASSES = tuple(
+    classe for classe in vars(ast_nodes).values()
+    if isinstance(classe, type) and issubclass(classe, No) and classe is not No
+)
+
+
+def _varint(n, saida):
+    while n > 0x7F:
+        saida.append((n & 0x7F) | 0x80)
+        n >>= 7
+    saida.append(n)
+
+
+def _texto(texto, saida):
+    dados = texto.encode("utf-8")
+    _varint(len(dados), saida)
+    saida += dados
+
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def _argumento(n):
+    """n, se cabe no argumento (sem sinal) de uma palavra do corpo."""
+    if not 0 <= n < MAX_ARGUMENTO:
+        raise ValueError(f"Valor {n} fora do intervalo do formato binário da AST")
+    return n
+
+
+def _palavras(lista):
+    """Os inteiros de lista como palavras de 32 bits little endian."""
+    palavras = array("I", lista)
+    if _TROCAR_BYTES:
+        palavras.byteswap()
+    return palavras.tobytes()
+
+
+def dump(no, arquivo):
+    """Escreve a AST `no` em arquivo (aberto em modo binário)."""
+    with pausar_coletor():
+        _dump(no, arquivo)
+
+
+def _dump(no, arquivo):
+    cabecalho = bytearray(MAGICO)
+    _varint(VERSAO, cabecalho)
+    _varint(len(CLASSES), cabecalho)
+    tags = {}
+    for indice, classe in enumerate(CLASSES):
+        if len(classe.campos) == 1:
+            ler_campos = (lambda campo: lambda no: (getattr(no, campo),))(classe.campos[0])
+        else:
+            ler_campos = attrgetter(*classe.campos)
+        tags[classe] = (NO + indice, ler_campos)
+        _texto(classe.__name__, cabecalho)
+        _varint(len(classe.campos), cabecalho)
+        for campo in classe.campos:
+            _texto(campo, cabecalho)
+    arquivo.write(cabecalho)
+
+    # Índice de cada constante já vista. As chaves separam valores iguais
+    # de tipos diferentes (1, 1.0 e True) e reais de mesmo valor (0.0 e -0.0).
+    indices = {}
+    tabela = bytearray()
+
+    def constante(valor):
+        tipo = type(valor)
+        chave = valor if tipo is str else (tipo, _DOUBLE.pack(valor) if tipo is float else valor)
+        indice = indices.get(chave)
+        if indice is None:
+            _constante(valor, tabela)
+            indice = indices[chave] = _argumento(len(indices))
+        return indice
+
+    def par_literal(kind, valor):
+        """Índice do par (kind, valor) de um Literal, ou None se o par não cabe nas constantes."""
+        tipo = type(valor)
+        if type(kind) is not str or tipo not in (str, int, float, bool):
+            return None
+        chave = (kind, tipo, _DOUBLE.pack(valor) if tipo is float else valor)
+        indice = indices.get(chave)
+        if indice is None:
+            tabela.append(PAR_LITERAL)
+            _texto(kind, tabela)
+            _constante(valor, tabela)
+            indice = indices[chave] = _argumento(len(indices))
+        return indice
+
+    def escalar(valor):
+        """Palavra de um valor que não é nó nem lista."""
+        tipo = type(valor)
+        if valor is None:
+            return NONE
+        if tipo is bool:
+            return VERDADEIRO if valor else FALSO
+        if tipo is int and -MAX_ARGUMENTO // 2 <= valor < MAX_ARGUMENTO // 2:
+            return INTEIRO | _zigzag(valor) << 8
+        return CONSTANTE | constante(valor) << 8
+
+    curto = NO_CURTO - NO
+    op_name, op_literal = tags[Name][0] + curto, tags[Literal][0] + curto
+    op_binop, op_call, op_assign = tags[BinOp][0] + curto, tags[Call][0] + curto, tags[Assign][0] + curto
+    palavras = []
+    emitir = palavras.append
+    total = 0
+    linha_anterior = 0
+    # A pilha guarda os valores ainda não escritos e, como inteiros, as
+    # palavras prontas. Um nó cujos campos já foram empilhados vira a sua
+    # palavra (operação a partir de NO), com a linha em linhas.
+    pendentes = [no]
+    empilhar, desempilhar = pendentes.append, pendentes.pop
+    linhas = []
+    guardar_linha = linhas.append
+    while pendentes:
+        valor = desempilhar()
+        tipo = type(valor)
+        if tipo is int:
+            if valor & 0xFF < NO:
+                emitir(valor)
+                continue
+            linha = linhas.pop()
+            palavra = valor
+        elif tipo is Name:
+            # Atalhos para os nós mais comuns
+            linha = valor.linha
+            indice = indices.get(valor.name)
+            palavra = op_name | (constante(valor.name) if indice is None else indice) << 8
+        elif tipo is BinOp:
+            indice = indices.get(valor.op)
+            empilhar(op_binop | (constante(valor.op) if indice is None else indice) << 8)
+            guardar_linha(valor.linha)
+            empilhar(valor.right)
+            empilhar(valor.left)
+            continue
+        elif tipo is Literal:
+            linha = valor.linha
+            constante_literal = valor.value
+            tipo = type(constante_literal)
+            # Reais vão por par_literal: 0.0 e -0.0 seriam a mesma chave
+            indice = None if tipo is float else indices.get((valor.kind, tipo, constante_literal))
+            if indice is None:
+                indice = par_literal(valor.kind, constante_literal)
+                if indice is None:
+                    empilhar(op_literal - curto)
+                    guardar_linha(linha)
+                    empilhar(escalar(constante_literal))
+                    empilhar(escalar(valor.kind))
+                    continue
+            palavra = op_literal | indice << 8
+        elif tipo is Call:
+            indice = indices.get(valor.cmd)
+            empilhar(op_call | (constante(valor.cmd) if indice is None else indice) << 8)
+            guardar_linha(valor.linha)
+            # A palavra LISTA é escrita depois dos itens
+            empilhar(LISTA | _argumento(len(valor.args)) << 8)
+            pendentes += reversed(valor.args)
+            continue
+        elif tipo is Assign:
+            indice = indices.get(valor.name)
+            empilhar(op_assign | (constante(valor.name) if indice is None else indice) << 8)
+            guardar_linha(valor.linha)
+            empilhar(valor.value)
+            continue
+        elif tipo is list:
+            empilhar(LISTA | _argumento(len(valor)) << 8)
+            pendentes += reversed(valor)
+            continue
+        elif tipo in tags:
+            operacao, ler_campos = tags[tipo]
+            empilhar(operacao)
+            guardar_linha(valor.linha)
+            for campo in reversed(ler_campos(valor)):
+                # Escalares entram na pilha já como palavras
+                empilhar(campo if type(campo) is list or isinstance(campo, No) else escalar(campo))
+            continue
+        else:
+            # Como em para_dict, listas da AST só guardam nós
+            raise TypeError(f"Valor sem representação no formato binário da AST: {valor!r}")
+
+        if linha != linha_anterior:
+            emitir(LINHA | _argumento(linha) << 8)
+            linha_anterior = linha
+            if len(palavras) >= BLOCO:
+                arquivo.write(_palavras(palavras))
+                total += len(palavras)
+                palavras.clear()
+        emitir(palavra)
+    arquivo.write(_palavras(palavras))
+    total += len(palavras)
+    arquivo.write(tabela)
+    arquivo.write(_TOTAL.pack(total))
+
+
+def _constante(valor, saida):
+    """Escreve uma entrada da tabela de constantes (texto, inteiro, real ou lógico)."""
+    tipo = type(valor)
+    if tipo is str:
+        saida.append(TEXTO)
+        _texto(valor, saida)
+    elif tipo is int:
+        saida.append(INTEIRO_LONGO)
+        _varint(_zigzag(valor), saida)
+    elif tipo is float:
+        saida.append(REAL)
+        saida += _DOUBLE.pack(valor)
+    elif tipo is bool:
+        saida.append(LOGICO)
+        saida.append(valor)
+    else:
+        raise TypeError(f"Valor sem representação no formato binário da AST: {valor!r}")
+
+
+def dumps(no):
+    """A AST `no` no formato binário, como bytes."""
+    saida = _Buffer()
+    dump(no, saida)
+    return bytes(saida)
+
+
+class _Buffer(bytearray):
+    def write(self, dados):
+        self += dados
+
+
+def _ler_varint(dados, pos):
+    """Varint que começa em dados[pos]; devolve (valor, posição seguinte)."""
+    n = deslocamento = 0
+    while True:
+        byte = dados[pos]
+        pos += 1
+        n |= (byte & 0x7F) << deslocamento
+        if byte < 0x80:
+            return n, pos
+        deslocamento += 7
+
+
+def _ler_texto(dados, pos):
+    """Texto (tamanho varint e UTF-8) que começa em dados[pos]; devolve (texto, posição seguinte)."""
+    tamanho, pos = _ler_varint(dados, pos)
+    fim = pos + tamanho
+    if fim > len(dados):
+        raise IndexError
+    return str(dados[pos:fim], "utf-8"), fim
+
+
+def _ler_constante(dados, pos):
+    """Entrada da tabela de constantes que começa em dados[pos]; devolve (valor, posição seguinte)."""
+    tipo = dados[pos]
+    pos += 1
+    if tipo == TEXTO:
+        return _ler_texto(dados, pos)
+    if tipo == INTEIRO_LONGO:
+        n, pos = _ler_varint(dados, pos)
+        return -((n + 1) >> 1) if n & 1 else n >> 1, pos
+    if tipo == REAL:
+        if pos + 8 > len(dados):
+            raise IndexError
+        return _DOUBLE.unpack_from(dados, pos)[0], pos + 8
+    if tipo == LOGICO:
+        return dados[pos] == 1, pos + 1
+    if tipo == PAR_LITERAL:
+        kind, pos = _ler_texto(dados, pos)
+        valor, pos = _ler_constante(dados, pos)
+        return (kind, valor), pos
+    raise ValueError(f"Constante de tipo {tipo} inválida na AST binária")
+
+
+def load(arquivo):
+    """
+    Lê uma AST escrita por dump (arquivo aberto em modo binário). Lança
+    ValueError se o conteúdo não estiver no formato, for de outra versão ou
+    usar nós diferentes dos de ast_nodes.
+    """
+    partes = []
+    while True:
+        bloco = arquivo.read(BLOCO)
+        if not bloco:
+            break
+        partes.append(bloco)
+    return loads(b"".join(partes))
+
+
+def loads(dados):
+    """AST a partir de bytes (ou outro objeto com o protocolo de buffer) no formato binário."""
+    # A AST não tem ciclos: o coletor só atrasaria a criação dos nós
+    with pausar_coletor():
+        try:
+            return _loads(bytes(dados))
+        except (IndexError, TypeError, UnicodeDecodeError, struct.error):
+            # Fim inesperado dos dados, constante desconhecida ou nó sem os seus campos
+            raise ValueError("AST binária truncada ou corrompida") from None
+
+
+def _loads(dados):
+    if dados[:len(MAGICO)] != MAGICO:
+        raise ValueError("O arquivo não contém uma AST binária do TurtleScript")
+    versao, pos = _ler_varint(dados, len(MAGICO))
+    if versao != VERSAO:
+        raise ValueError(f"Versão {versao} da AST binária não suportada (esperada: {VERSAO})")
+
+    por_nome = {classe.__name__: classe for classe in CLASSES}
+    tags = []
+    total_tags, pos = _ler_varint(dados, pos)
+    if total_tags > MAX_TAGS:
+        raise ValueError("Tabela de tags da AST binária grande demais")
+    for _ in range(total_tags):
+        nome, pos = _ler_texto(dados, pos)
+        n, pos = _ler_varint(dados, pos)
+        campos = []
+        for _ in range(n):
+            campo, pos = _ler_texto(dados, pos)
+            campos.append(campo)
+        classe = por_nome.get(nome)
+        if classe is None or classe.campos != tuple(campos):
+            raise ValueError(f"Nó '{nome}' da AST binária não corresponde a ast_nodes")
+        tags.append((classe, len(campos)))
+
+    fim_constantes = len(dados) - _TOTAL.size
+    (total,) = _TOTAL.unpack_from(dados, fim_constantes)
+    fim_corpo = pos + 4 * total
+    if fim_corpo > fim_constantes:
+        raise IndexError
+    palavras = array("I")
+    palavras.frombytes(dados[pos:fim_corpo])
+    if _TROCAR_BYTES:
+        palavras.byteswap()
+    constantes = []
+    pos = fim_corpo
+    while pos < fim_constantes:
+        valor, pos = _ler_constante(dados, pos)
+        constantes.append(valor)
+
+    # Operações dos nós curtos (ver _dump)
+    operacoes = {classe: NO_CURTO + indice for indice, (classe, _) in enumerate(tags)}
+    op_name, op_literal, op_binop = operacoes.get(Name), operacoes.get(Literal), operacoes.get(BinOp)
+    op_call, op_assign = operacoes.get(Call), operacoes.get(Assign)
+    fim_tags = NO + total_tags
+
+    valores = []
+    anexar = valores.append
+    desempilhar = valores.pop
+    linha = 0
+    for palavra in palavras:
+        operacao = palavra & 0xFF
+        if operacao >= NO_CURTO:
+            constante = constantes[palavra >> 8]
+            if operacao == op_name:
+                anexar(Name(constante, linha))
+            elif operacao == op_binop:
+                direita = desempilhar()
+                valores[-1] = BinOp(constante, valores[-1], direita, linha)
+            elif operacao == op_literal:
+                kind, valor = constante
+                anexar(Literal(kind, valor, linha))
+            elif operacao == op_call:
+                valores[-1] = Call(constante, valores[-1], linha)
+            elif operacao == op_assign:
+                valores[-1] = Assign(constante, valores[-1], linha)
+            else:
+                raise ValueError(f"Operação {operacao} inválida na AST binária")
+        elif operacao == LISTA:
+            n = palavra >> 8
+            if n > len(valores):
+                raise IndexError
+            itens = valores[len(valores) - n:]
+            del valores[len(valores) - n:]
+            anexar(itens)
+        elif operacao == LINHA:
+            linha = palavra >> 8
+        elif operacao == CONSTANTE:
+            anexar(constantes[palavra >> 8])
+        elif operacao == INTEIRO:
+            n = palavra >> 8
+            anexar(-((n + 1) >> 1) if n & 1 else n >> 1)
+        elif NO <= operacao < fim_tags:
+            classe, n = tags[operacao - NO]
+            if n > len(valores):
+                raise IndexError
+            if n == 0:
+                anexar(classe(linha))
+            else:
+                campos = valores[-n:]
+                del valores[-n:]
+                anexar(classe(*campos, linha))
+        elif operacao == NONE:
+            anexar(None)
+        elif operacao == FALSO or operacao == VERDADEIRO:
+            anexar(operacao == VERDADEIRO)
+        else:
+            raise ValueError(f"Operação {operacao} inválida na AST binária")
+
+    if len(valores) != 1 or not isinstance(valores[0], No):
+        raise ValueError("AST binária inválida: o conteúdo não é um único nó")
+    return valores[0]
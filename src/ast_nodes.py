@@ -0,0 +1,209 @@
+# ast_nodes.py
+"""
+Nós da árvore sintática abstrata (AST) do TurtleScript.
+
+Diferente da árvore de derivação devolvida por ASTParser.parse_with_ast
+(dicionários com um nó para cada símbolo da gramática, inclusive ';',
+CMDS, REL', ADD' e produções vazias), a AST guarda apenas o que importa
+para as fases seguintes: listas de comandos são listas Python e cadeias de
+expressões são árvores binárias. As classes usam __slots__ para ocupar o
+mínimo de memória.
+"""
+
+
+class No:
+    """Classe base dos nós da AST. `campos` lista os atributos do nó."""
+    __slots__ = ("linha",)
+    campos = ()
+
+    def iter_filhos(self):
+        """Gera os nós filhos, na ordem dos campos (listas são percorridas)."""
+        for campo in self.campos:
+            valor = getattr(self, campo)
+            if isinstance(valor, No):
+                yield valor
+            elif isinstance(valor, list):
+                for item in valor:
+                    if isinstance(item, No):
+                        yield item
+
+    def __eq__(self, outro):
+        if type(self) is not type(outro):
+            return NotImplemented
+        return self.linha == outro.linha and all(
+            getattr(self, campo) == getattr(outro, campo) for campo in self.campos)
+
+    __hash__ = None
+
+    def __repr__(self):
+        argumentos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.campos)
+        return f"{type(self).__name__}({argumentos}, linha={self.linha})"
+
+
+# -- Comandos --
+
+class Program(No):
+    """Programa completo: a lista de comandos entre 'inicio' e 'fim'."""
+    __slots__ = ("body",)
+    campos = ("body",)
+
+    def __init__(self, body, linha=1):
+        self.body = body
+        self.linha = linha
+
+
+class VarDecl(No):
+    """var <tipo> : <nome> ;"""
+    __slots__ = ("var_type", "name")
+    campos = ("var_type", "name")
+
+    def __init__(self, var_type, name, linha):
+        self.var_type = var_type
+        self.name = name
+        self.linha = linha
+
+
+class Assign(No):
+    """<nome> = <expressão> ;"""
+    __slots__ = ("name", "value")
+    campos = ("name", "value")
+
+    def __init__(self, name, value, linha):
+        self.name = name
+        self.value = value
+        self.linha = linha
+
+
+class Repeat(No):
+    """repita <expressão> vezes <comandos> fim_repita ;"""
+    __slots__ = ("count", "body")
+    campos = ("count", "body")
+
+    def __init__(self, count, body, linha):
+        self.count = count
+        self.body = body
+        self.linha = linha
+
+
+class While(No):
+    """enquanto <condição> faca <comandos> fim_enquanto ;"""
+    __slots__ = ("cond", "body")
+    campos = ("cond", "body")
+
+    def __init__(self, cond, body, linha):
+        self.cond = cond
+        self.body = body
+        self.linha = linha
+
+
+class If(No):
+    """se <condição> entao <comandos> [senao <comandos>] fim_se ; (orelse é None sem senao)"""
+    __slots__ = ("cond", "then", "orelse")
+    campos = ("cond", "then", "orelse")
+
+    def __init__(self, cond, then, orelse, linha):
+        self.cond = cond
+        self.then = then
+        self.orelse = orelse
+        self.linha = linha
+
+
+class Call(No):
+    """Comando da tartaruga: cmd é a palavra-chave (ex.: 'avancar') e args as expressões."""
+    __slots__ = ("cmd", "args")
+    campos = ("cmd", "args")
+
+    def __init__(self, cmd, args, linha):
+        self.cmd = cmd
+        self.args = args
+        self.linha = linha
+
+
+# -- Expressões --
+#
+# Expressões guardam também `tipo`, o tipo TurtleScript do resultado,
+# preenchido pela análise semântica (None antes dela). tipo não faz parte
+# de `campos`: não entra na comparação nem nas serializações da AST.
+
+class BinOp(No):
+    """Operação binária (relacional, aditiva ou multiplicativa)."""
+    __slots__ = ("op", "left", "right", "tipo")
+    campos = ("op", "left", "right")
+
+    def __init__(self, op, left, right, linha):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.linha = linha
+        self.tipo = None
+
+
+class Name(No):
+    """Uso de uma variável."""
+    __slots__ = ("name", "tipo")
+    campos = ("name",)
+
+    def __init__(self, name, linha):
+        self.name = name
+        self.linha = linha
+        self.tipo = None
+
+
+class Literal(No):
+    """Constante; kind é o tipo TurtleScript ('inteiro', 'real', 'texto' ou 'logico')."""
+    __slots__ = ("kind", "value", "tipo")
+    campos = ("kind", "value")
+
+    def __init__(self, kind, value, linha):
+        self.kind = kind
+        self.value = value
+        self.linha = linha
+        self.tipo = kind
+
+
+# Precedência dos operadores binários (maior liga mais forte).
+PRECEDENCIA = {
+    "==": 1, "!=": 1, ">": 1, "<": 1, ">=": 1, "<=": 1,
+    "+": 2, "-": 2,
+    "*": 3, "/": 3,
+}
+
+OPERADORES_RELACIONAIS = frozenset(op for op, p in PRECEDENCIA.items() if p == 1)
+
+
+def contar_nos(no):
+    """Número de nós da árvore (AST ou árvore de derivação em dicionários)."""
+    total = 0
+    pendentes = [no]
+    while pendentes:
+        atual = pendentes.pop()
+        total += 1
+        if isinstance(atual, dict):
+            pendentes.extend(atual.get("filhos", ()))
+        else:
+            pendentes.extend(atual.iter_filhos())
+    return total
+
+
+def para_dict(no):
+    """
+    Representação da AST em dicionários e listas (serializável em JSON), com
+    a classe do nó em "tag". Construída com uma pilha explícita.
+    """
+    raiz = {}
+    pendentes = [(no, raiz)]
+    while pendentes:
+        atual, destino = pendentes.pop()
+        destino["tag"] = type(atual).__name__
+        destino["linha"] = atual.linha
+        for campo in atual.campos:
+            valor = getattr(atual, campo)
+            if isinstance(valor, No):
+                destino[campo] = {}
+                pendentes.append((valor, destino[campo]))
+            elif isinstance(valor, list):
+                destino[campo] = [{} for _ in valor]
+                pendentes.extend(zip(valor, destino[campo]))
+            else:
+                destino[campo] = valor
+    return raiz
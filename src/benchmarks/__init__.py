@@ -0,0 +1,8 @@
+"""
+Benchmarks do compilador TurtleScript.
+
+Execute a partir de src/, por exemplo:
+
+    python -m benchmarks.bench_first_follow
+    python -m benchmarks.bench_fases --verificar
+"""
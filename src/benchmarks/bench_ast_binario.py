@@ -0,0 +1,66 @@
+"""
+Compara o formato binário da AST (ast_binario) com o JSON indentado usado
+na saída de depuração (json.dumps(para_dict(ast), indent=2)): tamanho,
+tempo de escrita e tempo de leitura, em programas gerados de vários tamanhos.
+A leitura do JSON conta só json.loads (não há conversão de volta para AST).
+
+Metas, verificadas no total dos tamanhos: o binário é ao menos 10 vezes
+menor e 10 vezes mais rápido de escrever que o JSON, e mais rápido de ler
+(o JSON lido ainda não é uma AST; a AST binária lida já é).
+
+    python -m benchmarks.bench_ast_binario [--tamanhos N [N ...]] [--repeticoes N]
+"""
+import json
+import time
+import argparse
+
+from compilador import Compiler
+from ast_nodes import para_dict
+from ast_binario import dumps, loads
+from benchmarks.gerador_programas import gerar_programa
+
+
+def cronometrar(funcao, repeticoes):
+    """Menor tempo (s) de `repeticoes` chamadas e o valor devolvido."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        valor = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, valor
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--tamanhos", type=int, nargs="+", default=[500, 2000, 8000, 32000],
+                      help="tamanhos dos programas, em comandos")
+    args.add_argument("--repeticoes", type=int, default=5, help="medições por tamanho (vale a menor)")
+    opcoes = args.parse_args()
+
+    compilador = Compiler()
+    print(f"{'comandos':>9}{'JSON (KiB)':>12}{'bin (KiB)':>11}{'escrita JSON':>14}{'escrita bin':>13}"
+          f"{'leitura JSON':>14}{'leitura bin':>13}{'tamanho':>9}{'escrita':>9}{'leitura':>9}")
+    totais = [0] * 6
+    for comandos in opcoes.tamanhos:
+        ast = compilador.compile(gerar_programa(comandos), keep_tokens=False).ast
+        t_json, texto = cronometrar(lambda: json.dumps(para_dict(ast), indent=2), opcoes.repeticoes)
+        t_bin, dados = cronometrar(lambda: dumps(ast), opcoes.repeticoes)
+        l_json, _ = cronometrar(lambda: json.loads(texto), opcoes.repeticoes)
+        l_bin, lida = cronometrar(lambda: loads(dados), opcoes.repeticoes)
+        assert lida == ast
+        tamanho_json = len(texto.encode("utf-8"))
+        print(f"{comandos:>9}{tamanho_json / 1024:12.1f}{len(dados) / 1024:11.1f}"
+              f"{t_json * 1000:12.2f}ms{t_bin * 1000:11.2f}ms{l_json * 1000:12.2f}ms{l_bin * 1000:11.2f}ms"
+              f"{tamanho_json / len(dados):8.1f}x{t_json / t_bin:8.1f}x{l_json / l_bin:8.1f}x")
+        for indice, valor in enumerate((tamanho_json, len(dados), t_json, t_bin, l_json, l_bin)):
+            totais[indice] += valor
+
+    tamanho, escrita, leitura = totais[0] / totais[1], totais[2] / totais[3], totais[4] / totais[5]
+    print(f"{'total':>9}{'':>77}{tamanho:8.1f}x{escrita:8.1f}x{leitura:8.1f}x")
+    assert tamanho >= 10, f"o binário deveria ser 10 vezes menor que o JSON ({tamanho:.1f}x)"
+    assert escrita >= 10, f"a escrita do binário deveria ser 10 vezes mais rápida ({escrita:.1f}x)"
+    assert leitura > 1, f"a leitura do binário deveria ser mais rápida que json.loads ({leitura:.1f}x)"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Custo do despacho dos visitantes por nó: compara a tabela de despacho de
+utils.NodeVisitor (tag -> método, montada uma vez por classe) com o despacho
+anterior, que montava o nome 'visit_<tag>' e chamava getattr a cada nó
+(e, na geração, escolhia desenhar_quadrado/desenhar_circulo por if/elif).
+
+Mede a redução (árvore de derivação -> AST), a análise semântica e a
+geração de código de um programa gerado, em ns por nó.
+
+    python -m benchmarks.bench_despacho [--comandos N] [--repeticoes N]
+"""
+import time
+import argparse
+
+from tokenizer import criar_tokenizer
+from lowering import Lowering
+from semantico import SemanticAnalyzer
+from gerador import GeradorCodigoVisitor
+from ast_nodes import contar_nos
+from utils import pausar_coletor
+import parser_gerado
+from benchmarks.gerador_programas import gerar_programa
+
+
+def _tag(node):
+    return node["tag"] if isinstance(node, dict) else type(node).__name__
+
+
+class DespachoPorGetattr:
+    """Mixin com o despacho anterior: nome do método e getattr a cada nó."""
+
+    def visit(self, node):
+        visitor = getattr(self, f'visit_{_tag(node)}', self.generic_visit)
+        return visitor(node)
+
+
+class LoweringGetattr(DespachoPorGetattr, Lowering):
+    pass
+
+
+class SemanticAnalyzerGetattr(DespachoPorGetattr, SemanticAnalyzer):
+    def visit_Call(self, node):
+        checker = getattr(self, f'check_{node.cmd}', None)
+        if checker:
+            checker(node)
+
+
+class GeradorGetattr(DespachoPorGetattr, GeradorCodigoVisitor):
+    def visit_Call(self, node):
+        if node.cmd == "desenhar_quadrado":
+            self.comando_desenhar_quadrado(node)
+        elif node.cmd == "desenhar_circulo":
+            self.comando_desenhar_circulo(node)
+        else:
+            GeradorCodigoVisitor.visit_Call(self, node)
+
+
+def cronometrar(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        with pausar_coletor():
+            inicio = time.perf_counter()
+            funcao()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--comandos", type=int, default=20000, help="comandos do programa gerado (padrão: %(default)s)")
+    args.add_argument("--repeticoes", type=int, default=5, help="medições por fase (vale a menor)")
+    opcoes = args.parse_args()
+
+    fonte = gerar_programa(opcoes.comandos)
+    arvore = parser_gerado.parse(criar_tokenizer(fonte).iter_tokens())
+    ast = Lowering().visit(arvore)
+    nos_arvore, nos_ast = contar_nos(arvore), contar_nos(ast)
+
+    def semantico(classe):
+        return lambda: classe(ast).analyze()
+
+    fases = [
+        ("redução", nos_arvore, lambda: LoweringGetattr().visit(arvore), lambda: Lowering().visit(arvore)),
+        ("semântico", nos_ast, semantico(SemanticAnalyzerGetattr), semantico(SemanticAnalyzer)),
+        ("geração", nos_ast, lambda: GeradorGetattr().gerar_codigo(ast), lambda: GeradorCodigoVisitor().gerar_codigo(ast)),
+    ]
+    print(f"{opcoes.comandos} comandos: {nos_arvore} nós na árvore de derivação, {nos_ast} na AST")
+    print(f"{'fase':<12}{'getattr (ns/nó)':>17}{'tabela (ns/nó)':>16}{'ganho':>8}")
+    for nome, nos, antes, depois in fases:
+        t_antes = cronometrar(antes, opcoes.repeticoes)
+        t_depois = cronometrar(depois, opcoes.repeticoes)
+        print(f"{nome:<12}{t_antes / nos * 1e9:17.0f}{t_depois / nos * 1e9:16.0f}{t_antes / t_depois:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
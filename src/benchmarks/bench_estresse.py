@@ -0,0 +1,86 @@
+"""
+Teste de estresse: compila programas sintéticos com muitos comandos e mede
+o tempo de cada fase. A regra CMDS -> CMD CMDS deixa a árvore de derivação
+com profundidade proporcional ao número de comandos, de modo que qualquer
+fase recursiva falha com RecursionError; o tempo por comando deve ficar
+aproximadamente constante conforme o programa cresce.
+
+    python -m benchmarks.bench_estresse [--comandos N [N ...]]
+"""
+import sys
+import time
+import argparse
+
+from tokenizer import criar_tokenizer
+from parser import ASTParser
+from lowering import lower
+from semantico import SemanticAnalyzer
+from gerador import GeradorCodigoVisitor
+from utils import rules, nonterm_userdef, term_userdef
+from cache_tabela import construir_tabela
+
+
+def programa_sintetico(comandos):
+    """Programa TurtleScript válido com aproximadamente `comandos` comandos."""
+    linhas = ["inicio", "var inteiro: lado;", "var texto: cor;", "lado = 10;", 'cor = "red";']
+    corpo = [
+        "avancar lado * 2 + 1;",
+        "girar_direita 90;",
+        "lado = lado + 5;",
+        "definir_cor cor;",
+        "repita 2 vezes\n  recuar lado;\n  girar_esquerda 45;\nfim_repita;",
+    ]
+    for i in range(max(comandos - 4, 0)):
+        linhas.append(corpo[i % len(corpo)])
+    linhas.append("fim")
+    return "\n".join(linhas)
+
+
+def medir(parser, tabela, source):
+    """Tempo (s) de cada fase da compilação de source."""
+    table, ll1, terms = tabela
+    tempos = {}
+    inicio = time.perf_counter()
+    arvore = parser.parse_with_ast(table, ll1, terms, criar_tokenizer(source).iter_tokens())
+    tempos["léxico+sintático"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    ast = lower(arvore)
+    tempos["redução"] = time.perf_counter() - inicio
+    del arvore
+
+    inicio = time.perf_counter()
+    SemanticAnalyzer(ast).analyze()
+    tempos["semântico"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    GeradorCodigoVisitor().gerar_codigo(ast)
+    tempos["geração"] = time.perf_counter() - inicio
+    return tempos
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--comandos", type=int, nargs="+", default=[1000, 10000, 100000],
+                      help="tamanhos dos programas, em comandos")
+    opcoes = args.parse_args()
+
+    parser = ASTParser(rules, nonterm_userdef, term_userdef)
+    tabela = construir_tabela(parser)
+
+    # O limite padrão de recursão continua valendo: nenhuma fase pode
+    # depender da profundidade da árvore.
+    print(f"limite de recursão: {sys.getrecursionlimit()}")
+    cabecalho = None
+    for comandos in opcoes.comandos:
+        tempos = medir(parser, tabela, programa_sintetico(comandos))
+        if cabecalho is None:
+            cabecalho = f"{'comandos':>9}" + "".join(f"{fase:>18}" for fase in tempos) + f"{'total (s)':>11}{'µs/comando':>12}"
+            print(cabecalho)
+        total = sum(tempos.values())
+        colunas = "".join(f"{t:18.3f}" for t in tempos.values())
+        print(f"{comandos:>9}{colunas}{total:11.3f}{total / comandos * 1e6:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Suíte de benchmarks das fases do compilador: compila programas gerados por
+benchmarks.gerador_programas em vários tamanhos, mede cada fase com
+instrumentacao.Medidor e mostra a vazão (tokens/s e comandos/s) e o expoente
+de crescimento de cada fase (inclinação de log(tempo) por log(tamanho):
+1,0 é linear).
+
+Com --verificar, os tempos são comparados com os de benchmarks/baseline.json
+(gravado com --gravar-baseline) e a execução termina com código 1 se houver
+regressão. Para comparar máquinas diferentes, os tempos são divididos pelo de
+uma carga de calibração em Python puro, medida junto com eles.
+
+    python -m benchmarks.bench_fases [--tamanhos N [N ...]] [--verificar | --gravar-baseline]
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+
+from compilador import Compiler
+from instrumentacao import Medidor
+from benchmarks.gerador_programas import gerar_programa, adicionar_argumentos
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TAMANHOS_PADRAO = [500, 2000, 8000, 32000]
+
+
+def calibrar(repeticoes=5):
+    """Tempo (s) de uma carga fixa em Python puro (o menor de algumas repetições)."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        tabela = {}
+        for i in range(200000):
+            tabela[i % 1000] = tabela.get(i % 1000, 0) + len(str(i))
+        sorted(tabela.items(), key=lambda item: item[1])
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def medir(compilador, fonte, repeticoes):
+    """
+    Menor tempo de cada fase em `repeticoes` compilações, e as contagens.
+    Devolve ({fase: segundos}, {contagem: valor}).
+    """
+    tempos = {}
+    contagens = {}
+    for _ in range(repeticoes):
+        medidor = Medidor(memoria=False)
+        resultado = compilador.compile(fonte, keep_tokens=False, medidor=medidor)
+        if not resultado.ok:
+            raise RuntimeError(f"o programa gerado não compilou: {resultado.errors[0]}")
+        for fase in medidor.fases:
+            tempos[fase.nome] = min(tempos.get(fase.nome, float("inf")), fase.wall)
+            contagens.update(fase.contagens)
+    return tempos, contagens
+
+
+def expoente(tamanhos, tempos):
+    """Inclinação da reta de mínimos quadrados de log(tempo) x log(tamanho)."""
+    pontos = [(math.log(n), math.log(t)) for n, t in zip(tamanhos, tempos) if t > 0]
+    if len(pontos) < 2:
+        return None
+    mx = sum(x for x, _ in pontos) / len(pontos)
+    my = sum(y for _, y in pontos) / len(pontos)
+    sxx = sum((x - mx) ** 2 for x, _ in pontos)
+    return sum((x - mx) * (y - my) for x, y in pontos) / sxx if sxx else None
+
+
+def executar(tamanhos, perfil, parser="gerado", repeticoes=3):
+    """Mede as fases para cada tamanho; devolve o relatório (serializável em JSON)."""
+    compilador = Compiler(parser)
+    calibracao = calibrar()
+    relatorio = {"calibracao": calibracao, "parser": parser, "perfil": perfil, "tamanhos": {}}
+    for comandos in tamanhos:
+        fonte = gerar_programa(comandos, **perfil)
+        tempos, contagens = medir(compilador, fonte, repeticoes)
+        relatorio["tamanhos"][str(comandos)] = {"fases": tempos, "tokens": contagens.get("tokens", 0)}
+    fases = list(next(iter(relatorio["tamanhos"].values()))["fases"]) if tamanhos else []
+    relatorio["expoentes"] = {
+        fase: expoente(tamanhos, [relatorio["tamanhos"][str(n)]["fases"].get(fase, 0) for n in tamanhos])
+        for fase in fases
+    }
+    return relatorio
+
+
+def imprimir(relatorio):
+    tamanhos = relatorio["tamanhos"]
+    fases = list(relatorio["expoentes"])
+    print(f"calibração: {relatorio['calibracao'] * 1000:.1f} ms   parser: {relatorio['parser']}")
+    print(f"{'comandos':>9}" + "".join(f"{fase:>13}" for fase in fases)
+          + f"{'total (ms)':>12}{'tokens/s':>12}{'comandos/s':>12}")
+    for comandos, medida in tamanhos.items():
+        total = sum(medida["fases"].values())
+        colunas = "".join(f"{medida['fases'].get(fase, 0) * 1000:13.2f}" for fase in fases)
+        print(f"{comandos:>9}{colunas}{total * 1000:12.2f}"
+              f"{medida['tokens'] / total:12.0f}{int(comandos) / total:12.0f}")
+    expoentes = "".join(f"{e:13.2f}" if e is not None else f"{'-':>13}" for e in relatorio["expoentes"].values())
+    print(f"{'expoente':>9}{expoentes}")
+
+
+def comparar(relatorio, baseline, tolerancia, limite_expoente):
+    """
+    Regressões em relação à baseline: tempo total normalizado pela
+    calibração acima de (1 + tolerancia) vezes o da baseline, em algum
+    tamanho em comum, ou fase com expoente de crescimento acima do limite
+    (e pior que o da baseline).
+    """
+    problemas = []
+    if relatorio["perfil"] != baseline["perfil"] or relatorio["parser"] != baseline["parser"]:
+        problemas.append("perfil ou parser diferente do da baseline: grave uma nova com --gravar-baseline")
+        return problemas
+    for comandos, medida in relatorio["tamanhos"].items():
+        referencia = baseline["tamanhos"].get(comandos)
+        if referencia is None:
+            continue
+        atual = sum(medida["fases"].values()) / relatorio["calibracao"]
+        anterior = sum(referencia["fases"].values()) / baseline["calibracao"]
+        if atual > anterior * (1 + tolerancia):
+            problemas.append(f"{comandos} comandos: {atual / anterior:.2f}x o tempo da baseline")
+    for fase, valor in relatorio["expoentes"].items():
+        anterior = baseline["expoentes"].get(fase)
+        if valor is not None and valor > limite_expoente and (anterior is None or valor > anterior):
+            problemas.append(f"fase {fase}: crescimento superlinear (expoente {valor:.2f})")
+    return problemas
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO,
+                      help="tamanhos dos programas, em comandos")
+    adicionar_argumentos(args)
+    args.add_argument("--parser", choices=["gerado", "tabela"], default="gerado")
+    args.add_argument("--repeticoes", type=int, default=3, help="compilações por tamanho (vale a menor)")
+    args.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args.add_argument("--baseline", default=BASELINE, help="arquivo da baseline (padrão: benchmarks/baseline.json)")
+    args.add_argument("--gravar-baseline", action="store_true", help="grava o relatório como nova baseline")
+    args.add_argument("--verificar", action="store_true", help="compara com a baseline; código 1 se houver regressão")
+    args.add_argument("--tolerancia", type=float, default=0.25,
+                      help="aumento de tempo aceito em relação à baseline (padrão: %(default)s)")
+    args.add_argument("--limite-expoente", type=float, default=1.3,
+                      help="maior expoente de crescimento aceito (padrão: %(default)s)")
+    opcoes = args.parse_args()
+
+    perfil = {"profundidade": opcoes.profundidade, "tamanho_expressao": opcoes.tamanho_expressao,
+              "identificadores": opcoes.identificadores, "proporcao_literais": opcoes.literais,
+              "semente": opcoes.semente}
+    relatorio = executar(opcoes.tamanhos, perfil, opcoes.parser, opcoes.repeticoes)
+    if opcoes.json:
+        print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    else:
+        imprimir(relatorio)
+
+    if opcoes.gravar_baseline:
+        with open(opcoes.baseline, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write("\n")
+        print(f"\nBaseline gravada em {opcoes.baseline}")
+    elif opcoes.verificar:
+        with open(opcoes.baseline, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        problemas = comparar(relatorio, baseline, opcoes.tolerancia, opcoes.limite_expoente)
+        for problema in problemas:
+            print(f"REGRESSÃO: {problema}")
+        if problemas:
+            return 1
+        print("\nSem regressões em relação à baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Mede como o tempo de construção da tabela LL(1) (FIRST, FOLLOW e
+createParseTable) cresce com o tamanho da gramática, comparando o cálculo
+por ponto fixo (first_follow.FirstFollow) com as funções recursivas
+originais Parser.first()/Parser.follow().
+
+    python -m benchmarks.bench_first_follow [--niveis N] [--comandos N] [--limite-ingenuo S]
+"""
+import time
+import argparse
+
+from parser import Parser
+
+
+def gramatica_sintetica(niveis, comandos):
+    """
+    Gramática LL(1) no formato de utils.rules com `comandos` comandos e uma
+    expressão com `niveis` níveis de precedência (como REL/ADD/MUL).
+    """
+    rules = [
+        "S -> inicio CMDS fim",
+        "CMDS -> CMD CMDS | #",
+        "CMD -> " + " | ".join(f"C{i}" for i in range(comandos)),
+    ]
+    rules += [f"C{i} -> cmd{i} E0 ;" for i in range(comandos)]
+    for j in range(niveis):
+        rules.append(f"E{j} -> E{j + 1} E{j}'")
+        rules.append(f"E{j}' -> op{j} E{j + 1} E{j}' | #")
+    rules.append(f"E{niveis} -> ( E0 ) | id | num")
+
+    nonterm = ["S", "CMDS", "CMD"] + [f"C{i}" for i in range(comandos)]
+    for j in range(niveis):
+        nonterm += [f"E{j}", f"E{j}'"]
+    nonterm.append(f"E{niveis}")
+    term = ["inicio", "fim", ";", "(", ")", "id", "num", "#"]
+    term += [f"cmd{i}" for i in range(comandos)] + [f"op{j}" for j in range(niveis)]
+    return rules, nonterm, term
+
+
+def construir_ponto_fixo(parser):
+    parser.computeAllFirsts()
+    parser.start_symbol = list(parser.diction.keys())[0]
+    parser.computeAllFollows()
+    return parser.createParseTable()
+
+
+def construir_ingenuo(parser):
+    """Reproduz a construção original, com first()/follow() recursivos e sem cache."""
+    parser.computeAllFirsts() # monta diction (os conjuntos são refeitos abaixo)
+    parser.start_symbol = list(parser.diction.keys())[0]
+    for nt, producoes in parser.diction.items():
+        firsts = set()
+        for producao in producoes:
+            res = parser.first(producao)
+            firsts.update(res if isinstance(res, list) else [res])
+        parser.firsts[nt] = firsts
+    for nt in parser.diction:
+        parser.follows[nt] = set(parser.follow(nt))
+    for producoes in parser.diction.values():
+        for producao in producoes:
+            parser.first(producao)
+    return parser.createParseTable()
+
+
+def medir(construir, rules, nonterm, term):
+    parser = Parser(rules, nonterm, term)
+    inicio = time.perf_counter()
+    _, ll1, _ = construir(parser)
+    duracao = time.perf_counter() - inicio
+    return duracao, ll1, len(parser.diction)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--niveis", type=int, default=16, help="maior número de níveis de expressão")
+    args.add_argument("--comandos", type=int, default=20, help="comandos da gramática sintética")
+    args.add_argument("--limite-ingenuo", type=float, default=5.0,
+                      help="para de medir a versão recursiva depois de um caso mais lento que isto (s)")
+    opcoes = args.parse_args()
+
+    print(f"{'níveis':>6} {'não-term.':>9} {'ponto fixo (ms)':>16} {'recursivo (ms)':>15} {'razão':>8}")
+    medir_ingenuo = True
+    for niveis in range(1, opcoes.niveis + 1):
+        gramatica = gramatica_sintetica(niveis, opcoes.comandos)
+        rapido, ll1, n_nt = medir(construir_ponto_fixo, *gramatica)
+        assert ll1, "a gramática sintética deveria ser LL(1)"
+        if medir_ingenuo:
+            lento, _, _ = medir(construir_ingenuo, *gramatica)
+            medir_ingenuo = lento < opcoes.limite_ingenuo
+            coluna_lenta = f"{lento * 1000:15.1f} {lento / rapido:7.1f}x"
+        else:
+            coluna_lenta = f"{'-':>15} {'-':>8}"
+        print(f"{niveis:>6} {n_nt:>9} {rapido * 1000:16.1f} {coluna_lenta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Gerador de programas TurtleScript sintéticos para os benchmarks.
+
+Os programas seguem utils.rules e passam na análise semântica: expressões
+inteiras usam só + - *, a divisão aparece apenas em expressões reais, as
+condições são variáveis ou constantes logico (ou comparações entre elas) e
+todo 'enquanto' termina (o corpo zera a sua variável de controle). O mesmo
+conjunto de parâmetros e a mesma semente geram sempre o mesmo programa.
+
+    python -m benchmarks.gerador_programas --comandos 1000 --profundidade 3 > programa.txt
+"""
+import random
+import argparse
+
+TIPOS = ("inteiro", "real", "texto", "logico")
+PREFIXO = {"inteiro": "n", "real": "r", "texto": "t", "logico": "b"}
+CORES = ("red", "green", "blue", "black", "cyan", "magenta", "yellow", "orange")
+
+COMANDOS_NUMERICOS = ("avancar", "recuar", "girar_direita", "girar_esquerda", "definir_espessura")
+COMANDOS_SIMPLES = ("levantar_caneta", "abaixar_caneta")
+
+
+class GeradorProgramas:
+    """
+    comandos: número exato de comandos do programa (declarações, blocos e
+    comandos aninhados incluídos); profundidade: aninhamento máximo de
+    repita/enquanto/se; tamanho_expressao: operandos por expressão;
+    identificadores: variáveis declaradas (ao menos uma de cada tipo);
+    proporcao_literais: fração dos operandos que são constantes.
+    """
+
+    def __init__(self, comandos=100, profundidade=2, tamanho_expressao=3, identificadores=8,
+                 proporcao_literais=0.3, semente=0):
+        self.comandos = comandos
+        self.profundidade = profundidade
+        self.tamanho_expressao = max(1, tamanho_expressao)
+        self.proporcao_literais = proporcao_literais
+        self.rng = random.Random(semente)
+        # Cada variável custa dois comandos (declaração e valor inicial)
+        total = max(len(TIPOS), min(identificadores, comandos // 4))
+        self.variaveis = {tipo: [] for tipo in TIPOS}
+        for i in range(total):
+            tipo = TIPOS[i % len(TIPOS)]
+            self.variaveis[tipo].append(f"{PREFIXO[tipo]}{len(self.variaveis[tipo])}")
+        if comandos < 2 * total:
+            raise ValueError(f"são necessários ao menos {2 * total} comandos para declarar as variáveis")
+
+    # -- Expressões --
+
+    def _literal(self, tipo):
+        rng = self.rng
+        if tipo == "inteiro":
+            return str(rng.randint(1, 99))
+        if tipo == "real":
+            return f"{rng.randint(1, 99)}.{rng.randint(1, 9)}"
+        if tipo == "texto":
+            return f'"{rng.choice(CORES)}"'
+        return rng.choice(("verdadeiro", "falso"))
+
+    def _operando(self, tipo):
+        if self.rng.random() < self.proporcao_literais:
+            return self._literal(tipo)
+        return self.rng.choice(self.variaveis[tipo])
+
+    def expressao(self, tipo):
+        """Expressão do tipo dado, com até tamanho_expressao operandos."""
+        rng = self.rng
+        if tipo == "texto":
+            return self._operando("texto")
+        if tipo == "logico":
+            # Só '==': o analisador léxico não reconhece '!=', '<=' nem '>='
+            if self.tamanho_expressao > 1 and rng.random() < 0.5:
+                return f"{self._operando('logico')} == {self._operando('logico')}"
+            return self._operando("logico")
+
+        operadores = ("+", "-", "*", "/") if tipo == "real" else ("+", "-", "*")
+        partes = [self._operando(tipo)]
+        for _ in range(rng.randint(1, self.tamanho_expressao) - 1):
+            operador = rng.choice(operadores)
+            if operador == "/":
+                # Divisor sempre não nulo
+                direito = self._literal("inteiro")
+            else:
+                direito = self._operando(rng.choice(("inteiro", tipo)))
+            partes += [operador, direito]
+        if len(partes) > 3 and rng.random() < 0.3:
+            partes = ["("] + partes[:3] + [")"] + partes[3:]
+        return " ".join(partes).replace("( ", "(").replace(" )", ")")
+
+    # -- Comandos --
+
+    def _simples(self):
+        """Um comando sem corpo."""
+        rng = self.rng
+        escolha = rng.random()
+        if escolha < 0.35:
+            tipo = rng.choice(("inteiro", "inteiro", "real", "logico", "texto"))
+            return f"{rng.choice(self.variaveis[tipo])} = {self.expressao(tipo)};"
+        if escolha < 0.7:
+            return f"{rng.choice(COMANDOS_NUMERICOS)} {self.expressao(rng.choice(('inteiro', 'real')))};"
+        if escolha < 0.8:
+            return f"{rng.choice(('definir_cor', 'cor_de_fundo'))} {self.expressao('texto')};"
+        if escolha < 0.87:
+            return f"ir_para {self.expressao('inteiro')} {self.expressao('inteiro')};"
+        if escolha < 0.92:
+            return f"desenhar_quadrado {self.expressao('inteiro')} {self.expressao('texto')};"
+        if escolha < 0.96:
+            return f"desenhar_circulo {self.expressao('real')} {self.expressao('texto')} {self.expressao('texto')};"
+        return f"{rng.choice(COMANDOS_SIMPLES)};"
+
+    def _bloco(self, linhas, orcamento, nivel, recuo):
+        """Acrescenta a linhas exatamente `orcamento` comandos."""
+        rng = self.rng
+        espacos = "    " * recuo
+        while orcamento > 0:
+            if nivel < self.profundidade and orcamento >= 3 and rng.random() < 0.25:
+                corpo = rng.randint(2, min(orcamento - 1, 12))
+                orcamento -= corpo + 1
+                self._composto(linhas, corpo, nivel + 1, recuo)
+            else:
+                orcamento -= 1
+                linhas.append(espacos + self._simples())
+
+    def _composto(self, linhas, corpo, nivel, recuo):
+        """repita, enquanto ou se com `corpo` comandos internos."""
+        rng = self.rng
+        espacos = "    " * recuo
+        tipo = rng.choice(("repita", "enquanto", "se"))
+        if tipo == "repita":
+            linhas.append(f"{espacos}repita {rng.randint(1, 5)} vezes")
+            self._bloco(linhas, corpo, nivel, recuo + 1)
+            linhas.append(f"{espacos}fim_repita;")
+        elif tipo == "enquanto":
+            controle = rng.choice(self.variaveis["logico"])
+            linhas.append(f"{espacos}enquanto {controle} faca")
+            self._bloco(linhas, corpo - 1, nivel, recuo + 1)
+            linhas.append(f"{espacos}    {controle} = falso;")
+            linhas.append(f"{espacos}fim_enquanto;")
+        else:
+            linhas.append(f"{espacos}se {self.expressao('logico')} entao")
+            entao = rng.randint(1, corpo) if corpo > 1 else corpo
+            self._bloco(linhas, entao, nivel, recuo + 1)
+            if entao < corpo:
+                linhas.append(f"{espacos}senao")
+                self._bloco(linhas, corpo - entao, nivel, recuo + 1)
+            linhas.append(f"{espacos}fim_se;")
+
+    def gerar(self):
+        linhas = ["inicio"]
+        restantes = self.comandos
+        for tipo in TIPOS:
+            for nome in self.variaveis[tipo]:
+                linhas.append(f"    var {tipo}: {nome};")
+                linhas.append(f"    {nome} = {self._literal(tipo)};")
+                restantes -= 2
+        self._bloco(linhas, restantes, 0, 1)
+        linhas.append("fim")
+        return "\n".join(linhas) + "\n"
+
+
+def gerar_programa(comandos=100, profundidade=2, tamanho_expressao=3, identificadores=8,
+                   proporcao_literais=0.3, semente=0):
+    """Programa TurtleScript válido com exatamente `comandos` comandos (ver GeradorProgramas)."""
+    return GeradorProgramas(comandos, profundidade, tamanho_expressao, identificadores,
+                            proporcao_literais, semente).gerar()
+
+
+def adicionar_argumentos(args):
+    """Opções de linha de comando dos parâmetros do gerador (exceto --comandos)."""
+    args.add_argument("--profundidade", type=int, default=2, help="aninhamento máximo de blocos (padrão: %(default)s)")
+    args.add_argument("--tamanho-expressao", type=int, default=3, help="operandos por expressão (padrão: %(default)s)")
+    args.add_argument("--identificadores", type=int, default=8, help="variáveis declaradas (padrão: %(default)s)")
+    args.add_argument("--literais", type=float, default=0.3, help="fração de operandos constantes (padrão: %(default)s)")
+    args.add_argument("--semente", type=int, default=0, help="semente do gerador (padrão: %(default)s)")
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--comandos", type=int, default=100, help="comandos do programa (padrão: %(default)s)")
+    adicionar_argumentos(args)
+    opcoes = args.parse_args()
+    print(gerar_programa(opcoes.comandos, opcoes.profundidade, opcoes.tamanho_expressao,
+                         opcoes.identificadores, opcoes.literais, opcoes.semente), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# cache_compilacao.py
+"""
+Cache endereçado por conteúdo do código Python gerado.
+
+A chave de um programa combina o hash do código-fonte, o hash da gramática e
+a versão do compilador (VERSAO_COMPILADOR mais o conteúdo dos módulos que
+participam da compilação), de modo que qualquer mudança em um deles gera uma
+chave nova. Um acerto dispensa léxico, sintático, semântico e geração.
+
+As entradas ficam em <diretório do cache>/saidas, são gravadas de forma
+atômica e o diretório é limitado em tamanho: quando passa do limite, as
+entradas usadas há mais tempo (pela data de modificação, atualizada a cada
+acerto) são removidas.
+"""
+import os
+import json
+import hashlib
+
+from utils import escrever_atomicamente, rules, nonterm_userdef, term_userdef
+from cache_tabela import DIRETORIO_PADRAO, hash_gramatica
+
+# Incrementar sempre que o código gerado mudar por um motivo que não esteja
+# nos módulos de MODULOS_COMPILADOR.
+VERSAO_COMPILADOR = 1
+
+# Módulos cujo conteúdo faz parte da versão do compilador.
+MODULOS_COMPILADOR = (
+    "tokenizer", "token_buffer", "parser", "parser_gerado", "lowering",
+    "ast_nodes", "semantico", "otimizador", "gerador", "compilador", "utils",
+)
+
+LIMITE_PADRAO = 256 * 1024 * 1024 # bytes
+
+_versao = None
+
+
+def versao_compilador():
+    """Hash de VERSAO_COMPILADOR e do código dos MODULOS_COMPILADOR (calculado uma vez)."""
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256(str(VERSAO_COMPILADOR).encode())
+        diretorio = os.path.dirname(os.path.abspath(__file__))
+        for nome in MODULOS_COMPILADOR:
+            with open(os.path.join(diretorio, nome + ".py"), "rb") as arquivo:
+                h.update(hashlib.sha256(arquivo.read()).digest())
+        _versao = h.hexdigest()
+    return _versao
+
+
+class CacheCompilacao:
+    """
+    Saídas do compilador indexadas pela chave do código-fonte. diretorio é o
+    mesmo diretório de cache usado por carregar_tabela; limite_bytes é o
+    tamanho máximo aproximado das entradas.
+    """
+
+    def __init__(self, diretorio=None, limite_bytes=LIMITE_PADRAO):
+        self.diretorio = os.path.join(diretorio or DIRETORIO_PADRAO, "saidas")
+        self.limite_bytes = limite_bytes
+        self._prefixo = json.dumps([versao_compilador(), hash_gramatica(rules, nonterm_userdef, term_userdef)])
+        self._tamanho = None # Estimativa do tamanho total, para evitar varrer o diretório a cada gravação
+
+    def chave(self, fonte, opcoes=None):
+        """Chave de fonte; opcoes (serializável em JSON) são as opções da geração de código."""
+        h = hashlib.sha256(self._prefixo.encode())
+        if opcoes:
+            h.update(json.dumps(opcoes, sort_keys=True).encode())
+        h.update(fonte.encode("utf-8"))
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave + ".py")
+
+    def obter(self, chave):
+        """Código guardado para a chave, ou None. Um acerto marca a entrada como usada."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "r", encoding="utf-8") as arquivo:
+                codigo = arquivo.read()
+            os.utime(caminho)
+        except OSError:
+            return None
+        return codigo
+
+    def guardar(self, chave, codigo):
+        """Grava a entrada (atomicamente) e poda o cache se passou do limite.
+        Falhas de E/S são ignoradas: o cache nunca impede a compilação."""
+        try:
+            escrever_atomicamente(self._caminho(chave), codigo)
+            if self._tamanho is None:
+                self._tamanho = self.tamanho()
+            else:
+                self._tamanho += len(codigo.encode("utf-8"))
+            if self._tamanho > self.limite_bytes:
+                self.podar()
+        except OSError:
+            pass
+
+    def _entradas(self):
+        """Lista de (última utilização, tamanho, caminho) das entradas."""
+        entradas = []
+        try:
+            subdiretorios = os.scandir(self.diretorio)
+        except OSError:
+            return entradas
+        with subdiretorios:
+            for sub in subdiretorios:
+                if not sub.is_dir():
+                    continue
+                with os.scandir(sub.path) as arquivos:
+                    for arquivo in arquivos:
+                        if arquivo.name.endswith(".py"):
+                            try:
+                                info = arquivo.stat()
+                            except OSError:
+                                continue
+                            entradas.append((info.st_mtime, info.st_size, arquivo.path))
+        return entradas
+
+    def tamanho(self):
+        """Tamanho total (bytes) das entradas."""
+        return sum(tamanho for _, tamanho, _ in self._entradas())
+
+    def podar(self, limite_bytes=None):
+        """
+        Remove as entradas usadas há mais tempo até o total ficar abaixo de 90%
+        do limite (a folga evita podar a cada gravação). Outros processos
+        podem estar podando ao mesmo tempo: entradas já removidas são ignoradas.
+        """
+        limite = self.limite_bytes if limite_bytes is None else limite_bytes
+        entradas = sorted(self._entradas())
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        alvo = limite * 0.9
+        for _, tamanho, caminho in entradas:
+            if total <= alvo:
+                break
+            try:
+                os.unlink(caminho)
+            except OSError:
+                pass
+            total -= tamanho
+        self._tamanho = total
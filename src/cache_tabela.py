@@ -0,0 +1,97 @@
+# cache_tabela.py
+import os
+import json
+import pickle
+import hashlib
+
+from utils import escrever_atomicamente
+from instrumentacao import NULO
+
+# Incrementar sempre que o formato do pacote mudar, para invalidar os caches
+# já gravados. Mudanças na construção da tabela já mudam a chave do cache,
+# que inclui o código dos MODULOS_TABELA.
+VERSAO_FORMATO = 2
+
+# Módulos que constroem a tabela (e definem as classes gravadas no pacote).
+MODULOS_TABELA = ("first_follow", "tabela_ll1", "parser")
+
+DIRETORIO_PADRAO = os.environ.get("TURTLESCRIPT_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "turtlescript")
+
+_versao = None
+
+
+def hash_gramatica(rules, nonterm_userdef, term_userdef):
+    """Hash SHA-256 da definição da gramática (e da versão do formato do cache)."""
+    definicao = json.dumps([VERSAO_FORMATO, rules, nonterm_userdef, term_userdef], ensure_ascii=False)
+    return hashlib.sha256(definicao.encode("utf-8")).hexdigest()
+
+
+def versao_construcao():
+    """Hash do código dos MODULOS_TABELA (calculado uma vez)."""
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256()
+        diretorio = os.path.dirname(os.path.abspath(__file__))
+        for nome in MODULOS_TABELA:
+            with open(os.path.join(diretorio, nome + ".py"), "rb") as arquivo:
+                h.update(hashlib.sha256(arquivo.read()).digest())
+        _versao = h.hexdigest()
+    return _versao
+
+
+def caminho_cache(parser, diretorio=None):
+    """Arquivo de cache da tabela LL(1) da gramática do parser e do código que a constrói."""
+    gramatica = hash_gramatica(parser.rules, parser.nonterm_userdef, parser.term_userdef)
+    chave = hashlib.sha256(f"{gramatica}:{versao_construcao()}".encode()).hexdigest()
+    return os.path.join(diretorio or DIRETORIO_PADRAO, f"tabela-{chave}.pickle")
+
+
+def construir_tabela(parser, medidor=NULO):
+    """Construção completa: FIRST, FOLLOW e createParseTable."""
+    with medidor.fase("FIRST"):
+        parser.computeAllFirsts()
+    parser.start_symbol = list(parser.diction.keys())[0]
+    with medidor.fase("FOLLOW"):
+        parser.computeAllFollows()
+    with medidor.fase("createParseTable") as fase:
+        resultado = parser.createParseTable()
+        fase.contar("produções", len(parser.tabela.producoes))
+    return resultado
+
+
+def carregar_tabela(parser, diretorio=None, reconstruir=False, medidor=NULO):
+    """
+    Devolve (table, is_LL1, terminals) para a gramática do parser, como
+    createParseTable, e preenche parser.diction e parser.start_symbol.
+
+    O pacote (table, is_LL1, terminals, diction, start_symbol, tabela densa)
+    é lido do diretório de cache quando existe um gravado para o mesmo hash da
+    gramática e do código dos MODULOS_TABELA; caso contrário (ou com reconstruir=True) a tabela é construída
+    do zero e o pacote é gravado de forma atômica. Falhas ao ler ou gravar o
+    cache nunca impedem a compilação.
+    """
+    caminho = caminho_cache(parser, diretorio)
+
+    if not reconstruir:
+        try:
+            with medidor.fase("cache da tabela"), open(caminho, "rb") as arquivo:
+                table, is_LL1, terminals, diction, start_symbol, tabela = pickle.load(arquivo)
+        except Exception:
+            # Qualquer falha (arquivo truncado, formato antigo, classe ou
+            # módulo renomeado desde a gravação) leva à reconstrução
+            pass
+        else:
+            parser.diction = diction
+            parser.start_symbol = start_symbol
+            parser.tabela = tabela
+            parser._matriz_tabela = table
+            return table, is_LL1, terminals
+
+    table, is_LL1, terminals = construir_tabela(parser, medidor)
+    pacote = (table, is_LL1, terminals, parser.diction, parser.start_symbol, parser.tabela)
+    try:
+        escrever_atomicamente(caminho, pickle.dumps(pacote, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass
+    return table, is_LL1, terminals
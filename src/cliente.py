@@ -0,0 +1,105 @@
+# cliente.py
+"""
+Cliente do servidor de compilação (servidor.py). Com os mesmos argumentos
+de main.py, substitui-o sem pagar a inicialização do compilador:
+
+    python cliente.py entrada1.txt saida1.py [--unix /tmp/turtlescript.sock]
+    python cliente.py --health
+    python cliente.py --metrics
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+
+from protocolo import HOST_PADRAO, PORTA_PADRAO, LIMITE_LINHA, codificar, decodificar
+from utils import escrever_atomicamente
+
+
+class ClienteCompilacao:
+    """Conexão com o servidor; pedir() envia um pedido e espera a resposta."""
+
+    def __init__(self, unix=None, host=HOST_PADRAO, porta=PORTA_PADRAO, timeout=None):
+        if unix:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(unix)
+        else:
+            self.socket = socket.create_connection((host, porta), timeout)
+        self._arquivo = self.socket.makefile("rb")
+        self._proximo_id = 0
+
+    def pedir(self, op, **campos):
+        self._proximo_id += 1
+        self.socket.sendall(codificar({"id": self._proximo_id, "op": op, **campos}))
+        linha = self._arquivo.readline(LIMITE_LINHA + 1)
+        if not linha:
+            raise ConnectionError("o servidor fechou a conexão")
+        return decodificar(linha)
+
+    def compilar(self, fonte):
+        return self.pedir("compile", source=fonte)
+
+    def fechar(self):
+        self._arquivo.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("entrada", nargs="?", help="arquivo de entrada, relativo a tests/")
+    args.add_argument("saida", nargs="?", help="arquivo de saída, relativo a tests/")
+    args.add_argument("--unix", default=None, help="caminho do socket Unix do servidor")
+    args.add_argument("--host", default=HOST_PADRAO, help="endereço TCP do servidor (padrão: %(default)s)")
+    args.add_argument("--porta", type=int, default=PORTA_PADRAO, help="porta TCP do servidor (padrão: %(default)s)")
+    args.add_argument("--timeout", type=float, default=60.0, help="tempo máximo de espera, em segundos (padrão: %(default)s)")
+    args.add_argument("--health", action="store_true", help="verifica se o servidor está no ar")
+    args.add_argument("--metrics", action="store_true", help="mostra as métricas do servidor")
+    opcoes = args.parse_args(argv)
+    if not (opcoes.health or opcoes.metrics) and not (opcoes.entrada and opcoes.saida):
+        args.error("informe entrada e saida, ou --health / --metrics")
+
+    try:
+        cliente = ClienteCompilacao(opcoes.unix, opcoes.host, opcoes.porta, opcoes.timeout)
+    except OSError as e:
+        print(f"Não foi possível conectar ao servidor de compilação: {e}", file=sys.stderr)
+        return 2
+
+    with cliente:
+        if opcoes.health or opcoes.metrics:
+            resposta = cliente.pedir("health" if opcoes.health else "metrics")
+            print(json.dumps(resposta.get("metrics", resposta), indent=2, ensure_ascii=False))
+            return 0 if resposta.get("ok") else 1
+
+        caminho_script = os.path.dirname(__file__)
+        caminho_entrada = os.path.join(caminho_script, 'tests', opcoes.entrada)
+        caminho_saida = os.path.join(caminho_script, 'tests', opcoes.saida)
+        try:
+            with open(caminho_entrada, 'r', encoding="utf-8") as arquivo:
+                fonte = arquivo.read()
+        except FileNotFoundError:
+            print(f"O arquivo de entrada não foi encontrado em: {caminho_entrada}", file=sys.stderr)
+            return 1
+
+        resposta = cliente.compilar(fonte)
+
+    if not resposta["ok"]:
+        for erro in resposta["errors"]:
+            if erro["phase"] == "léxico":
+                print(f"Erro de Análise Léxica: {erro['message']}", file=sys.stderr)
+            else:
+                print(erro["message"], file=sys.stderr)
+        return 1
+    escrever_atomicamente(caminho_saida, resposta["code"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# compilador.py
+"""
+API de compilação para uso dentro de outros programas:
+
+    compilador = Compiler()
+    resultado = compilador.compile(fonte)
+    if resultado.ok:
+        print(resultado.code)
+    else:
+        for erro in resultado.errors:
+            print(erro)
+
+Compiler escolhe o parser (e, se for o caso, monta a tabela LL(1)) uma única
+vez; compile pode então ser chamado quantas vezes for preciso, inclusive de
+várias threads ao mesmo tempo: cada chamada cria seu próprio tokenizer,
+analisador semântico e gerador, e o parser não guarda estado entre chamadas.
+compile_ast retoma a compilação a partir de uma AST já pronta (por exemplo,
+lida de um arquivo com ast_binario.load). main.py e lote.py são interfaces
+de linha de comando sobre esta API.
+"""
+import json
+import functools
+
+from tokenizer import ScanError, criar_tokenizer
+from parser import ASTParser
+from lowering import lower
+from ast_nodes import para_dict, contar_nos
+from semantico import SemanticAnalyzer, SemanticError
+from gerador import GeradorCodigoVisitor
+from otimizador import Otimizador, OtimizadorEstado
+from utils import rules, nonterm_userdef, term_userdef
+from cache_tabela import carregar_tabela, hash_gramatica
+from diagnostico import PADRAO, DEBUG
+from instrumentacao import NULO
+import parser_gerado
+
+LEXICO = "léxico"
+SINTATICO = "sintático"
+SEMANTICO = "semântico"
+
+
+def preparar_parse(tipo="gerado", cache_dir=None, reconstruir=False, diagnostico=None, medidor=NULO):
+    """
+    Função parse(tokens, medidor=NULO) -> árvore de derivação, para tipo "gerado"
+    (parser_gerado.parse) ou "tabela" (ASTParser com a tabela do cache).
+
+    O parser gerado só é usado se corresponder à gramática atual; caso
+    contrário há um aviso e a tabela LL(1) é usada. A função devolvida pode
+    ser serializada com pickle (ex.: para um ProcessPoolExecutor).
+    """
+    diag = diagnostico or PADRAO
+    if tipo == "gerado":
+        if parser_gerado.HASH_GRAMATICA == hash_gramatica(rules, nonterm_userdef, term_userdef):
+            return parser_gerado.parse
+        diag.aviso("Aviso: parser_gerado.py está desatualizado (execute `python gerador_parser.py`); usando a tabela LL(1).")
+
+    # O parser não recebe o diagnóstico: ele precisa poder ir para outro processo
+    parser = ASTParser(rules, nonterm_userdef, term_userdef)
+    table, result, tab_terms = carregar_tabela(parser, cache_dir, reconstruir, medidor)
+    return functools.partial(parser.parse_with_ast, table, result, tab_terms)
+
+
+class CompilationError:
+    """Erro de compilação: fase (LEXICO, SINTATICO ou SEMANTICO), mensagem e linha (ou None)."""
+
+    def __init__(self, phase, message, line=None):
+        self.phase = phase
+        self.message = message
+        self.line = line
+
+    @classmethod
+    def from_exception(cls, erro):
+        if isinstance(erro, ScanError):
+            fase = LEXICO
+        elif isinstance(erro, SemanticError):
+            fase = SEMANTICO
+        else:
+            fase = SINTATICO
+        return cls(fase, str(erro), getattr(erro, "line", None))
+
+    def para_dict(self):
+        return {"phase": self.phase, "message": self.message, "line": self.line}
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"CompilationError({self.phase!r}, {self.message!r}, line={self.line})"
+
+
+class CompilationResult:
+    """
+    Resultado de Compiler.compile: os tokens reconhecidos, a AST, a tabela de
+    símbolos, o código gerado e a lista de erros. Campos de fases que não
+    chegaram a rodar ficam None (com erro de sintaxe, por exemplo, há tokens
+    mas não há AST). Quando o código vem do cache (from_cache), só code é
+    preenchido.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = None
+        self.ast = None
+        self.symbol_table = None
+        self.code = None
+        self.errors = []
+        self.from_cache = False
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class Compiler:
+    """
+    Compilador TurtleScript -> Python reutilizável.
+
+    parser: "gerado" ou "tabela" (ver preparar_parse); lexer: motor do
+    analisador léxico; cache: CacheCompilacao opcional; diagnostico: destino
+    das mensagens das fases (silencioso por padrão); medidor: Medidor que
+    recebe as fases da preparação (FIRST, FOLLOW e createParseTable, quando
+    a tabela é construída); otimizar: dobra e propaga constantes e remove
+    comandos de estado redundantes antes da geração de código (ver
+    otimizador); em_funcao, perfil,
+    intervalo_atualizacao e imagem: opções do código gerado (ver
+    GeradorCodigoVisitor).
+    """
+
+    def __init__(self, parser="gerado", lexer="regex", cache=None, diagnostico=None,
+                 cache_dir=None, reconstruir_tabela=False, medidor=NULO, em_funcao=False,
+                 perfil="interativo", intervalo_atualizacao=0, imagem=None, otimizar=False):
+        self.lexer = lexer
+        self.cache = cache
+        self.diag = diagnostico or PADRAO
+        # Opções da geração de código: fazem parte da chave do cache
+        self.opcoes_geracao = {"em_funcao": em_funcao, "perfil": perfil,
+                               "intervalo_atualizacao": intervalo_atualizacao, "imagem": imagem}
+        GeradorCodigoVisitor(**self.opcoes_geracao) # Valida as opções já na criação
+        self.otimizar = otimizar
+        self._parse = preparar_parse(parser, cache_dir, reconstruir_tabela, self.diag, medidor)
+
+    def __getstate__(self):
+        # Destinos de diagnóstico têm travas e arquivos abertos: em outro
+        # processo o compilador usa o diagnóstico silencioso
+        estado = self.__dict__.copy()
+        estado["diag"] = PADRAO
+        return estado
+
+    def compile(self, source, keep_tokens=True, medidor=NULO):
+        """
+        Compila source e devolve um CompilationResult. Erros léxicos,
+        sintáticos e semânticos vão para result.errors; outras exceções
+        (erros internos do compilador) são propagadas.
+
+        Com um Medidor, cada fase é medida separadamente (os tokens são
+        todos lidos antes do parsing, em vez de consumidos sob demanda).
+        """
+        resultado = CompilationResult(source)
+        diag = self.diag
+
+        if self.cache is not None:
+            with medidor.fase("cache de compilação") as fase:
+                chave = self.cache.chave(source, {**self.opcoes_geracao, "otimizar": self.otimizar})
+                resultado.code = self.cache.obter(chave)
+                fase.contar("acertos", int(resultado.code is not None))
+            if resultado.code is not None:
+                resultado.from_cache = True
+                diag.info("Código obtido do cache de compilação.")
+                return resultado
+
+        try:
+            tokens = criar_tokenizer(source, self.lexer).iter_tokens()
+            if medidor.ativo:
+                with medidor.fase("léxico") as fase:
+                    tokens = list(tokens)
+                    fase.contar("tokens", len(tokens))
+                if keep_tokens:
+                    resultado.tokens = tokens
+            elif keep_tokens:
+                resultado.tokens = []
+                tokens = _registrando(tokens, resultado.tokens)
+
+            # Geração da AST: o parser consome os tokens à medida que são reconhecidos
+            diag.info("\n--- Iniciando Geração da AST ---")
+            arvore = self._parse(tokens, medidor=medidor)
+            with medidor.fase("redução"):
+                resultado.ast = lower(arvore)
+            diag.info("--- AST Gerada com Sucesso! ---")
+            if medidor.ativo:
+                medidor.contar("sintático", "nós da árvore de derivação", contar_nos(arvore))
+                medidor.contar("redução", "nós da AST", contar_nos(resultado.ast))
+            del arvore
+            if diag.ativo(DEBUG):
+                diag.debug(json.dumps(para_dict(resultado.ast), indent=2))
+
+            self._analisar_e_gerar(resultado, medidor)
+        except (ScanError, SyntaxError, SemanticError) as e:
+            resultado.errors.append(CompilationError.from_exception(e))
+            return resultado
+
+        if self.cache is not None:
+            self.cache.guardar(chave, resultado.code)
+        return resultado
+
+    def compile_ast(self, ast, medidor=NULO):
+        """
+        Compila a partir de uma AST pronta (ex.: lida com ast_binario.load),
+        começando pela análise semântica. O resultado não tem source nem
+        tokens, e o cache de compilação não é usado.
+        """
+        resultado = CompilationResult(None)
+        resultado.ast = ast
+        try:
+            self._analisar_e_gerar(resultado, medidor)
+        except SemanticError as e:
+            resultado.errors.append(CompilationError.from_exception(e))
+        return resultado
+
+    def _analisar_e_gerar(self, resultado, medidor):
+        """
+        Análise semântica, otimização (se ligada) e geração de código de
+        resultado.ast. O código é gerado da AST otimizada, mas resultado.ast
+        continua sendo a AST original.
+        """
+        analisador = SemanticAnalyzer(resultado.ast, diagnostico=self.diag)
+        resultado.symbol_table = analisador.symbol_table
+        with medidor.fase("semântico") as fase:
+            analisador.analyze()
+            fase.contar("símbolos", len(analisador.symbol_table))
+
+        ast = resultado.ast
+        if self.otimizar:
+            # Constantes primeiro: argumentos dobrados tornam mais comandos de estado iguais
+            otimizador, estado = Otimizador(), OtimizadorEstado()
+            with medidor.fase("otimização") as fase:
+                ast = estado.otimizar(otimizador.otimizar(ast))
+                fase.contar("expressões dobradas", otimizador.dobradas)
+                fase.contar("usos propagados", otimizador.propagadas)
+                fase.contar("comandos removidos", estado.removidos)
+                fase.contar("comandos movidos", estado.movidos)
+            self.diag.info("Otimização: {} expressões dobradas, {} usos de variáveis propagados, "
+                           "{} comandos de estado removidos e {} movidos para fora de laços.",
+                           otimizador.dobradas, otimizador.propagadas, estado.removidos, estado.movidos)
+
+        with medidor.fase("geração") as fase:
+            resultado.code = GeradorCodigoVisitor(**self.opcoes_geracao).gerar_codigo(ast)
+            fase.contar("linhas", resultado.code.count("\n") + 1)
+
+
+def _registrando(tokens, lista):
+    """Repassa os tokens, guardando cada um em lista."""
+    for token in tokens:
+        lista.append(token)
+        yield token
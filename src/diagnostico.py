@@ -0,0 +1,145 @@
+# diagnostico.py
+"""
+Camada de diagnóstico do compilador: mensagens com nível, entregues a um
+destino plugável (nulo, stderr, arquivo ou memória).
+
+O padrão é silencioso: o Diagnostico PADRAO descarta tudo. Mensagens são
+formatadas apenas se o nível estiver ativo (os argumentos são passados
+separados, como em diag.debug("first({}) => {}", nt, conjunto)), e blocos
+caros de depuração devem ser protegidos com diag.ativo(DEBUG).
+"""
+import sys
+import threading
+from enum import IntEnum
+
+
+class Nivel(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    AVISO = 30
+    ERRO = 40
+    SILENCIO = 100 # Nenhuma mensagem passa
+
+
+DEBUG = Nivel.DEBUG
+INFO = Nivel.INFO
+AVISO = Nivel.AVISO
+ERRO = Nivel.ERRO
+SILENCIO = Nivel.SILENCIO
+
+
+# -- Destinos --
+
+class Destino:
+    """Interface dos destinos: recebem mensagens já formatadas."""
+
+    def escrever(self, nivel, mensagem):
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+
+class DestinoNulo(Destino):
+    """Descarta todas as mensagens."""
+
+    def escrever(self, nivel, mensagem):
+        pass
+
+
+class DestinoFluxo(Destino):
+    """Escreve cada mensagem, seguida de quebra de linha, em um fluxo de texto."""
+
+    def __init__(self, fluxo):
+        self.fluxo = fluxo
+        self._trava = threading.Lock()
+
+    def escrever(self, nivel, mensagem):
+        with self._trava:
+            self.fluxo.write(f"{mensagem}\n")
+
+
+class DestinoStderr(DestinoFluxo):
+    """Escreve em sys.stderr (consultado a cada mensagem, para respeitar redirecionamentos)."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def escrever(self, nivel, mensagem):
+        with self._trava:
+            sys.stderr.write(f"{mensagem}\n")
+
+
+class DestinoArquivo(DestinoFluxo):
+    """Acrescenta as mensagens a um arquivo, prefixadas pelo nível."""
+
+    def __init__(self, caminho, encoding="utf-8"):
+        super().__init__(open(caminho, "a", encoding=encoding, buffering=1))
+
+    def escrever(self, nivel, mensagem):
+        super().escrever(nivel, f"[{Nivel(nivel).name}] {mensagem}")
+
+    def fechar(self):
+        self.fluxo.close()
+
+
+class DestinoMemoria(Destino):
+    """Guarda as mensagens em registros, como pares (nível, mensagem)."""
+
+    def __init__(self):
+        self.registros = []
+        self._trava = threading.Lock()
+
+    def escrever(self, nivel, mensagem):
+        with self._trava:
+            self.registros.append((nivel, mensagem))
+
+    def mensagens(self, nivel_minimo=DEBUG):
+        return [mensagem for nivel, mensagem in self.registros if nivel >= nivel_minimo]
+
+    def texto(self):
+        return "\n".join(mensagem for _, mensagem in self.registros)
+
+
+# -- Diagnostico --
+
+class Diagnostico:
+    """
+    Filtra as mensagens por nível e as entrega ao destino. Com destino nulo
+    ou nível SILENCIO, nenhuma mensagem é formatada.
+    """
+
+    def __init__(self, nivel=SILENCIO, destino=None):
+        self.destino = destino or DestinoNulo()
+        self.nivel = Nivel(nivel) if not isinstance(self.destino, DestinoNulo) else SILENCIO
+
+    def ativo(self, nivel):
+        """Se mensagens deste nível chegam ao destino."""
+        return nivel >= self.nivel
+
+    def registrar(self, nivel, mensagem, *args):
+        if nivel >= self.nivel:
+            self.destino.escrever(nivel, mensagem.format(*args) if args else str(mensagem))
+
+    def debug(self, mensagem, *args):
+        if DEBUG >= self.nivel:
+            self.registrar(DEBUG, mensagem, *args)
+
+    def info(self, mensagem, *args):
+        if INFO >= self.nivel:
+            self.registrar(INFO, mensagem, *args)
+
+    def aviso(self, mensagem, *args):
+        if AVISO >= self.nivel:
+            self.registrar(AVISO, mensagem, *args)
+
+    def erro(self, mensagem, *args):
+        if ERRO >= self.nivel:
+            self.registrar(ERRO, mensagem, *args)
+
+    def fechar(self):
+        self.destino.fechar()
+
+
+# Diagnóstico usado quando nenhum é informado: silencioso.
+PADRAO = Diagnostico()
@@ -0,0 +1,121 @@
+# first_follow.py
+
+EPSILON = '#'
+FIM_ENTRADA = '$'
+
+
+class FirstFollow:
+    """
+    Cálculo dos conjuntos FIRST e FOLLOW por iteração de ponto fixo.
+
+    Cada terminal (incluindo '#' e '$') recebe um bit e os conjuntos são
+    inteiros usados como bitsets; os símbolos das produções são convertidos
+    para índices uma única vez. FIRST e FOLLOW de cada não-terminal são
+    calculados uma vez e o FIRST de cada sequência de símbolos fica em cache.
+    """
+
+    def __init__(self, diction, terminais):
+        self.nao_terminais = list(diction)
+        self._indice_nt = {nt: i for i, nt in enumerate(self.nao_terminais)}
+
+        self.terminais = list(dict.fromkeys(list(terminais) + [EPSILON, FIM_ENTRADA]))
+        self._bit = {t: 1 << i for i, t in enumerate(self.terminais)}
+        self._eps = self._bit[EPSILON]
+
+        # Produções como (índice do lado esquerdo, símbolos do lado direito)
+        self._producoes = [
+            (self._indice_nt[lhs], tuple(rhs))
+            for lhs, alternativas in diction.items()
+            for rhs in alternativas
+        ]
+        self._first = None
+        self._follow = None
+        self._cache_seq = {}
+
+    # -- FIRST --
+
+    def _first_mascara(self, simbolos):
+        """FIRST de uma sequência de símbolos, como bitset."""
+        first = self._first
+        resultado = 0
+        for simbolo in simbolos:
+            bit = self._bit.get(simbolo)
+            if bit is not None:
+                return resultado | bit
+            indice = self._indice_nt.get(simbolo)
+            if indice is None:
+                # Símbolo desconhecido: não contribui e interrompe a sequência
+                return resultado
+            resultado |= first[indice] & ~self._eps
+            if not first[indice] & self._eps:
+                return resultado
+        return resultado | self._eps
+
+    def _calcular_first(self):
+        self._first = [0] * len(self.nao_terminais)
+        mudou = True
+        while mudou:
+            mudou = False
+            for lhs, rhs in self._producoes:
+                novo = self._first[lhs] | self._first_mascara(rhs)
+                if novo != self._first[lhs]:
+                    self._first[lhs] = novo
+                    mudou = True
+
+    def _para_conjunto(self, mascara):
+        return {t for t, bit in self._bit.items() if mascara & bit}
+
+    def firsts(self):
+        """Dicionário não-terminal -> conjunto FIRST (como Parser.firsts)."""
+        if self._first is None:
+            self._calcular_first()
+        return {nt: self._para_conjunto(self._first[i]) for i, nt in enumerate(self.nao_terminais)}
+
+    def first_seq(self, simbolos):
+        """FIRST de uma sequência de símbolos (ex.: o lado direito de uma produção)."""
+        chave = tuple(simbolos)
+        resultado = self._cache_seq.get(chave)
+        if resultado is None:
+            if self._first is None:
+                self._calcular_first()
+            resultado = frozenset(self._para_conjunto(self._first_mascara(chave)))
+            self._cache_seq[chave] = resultado
+        return resultado
+
+    # -- FOLLOW --
+
+    def _calcular_follow(self, start_symbol):
+        if self._first is None:
+            self._calcular_first()
+        follow = [0] * len(self.nao_terminais)
+        if start_symbol in self._indice_nt:
+            follow[self._indice_nt[start_symbol]] = self._bit[FIM_ENTRADA]
+
+        # Contribuições fixas (FIRST do que vem depois do símbolo) entram uma
+        # vez; as que dependem de FOLLOW(lhs) viram arestas propagadas até o
+        # ponto fixo.
+        arestas = []
+        for lhs, rhs in self._producoes:
+            for i, simbolo in enumerate(rhs):
+                indice = self._indice_nt.get(simbolo)
+                if indice is None:
+                    continue
+                sufixo = self._first_mascara(rhs[i + 1:])
+                follow[indice] |= sufixo & ~self._eps
+                if sufixo & self._eps and indice != lhs:
+                    arestas.append((lhs, indice))
+
+        mudou = True
+        while mudou:
+            mudou = False
+            for origem, destino in arestas:
+                novo = follow[destino] | follow[origem]
+                if novo != follow[destino]:
+                    follow[destino] = novo
+                    mudou = True
+        self._follow = follow
+
+    def follows(self, start_symbol):
+        """Dicionário não-terminal -> conjunto FOLLOW (como Parser.follows)."""
+        self._calcular_follow(start_symbol)
+        return {nt: self._para_conjunto(self._follow[i]) for i, nt in enumerate(self.nao_terminais)}
@@ -1,13 +1,64 @@
-from utils import NodeVisitor
-from typing import List, Dict, Any
+from utils import NodeVisitor, tabela_de_despacho
+from typing import List
+from ast_nodes import (
+  No, Program, VarDecl, Assign, Repeat, While, If, Call, BinOp, Name, Literal,
+  PRECEDENCIA, OPERADORES_RELACIONAIS,
+)
+from lowering import lower
+
+# Métodos usados por cada comando no modo em_funcao: (objeto, método), onde
+# o objeto é a tartaruga ou a tela.
+METODOS_TARTARUGA = {
+  "avancar": ("tartaruga", "forward"),
+  "recuar": ("tartaruga", "backward"),
+  "girar_direita": ("tartaruga", "right"),
+  "girar_esquerda": ("tartaruga", "left"),
+  "ir_para": ("tartaruga", "goto"),
+  "levantar_caneta": ("tartaruga", "penup"),
+  "abaixar_caneta": ("tartaruga", "pendown"),
+  "definir_cor": ("tartaruga", "color"),
+  "definir_espessura": ("tartaruga", "pensize"),
+  "cor_de_fundo": ("tela", "bgcolor"),
+  "limpar_tela": ("tartaruga", "clear"),
+}
+
+# Perfis de renderização: "interativo" anima cada traço (como antes);
+# "rapido" desliga a animação e redesenha a tela só no fim (ou a cada
+# intervalo_atualizacao traços); "lote" é o "rapido" que, em vez de esperar
+# o usuário fechar a janela, opcionalmente salva a imagem e encerra.
+PERFIS = ("interativo", "rapido", "lote")
 
 class GeradorCodigoVisitor(NodeVisitor):
   """
-  Percorre a AST (do parser) e gera código Python para biblioteca turtle.
+  Percorre a AST (ast_nodes) e gera código Python para biblioteca turtle.
+
+  Com em_funcao=True o programa vai para dentro de uma função main(): as
+  variáveis viram locais, os métodos usados são ligados uma vez a nomes
+  locais (ex.: avancar = tartaruga.forward) e todos os comandos usam uma
+  única tartaruga (no modo padrão, desenhar_quadrado e desenhar_circulo
+  usam uma segunda tartaruga, 'tela').
+
+  perfil escolhe a renderização (ver PERFIS); com "rapido" e "lote",
+  intervalo_atualizacao > 0 redesenha a tela a cada tantos traços, e no
+  perfil "lote" imagem é o arquivo PostScript onde o desenho é salvo.
+
+  Comandos com geração própria (comando_<cmd>) ficam em uma tabela por
+  classe, como os visit_*.
   """
-  def __init__(self):
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls._comandos_especiais = tabela_de_despacho(cls, "comando_")
+
+  def __init__(self, em_funcao: bool = False, perfil: str = "interativo",
+               intervalo_atualizacao: int = 0, imagem: str = None):
+    if perfil not in PERFIS:
+      raise ValueError(f"Perfil de renderização desconhecido: '{perfil}' (use {', '.join(PERFIS)})")
     self.codigo: List[str] = []
     self.indent_level: int = 0
+    self.em_funcao = em_funcao
+    self.perfil = perfil
+    self.intervalo_atualizacao = intervalo_atualizacao
+    self.imagem = imagem
     
     self.mapa_comandos_turtle = {
       "avancar": "turtle.forward",
@@ -25,199 +76,250 @@ class GeradorCodigoVisitor(NodeVisitor):
       "desenhar_circulo": "desenhar_circulo"
     }
   
-  def gerar_codigo(self, ast_raiz: Dict[str, Any]) -> str:
+  def gerar_codigo(self, ast_raiz) -> str:
+    """Gera o código a partir da AST (ou da árvore de derivação, que é convertida antes)."""
+    if self.em_funcao:
+      return self._gerar_em_funcao(lower(ast_raiz))
     self.codigo = [
       "import turtle",
       "import math",
       "",
       "tela = turtle.Turtle()",
-      "turtle.speed('fast')",
+      *self._inicio_renderizacao("turtle", ["turtle", "tela"]),
       "",
     ]
-    self.visit(ast_raiz)
-    self.codigo.append("\nturtle.done()")
+    self.visit(lower(ast_raiz))
+    self.codigo.append("")
+    self.codigo += self._fim_renderizacao("turtle", "turtle")
     return "\n".join(self.codigo)
+
+  def _inicio_renderizacao(self, tela: str, tartarugas: List[str]) -> List[str]:
+    """Configuração da animação: tela é o objeto com tracer/update."""
+    if self.perfil == "interativo":
+      return [f"{tartaruga}.speed('fast')" for tartaruga in tartarugas[:1]]
+    linhas = [f"{tela}.tracer({self.intervalo_atualizacao}, 0)"]
+    for tartaruga in tartarugas:
+      linhas += [f"{tartaruga}.speed(0)", f"{tartaruga}.hideturtle()"]
+    return linhas
+
+  def _fim_renderizacao(self, tela: str, modulo: str) -> List[str]:
+    """Últimas linhas: atualiza a tela e espera a janela ser fechada (ou salva e encerra)."""
+    if self.perfil == "interativo":
+      return [f"{modulo}.done()"]
+    linhas = [f"{tela}.update()"]
+    if self.perfil == "rapido":
+      return linhas + [f"{modulo}.done()"]
+    if self.imagem:
+      linhas.append(f"{tela}.getcanvas().postscript(file={self.imagem!r})")
+    return linhas + [f"{tela}.bye()"]
   
+  def _gerar_em_funcao(self, programa: Program) -> str:
+    # Nomes do código gerado não podem coincidir com os das variáveis,
+    # que seriam locais de main(). Os apelidos dos comandos usam os
+    # próprios nomes dos comandos, que são palavras reservadas do TurtleScript.
+    self._ocupados = {no.name for no in _declaracoes(programa)}
+    self._apelidos = {}
+    self._auxiliares = {}
+    modulo = self._nome_livre("turtle")
+    tartaruga = self._nome_livre("tartaruga")
+    tela = self._nome_livre("tela")
+    main = self._nome_livre("main")
+    self._objetos = {"tartaruga": tartaruga, "tela": tela}
+
+    self.codigo = []
+    self.indent_level = 1
+    self.visit(programa)
+    corpo = self.codigo
+
+    importacao = "import turtle" if modulo == "turtle" else f"import turtle as {modulo}"
+    self.codigo = [
+      importacao,
+      "",
+      "",
+      f"def {main}():",
+      f"    {tartaruga} = {modulo}.Turtle()",
+      f"    {tela} = {tartaruga}.getscreen()",
+    ]
+    self.codigo += [f"    {linha}" for linha in self._inicio_renderizacao(tela, [tartaruga])]
+    self.codigo += [f"    {apelido} = {metodo}" for apelido, metodo in self._apelidos.items()]
+    self.codigo += [""] + corpo + [""]
+    self.codigo += [f"    {linha}" for linha in self._fim_renderizacao(tela, modulo)]
+    self.codigo += [
+      "",
+      "",
+      'if __name__ == "__main__":',
+      f"    {main}()",
+    ]
+    return "\n".join(self.codigo)
+
+  def _nome_livre(self, nome: str) -> str:
+    """nome, ou nome seguido de '_' o bastante para não coincidir com outro nome do programa."""
+    while nome in self._ocupados:
+      nome += "_"
+    self._ocupados.add(nome)
+    return nome
+
+  def _comando(self, cmd: str) -> str:
+    """Nome local do método do comando cmd: o próprio nome do comando."""
+    if cmd not in self._apelidos:
+      objeto, metodo = METODOS_TARTARUGA[cmd]
+      self._apelidos[cmd] = f"{self._objetos[objeto]}.{metodo}"
+    return cmd
+
+  def _auxiliar(self, metodo: str) -> str:
+    """Nome local de um método da tartaruga que não é de nenhum comando (ex.: begin_fill)."""
+    apelido = self._auxiliares.get(metodo)
+    if apelido is None:
+      apelido = self._auxiliares[metodo] = self._nome_livre(metodo)
+      self._apelidos[apelido] = f"{self._objetos['tartaruga']}.{metodo}"
+    return apelido
+
+  def visit(self, node):
+    """
+    Depois de lower só há nós de ast_nodes: o despacho vai direto à tabela
+    pela classe do nó, sem o teste de dicionário de NodeVisitor.visit.
+    """
+    visitor = self._visitantes.get(type(node).__name__)
+    if visitor is None:
+      return self.generic_visit(node)
+    return visitor(self, node)
+
   def _indentador(self) -> str:
     return "    " * self.indent_level
   
   def _add_linha(self, linha: str) -> None:
     self.codigo.append(f"{self._indentador()}{linha}")
 
-  def generic_visit(self, node: Dict[str, Any]):
-    """Visita os filhos de um nó genérico."""
-    for filho in node.get("filhos", []):
-      self.visit(filho)
-
-  # Handlers para a estrutura da gramática (não geram código, apenas atravessam)
-  def visit_S(self, node): self.generic_visit(node)
-  def visit_B(self, node): self.generic_visit(node)
-  def visit_CMDS(self, node): self.generic_visit(node)
-  def visit_CMD(self, node): self.generic_visit(node)
-  def visit_TYPE(self, node): self.generic_visit(node)
-  def visit_ATT(self, node): self.generic_visit(node)
-  def visit_SE_CONT(self, node): self.generic_visit(node)
-  def visit_OP_REL(self, node): self.generic_visit(node)
-
-
-  def visit_DECL(self, node: Dict[str, Any]):
-    type_node = node['filhos'][1]
-    id_node = node['filhos'][3]
-    
-    var_type = type_node['filhos'][0]['tag']
-    var_name = self.visit(id_node)
+  def _bloco(self, comandos: List[No]) -> None:
+    """Gera um bloco indentado; blocos vazios recebem 'pass'."""
+    self.indent_level += 1
+    for comando in comandos:
+      self.visit(comando)
+    if not comandos:
+      self._add_linha("pass")
+    self.indent_level -= 1
 
+  def visit_Program(self, node: Program):
+    for comando in node.body:
+      self.visit(comando)
+
+  def visit_VarDecl(self, node: VarDecl):
     valor_inicial = "None"
-    if var_type == "inteiro" or var_type == "real": valor_inicial = "0"
-    elif var_type == "texto": valor_inicial = '""'
-    elif var_type == "logico": valor_inicial = "False"
-    self._add_linha(f"{var_name} = {valor_inicial}")
-
-  def visit_ATR(self, node: Dict[str, Any]):
-    att_node = node['filhos'][0]
-    var_name = self.visit(att_node['filhos'][0])
-    expr_val = self.visit(att_node['filhos'][2])
-    self._add_linha(f"{var_name} = {expr_val}")
-
-  def visit_REL(self, node):
-    lhs = self.visit(node['filhos'][0]) or ""
-    rhs = self.visit(node['filhos'][1]) or ""
-    return f"{lhs}{rhs}"
-    
-  def visit_REL_prime(self, node):
-    if not node.get('filhos'): return ""
-    op = self.visit(node['filhos'][0]) or ""
-    rhs = self.visit(node['filhos'][1]) or ""
-    rest = self.visit(node['filhos'][2]) or ""
-    return f" {op} {rhs}{rest}"
-
-  def visit_OP_REL(self, node):
-    return node['filhos'][0].get('valor', '')
-
-  def visit_ADD(self, node):
-    lhs = self.visit(node['filhos'][0]) or ""
-    rhs = self.visit(node['filhos'][1]) or ""
-    return f"{lhs}{rhs}"
-    
-  def visit_ADD_prime(self, node):
-    if not node.get('filhos'): return ""
-    op = node['filhos'][0].get('valor', '')
-    rhs = self.visit(node['filhos'][1]) or ""
-    rest = self.visit(node['filhos'][2]) or ""
-    return f" {op} {rhs}{rest}"
-
-  def visit_MUL(self, node):
-    lhs = self.visit(node['filhos'][0]) or ""
-    rhs = self.visit(node['filhos'][1]) or ""
-    return f"{lhs}{rhs}"
-
-  def visit_MUL_prime(self, node):
-    if not node.get('filhos'): return ""
-    op = node['filhos'][0].get('valor', '')
-    rhs = self.visit(node['filhos'][1]) or ""
-    rest = self.visit(node['filhos'][2]) or ""
-    return f" {op} {rhs}{rest}"
-
-  def visit_FACTOR(self, node):
-    child = node['filhos'][0]
-    if child['tag'] == '(':
-        return f"({self.visit(node['filhos'][1])})"
+    if node.var_type == "inteiro" or node.var_type == "real": valor_inicial = "0"
+    elif node.var_type == "texto": valor_inicial = '""'
+    elif node.var_type == "logico": valor_inicial = "False"
+    self._add_linha(f"{node.name} = {valor_inicial}")
+
+  def visit_Assign(self, node: Assign):
+    self._add_linha(f"{node.name} = {self.visit(node.value)}")
+
+  # -- Expressões --
+
+  def _operando(self, node: No, precedencia: int, direita: bool) -> str:
+    """
+    Código de um operando de BinOp, entre parênteses quando necessário para
+    manter a árvore: operandos de menor precedência, operandos à direita de
+    mesma precedência (a - (b - c)) e comparações, que o Python encadearia.
+    """
+    codigo = self.visit(node)
+    if isinstance(node, BinOp):
+      p = PRECEDENCIA[node.op]
+      if p < precedencia or (direita and p == precedencia) or node.op in OPERADORES_RELACIONAIS:
+        return f"({codigo})"
+    return codigo
+
+  def visit_BinOp(self, node: BinOp):
+    p = PRECEDENCIA[node.op]
+    lhs = self._operando(node.left, p, False)
+    rhs = self._operando(node.right, p, True)
+    return f"{lhs} {node.op} {rhs}"
+
+  def visit_Name(self, node: Name): return node.name
+
+  def visit_Literal(self, node: Literal):
+    if node.kind == "texto": return f"\"{node.value}\""
+    if node.kind == "logico": return "True" if node.value else "False"
+    return f"{node.value}"
+
+  # -- Comandos --
+
+  def visit_Call(self, node: Call):
+    especial = self._comandos_especiais.get(node.cmd)
+    if especial is not None:
+      especial(self, node)
+    elif self.em_funcao:
+      if node.cmd in METODOS_TARTARUGA:
+        args = ", ".join(self.visit(arg) for arg in node.args)
+        self._add_linha(f"{self._comando(node.cmd)}({args})")
     else:
-        return self.visit(child)
-
-  def visit_ID(self, node): return node['filhos'][0]['valor']
-  def visit_NUM(self, node): return node['filhos'][0]['valor']
-  def visit_TEXT(self, node): return f"\"{node['filhos'][0]['valor']}\""
-  def visit_BOOL(self, node):
-    val = node['filhos'][0]['valor']
-    return "True" if val == "verdadeiro" else "False"
-
-  def _visit_simple_cmd(self, node: Dict[str, Any]):
-    cmd_name = node['filhos'][0]['tag']
-    turtle_cmd = self.mapa_comandos_turtle.get(cmd_name)
-    if turtle_cmd:
-      if len(node['filhos']) > 1 and node['filhos'][1]['tag'] == 'REL':
-        arg_val = self.visit(node['filhos'][1])
-        self._add_linha(f"{turtle_cmd}({arg_val})")
-      else:
-        self._add_linha(f"{turtle_cmd}()")
-  
-  visit_AV = _visit_simple_cmd
-  visit_REC = _visit_simple_cmd
-  visit_GD = _visit_simple_cmd
-  visit_GE = _visit_simple_cmd
-  visit_DC = _visit_simple_cmd
-  visit_DE = _visit_simple_cmd
-  visit_CDF = _visit_simple_cmd
-  
-  def visit_LC(self, node): self._add_linha("turtle.penup()")
-  def visit_AC(self, node): self._add_linha("turtle.pendown()")
-  def visit_LP(self, node): self._add_linha("turtle.clear()")
-  
-  def visit_IRP(self, node):
-    arg1 = self.visit(node['filhos'][1])
-    arg2 = self.visit(node['filhos'][2])
-    self._add_linha(f"turtle.goto({arg1}, {arg2})")
+      turtle_cmd = self.mapa_comandos_turtle.get(node.cmd)
+      if turtle_cmd:
+        args = ", ".join(self.visit(arg) for arg in node.args)
+        self._add_linha(f"{turtle_cmd}({args})")
       
-  def visit_DSQ(self, node: Dict[str, Any]):
-    tamanho = self.visit(node["filhos"][1])
-    cor = self.visit(node["filhos"][2])
+  def _desenho(self, metodo: str) -> str:
+    """Método usado por desenhar_quadrado e desenhar_circulo."""
+    if not self.em_funcao:
+      return f"tela.{metodo}"
+    comando = {"color": "definir_cor", "forward": "avancar", "right": "girar_direita"}.get(metodo)
+    return self._comando(comando) if comando else self._auxiliar(metodo)
+
+  def comando_desenhar_quadrado(self, node: Call):
+    tamanho = self.visit(node.args[0])
+    cor = self.visit(node.args[1])
+    forward = self._desenho("forward")
       
-    self._add_linha(f"tela.color({cor})")
-    self._add_linha(f"tela.begin_fill()")
+    self._add_linha(f"{self._desenho('color')}({cor})")
+    self._add_linha(f"{self._desenho('begin_fill')}()")
     self._add_linha(f"for _ in range(4):")
     self.indent_level += 1
-    self._add_linha(f"tela.forward({tamanho})")
-    self._add_linha(f"tela.right(90)")
+    self._add_linha(f"{forward}({tamanho})")
+    self._add_linha(f"{self._desenho('right')}(90)")
     self.indent_level -= 1
-    self._add_linha(f"tela.forward({tamanho})")
-    self._add_linha(f"tela.end_fill()")
+    self._add_linha(f"{forward}({tamanho})")
+    self._add_linha(f"{self._desenho('end_fill')}()")
 
-  def visit_DSC(self, node: Dict[str, Any]):
-    raio = self.visit(node["filhos"][1])
-    cor_de_fundo = self.visit(node["filhos"][2])
-    cor_da_borda = self.visit(node["filhos"][3])
-    
-    self._add_linha(f"tela.color({cor_da_borda}, {cor_de_fundo})")
-    self._add_linha(f"tela.begin_fill()")
-    self._add_linha(f"tela.circle({raio})")
-    self._add_linha(f"tela.end_fill()")
-
-  def visit_REP(self, node: Dict[str, Any]):
-    num_vezes = self.visit(node['filhos'][1])
-    corpo_node = node['filhos'][3]
+  def comando_desenhar_circulo(self, node: Call):
+    raio = self.visit(node.args[0])
+    cor_de_fundo = self.visit(node.args[1])
+    cor_da_borda = self.visit(node.args[2])
     
-    self._add_linha(f"for _ in range(int({num_vezes})):")
-    self.indent_level += 1
-    self.visit(corpo_node)
-    self.indent_level -= 1
+    self._add_linha(f"{self._desenho('color')}({cor_da_borda}, {cor_de_fundo})")
+    self._add_linha(f"{self._desenho('begin_fill')}()")
+    self._add_linha(f"{self._desenho('circle')}({raio})")
+    self._add_linha(f"{self._desenho('end_fill')}()")
 
-  def visit_SE(self, node: Dict[str, Any]):
-    cond_node = node['filhos'][1]
-    then_node = node['filhos'][3]
-    se_cont_node = node['filhos'][4]
-    
-    cond_expr = self.visit(cond_node)
+  def visit_Repeat(self, node: Repeat):
+    num_vezes = self.visit(node.count)
+    # Com o tipo inferido (ou de uma constante) inteiro, a conversão é desnecessária
+    if node.count.tipo != "inteiro":
+      num_vezes = f"int({num_vezes})"
+    self._add_linha(f"for _ in range({num_vezes}):")
+    self._bloco(node.body)
+
+  def visit_If(self, node: If):
+    cond_expr = self.visit(node.cond)
     self._add_linha(f"if {cond_expr}:")
+    self._bloco(node.then)
     
-    self.indent_level += 1
-    self.visit(then_node)
-    self.indent_level -= 1
-    
-    if len(se_cont_node['filhos']) > 2:
-      else_node = se_cont_node['filhos'][1]
+    if node.orelse is not None:
       self._add_linha("else:")
-      self.indent_level += 1
-      self.visit(else_node)
-      self.indent_level -= 1
-    
-  def visit_ENQ(self, node: Dict[str, Any]):
-    cond_node = node['filhos'][1]
-    corpo_node = node['filhos'][3]
+      self._bloco(node.orelse)
     
-    cond_expr = self.visit(cond_node)
+  def visit_While(self, node: While):
+    cond_expr = self.visit(node.cond)
     self._add_linha(f"while {cond_expr}:")
-    
-    self.indent_level += 1
-    self.visit(corpo_node)
-    self.indent_level -= 1
+    self._bloco(node.body)
+
+
+GeradorCodigoVisitor._comandos_especiais = tabela_de_despacho(GeradorCodigoVisitor, "comando_")
+
+
+def _declaracoes(programa: Program):
+  """Gera as declarações de variáveis do programa, inclusive as de dentro de blocos."""
+  pendentes = [programa]
+  while pendentes:
+    no = pendentes.pop()
+    if isinstance(no, VarDecl):
+      yield no
+    pendentes.extend(no.iter_filhos())
@@ -0,0 +1,304 @@
+# gerador_parser.py
+"""
+Gerador de parser (executado em tempo de build).
+
+Lê a gramática de utils (rules, nonterm_userdef, term_userdef), constrói a
+tabela LL(1) com a mesma lógica de FIRST/FOLLOW do Parser e escreve um
+módulo Python independente com um parser descendente recursivo: uma função
+por não-terminal, que escolhe a produção pelo id do terminal do token atual
+e monta diretamente a árvore de derivação em dicionários, idêntica à de
+ASTParser.parse_with_ast. Produções recursivas à direita no último símbolo
+(CMDS -> CMD CMDS, ADD' -> + MUL ADD', ...) viram laços.
+
+    python gerador_parser.py [--saida parser_gerado.py] [--verificar]
+"""
+import os
+import sys
+import argparse
+
+from tokenizer import TokenType, nome_terminal
+from token_buffer import SEM_TERMINAL
+from parser import Parser
+from tabela_ll1 import VAZIA
+from cache_tabela import construir_tabela, hash_gramatica
+from utils import rules, nonterm_userdef, term_userdef, escrever_atomicamente
+
+SAIDA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser_gerado.py")
+
+# Não-terminais com pelo menos este número de produções de um único símbolo
+# (como CMD -> AV | REC | ...) escolhem a produção por um dicionário.
+MIN_DESPACHO = 4
+
+
+def _tag(simbolo):
+    return simbolo.replace("'", "_prime")
+
+
+def _funcao(simbolo):
+    return f"_p_{_tag(simbolo)}"
+
+
+class GeradorParser:
+    """Gera o código do parser a partir da TabelaLL1 de uma gramática."""
+
+    def __init__(self, rules, nonterm_userdef, term_userdef):
+        self.hash = hash_gramatica(rules, nonterm_userdef, term_userdef)
+        parser = Parser(rules, nonterm_userdef, term_userdef)
+        _, is_LL1, self.terminais = construir_tabela(parser)
+        self.tabela = parser.tabela
+        if not is_LL1:
+            conflitos = ", ".join(f"[{c.nao_terminal}][{c.terminal}]" for c in self.tabela.conflitos)
+            raise ValueError(f"A gramática não é LL(1): conflitos em {conflitos}")
+        self.inicial = parser.start_symbol
+        self.conjuntos = {} # frozenset de ids -> nome da constante gerada
+        self.despachos = [] # (nome do dicionário, {id do terminal: função})
+
+    # -- Análise da tabela --
+
+    def alternativas(self, nao_terminal):
+        """Produções usadas de um não-terminal, com os ids de terminal que as escolhem."""
+        tabela = self.tabela
+        n = tabela.codigo(nao_terminal) - tabela.num_terminais
+        por_producao = {}
+        for t in range(tabela.num_terminais):
+            p = tabela.celulas[n * tabela.num_terminais + t]
+            if p != VAZIA:
+                por_producao.setdefault(p, []).append(t)
+        return [(tabela.producoes[p][1], frozenset(ids)) for p, ids in sorted(por_producao.items())]
+
+    def condicao(self, ids):
+        if len(ids) == 1:
+            return f"y == {next(iter(ids))}"
+        nome = self.conjuntos.get(ids)
+        if nome is None:
+            nome = self.conjuntos[ids] = f"_C{len(self.conjuntos)}"
+        return f"y in {nome}"
+
+    # -- Código --
+
+    def filhos(self, rhs, recuo):
+        """Linhas que reconhecem os símbolos de rhs em f0, f1, ... e a lista dos nomes."""
+        tabela = self.tabela
+        linhas = []
+        if any(s >= tabela.num_terminais for s in rhs):
+            linhas.append(f"{recuo}l = s.tok.line")
+        nomes = []
+        for i, simbolo in enumerate(rhs):
+            nome = f"f{i}"
+            if simbolo < tabela.num_terminais:
+                linhas.append(f"{recuo}{nome} = _casar(s, {simbolo})")
+            else:
+                linhas.append(f"{recuo}{nome} = {_funcao(tabela.simbolos[simbolo])}(s, l)")
+            nomes.append(nome)
+        return linhas, nomes
+
+    def funcao_simples(self, nao_terminal, alternativas):
+        tag = _tag(nao_terminal)
+        linhas = [f"def {_funcao(nao_terminal)}(s, linha):", "    y = s.y"]
+        for i, (rhs, ids) in enumerate(alternativas):
+            producao = f"{nao_terminal} -> {' '.join(self.tabela.simbolos[x] for x in rhs) or '#'}"
+            linhas.append(f"    {'if' if i == 0 else 'elif'} {self.condicao(ids)}: # {producao}")
+            if not rhs:
+                linhas.append(f"        return {{\"tag\": \"{tag}\", \"linha\": linha}}")
+                continue
+            corpo, nomes = self.filhos(rhs, " " * 8)
+            linhas += corpo
+            linhas.append(f"        return {{\"tag\": \"{tag}\", \"linha\": linha, \"filhos\": [{', '.join(nomes)}]}}")
+        linhas.append(f"    _erro_regra(s, {nao_terminal!r})")
+        return linhas
+
+    def funcao_laco(self, nao_terminal, alternativas):
+        """X -> ... X vira um laço que encadeia os nós X (sem recursão)."""
+        tabela = self.tabela
+        codigo = tabela.codigo(nao_terminal)
+        tag = _tag(nao_terminal)
+        linhas = [
+            f"def {_funcao(nao_terminal)}(s, linha):",
+            f"    raiz = no = {{\"tag\": \"{tag}\", \"linha\": linha}}",
+            "    while True:",
+            "        y = s.y",
+        ]
+        for i, (rhs, ids) in enumerate(alternativas):
+            producao = f"{nao_terminal} -> {' '.join(tabela.simbolos[x] for x in rhs) or '#'}"
+            linhas.append(f"        {'if' if i == 0 else 'elif'} {self.condicao(ids)}: # {producao}")
+            if not rhs:
+                linhas.append("            return raiz")
+            elif rhs[-1] == codigo:
+                corpo, nomes = self.filhos(rhs[:-1], " " * 12)
+                if not any(s >= tabela.num_terminais for s in rhs[:-1]):
+                    corpo.insert(0, "            l = s.tok.line")
+                linhas += corpo
+                linhas.append(f"            prox = {{\"tag\": \"{tag}\", \"linha\": l}}")
+                linhas.append(f"            no[\"filhos\"] = [{', '.join(nomes + ['prox'])}]")
+                linhas.append("            no = prox")
+            else:
+                corpo, nomes = self.filhos(rhs, " " * 12)
+                linhas += corpo
+                linhas.append(f"            no[\"filhos\"] = [{', '.join(nomes)}]")
+                linhas.append("            return raiz")
+        linhas.append("        else:")
+        linhas.append(f"            _erro_regra(s, {nao_terminal!r})")
+        return linhas
+
+    def funcao_despacho(self, nao_terminal, alternativas):
+        """Todas as produções têm um único símbolo: escolhe por dicionário."""
+        tabela = self.tabela
+        nome = f"_D_{_tag(nao_terminal)}"
+        despacho = {}
+        for rhs, ids in alternativas:
+            simbolo = rhs[0]
+            funcao = "_casar_atual" if simbolo < tabela.num_terminais else _funcao(tabela.simbolos[simbolo])
+            for t in ids:
+                despacho[t] = funcao
+        self.despachos.append((nome, despacho))
+        return [
+            f"def {_funcao(nao_terminal)}(s, linha):",
+            f"    f = {nome}.get(s.y)",
+            "    if f is None:",
+            f"        _erro_regra(s, {nao_terminal!r})",
+            f"    return {{\"tag\": \"{_tag(nao_terminal)}\", \"linha\": linha, \"filhos\": [f(s, s.tok.line)]}}",
+        ]
+
+    def funcao(self, nao_terminal):
+        alternativas = self.alternativas(nao_terminal)
+        codigo = self.tabela.codigo(nao_terminal)
+        if any(rhs and rhs[-1] == codigo for rhs, _ in alternativas):
+            return self.funcao_laco(nao_terminal, alternativas)
+        if len(alternativas) >= MIN_DESPACHO and all(len(rhs) == 1 for rhs, _ in alternativas):
+            return self.funcao_despacho(nao_terminal, alternativas)
+        return self.funcao_simples(nao_terminal, alternativas)
+
+    def gerar(self):
+        """Código-fonte do módulo do parser."""
+        tabela = self.tabela
+        funcoes = []
+        for nao_terminal in tabela.nao_terminais:
+            funcoes += self.funcao(nao_terminal) + ["", ""]
+
+        posicao = {nome: i for i, nome in enumerate(self.terminais)}
+        ids_por_tipo = ",\n".join(
+            f"    TokenType.{tipo.name}: {posicao.get(nome_terminal(tipo), SEM_TERMINAL)}" for tipo in TokenType)
+
+        linhas = [
+            "# parser_gerado.py",
+            "# Gerado por gerador_parser.py a partir de utils.rules. Não edite à mão:",
+            "# altere a gramática e execute `python gerador_parser.py`.",
+            '"""',
+            "Parser descendente recursivo gerado para a gramática do TurtleScript.",
+            "",
+            "parse(tokens) devolve a mesma árvore de derivação (dicionários) que",
+            "ASTParser.parse_with_ast e lança os mesmos SyntaxError, sem construir a",
+            "tabela LL(1) nem processar a gramática ao ser importado.",
+            '"""',
+            "from tokenizer import Token, TokenType, ErroSintatico, nome_terminal",
+            "from token_buffer import TokenBuffer, SEM_TERMINAL",
+            "from utils import pausar_coletor",
+            "from instrumentacao import NULO",
+            "",
+            f"HASH_GRAMATICA = {self.hash!r}",
+            "",
+            f"TERMINAIS = {self.terminais!r}",
+            "",
+            "# Id do terminal (posição em TERMINAIS) de cada TokenType",
+            "ID_POR_TIPO = {",
+            ids_por_tipo,
+            "}",
+            "",
+            f"_FIM = ({posicao['$']}, Token(TokenType.EOF, '$', -1))",
+            "",
+        ]
+        for ids, nome in sorted(self.conjuntos.items(), key=lambda item: int(item[1][2:])):
+            linhas.append(f"{nome} = frozenset({sorted(ids)!r})")
+        linhas += [
+            "",
+            "",
+            "class _Entrada:",
+            "    \"\"\"Token atual (tok), id do seu terminal (y) e os pares (id, token) restantes.\"\"\"",
+            "    __slots__ = (\"y\", \"tok\", \"pares\")",
+            "",
+            "    def __init__(self, pares):",
+            "        self.pares = pares",
+            "        self.y, self.tok = next(pares, _FIM)",
+            "",
+            "",
+            "def _nome_atual(s):",
+            "    return TERMINAIS[s.y] if s.y != SEM_TERMINAL else nome_terminal(s.tok.type)",
+            "",
+            "",
+            "def _erro_regra(s, regra):",
+            "    raise ErroSintatico(f\"Erro de Sintaxe: Token inesperado '{_nome_atual(s)}' para a regra '{regra}' na linha {s.tok.line}\", s.tok.line)",
+            "",
+            "",
+            "def _casar(s, esperado):",
+            "    if s.y != esperado:",
+            "        raise ErroSintatico(f\"Erro de Sintaxe: Esperado '{TERMINAIS[esperado]}', mas encontrou '{_nome_atual(s)}' na linha {s.tok.line}\", s.tok.line)",
+            "    tok = s.tok",
+            "    no = {\"tag\": TERMINAIS[esperado], \"linha\": tok.line, \"valor\": tok.literal}",
+            "    s.y, s.tok = next(s.pares, _FIM)",
+            "    return no",
+            "",
+            "",
+            "def _casar_atual(s, linha):",
+            "    return _casar(s, s.y)",
+            "",
+            "",
+        ]
+        linhas += funcoes
+        for nome, despacho in self.despachos:
+            itens = ", ".join(f"{t}: {f}" for t, f in sorted(despacho.items()))
+            linhas.append(f"{nome} = {{{itens}}}")
+        linhas += [
+            "",
+            "",
+            "def parse(tokens, medidor=NULO):",
+            "    \"\"\"",
+            "    Árvore de derivação de um iterável de tokens (lista, TokenBuffer ou",
+            "    gerador). Os tokens são consumidos sob demanda; tokens depois do fim",
+            "    do programa são ignorados. O tempo de parsing é registrado na fase",
+            "    \"sintático\" do medidor (ver instrumentacao.py). A árvore já é montada",
+            "    em dicionários: a fase \"to_dict\" do ASTParser aparece com tempo zero.",
+            "    \"\"\"",
+            "    if isinstance(tokens, TokenBuffer):",
+            "        pares = zip(tokens.ids_terminais(TERMINAIS), tokens)",
+            "    else:",
+            "        pares = ((ID_POR_TIPO[tok.type], tok) for tok in tokens)",
+            "    with pausar_coletor(), medidor.fase(\"sintático\"):",
+            f"        arvore = {_funcao(self.inicial)}(_Entrada(pares), 1)",
+            "    medidor.fase(\"to_dict\")",
+            "    return arvore",
+            "",
+        ]
+        return "\n".join(linhas)
+
+
+def gerar_parser(rules=rules, nonterm_userdef=nonterm_userdef, term_userdef=term_userdef):
+    """Código-fonte do módulo do parser para a gramática."""
+    return GeradorParser(rules, nonterm_userdef, term_userdef).gerar()
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--saida", default=SAIDA_PADRAO, help="arquivo do módulo gerado (padrão: parser_gerado.py)")
+    args.add_argument("--verificar", action="store_true",
+                      help="não escreve nada; falha se o arquivo gerado estiver desatualizado")
+    opcoes = args.parse_args()
+
+    codigo = gerar_parser()
+    if opcoes.verificar:
+        try:
+            with open(opcoes.saida, encoding="utf-8") as arquivo:
+                atual = arquivo.read()
+        except FileNotFoundError:
+            atual = None
+        if atual != codigo:
+            print(f"{opcoes.saida} está desatualizado; execute `python gerador_parser.py`.")
+            sys.exit(1)
+        print(f"{opcoes.saida} está atualizado.")
+        return
+
+    escrever_atomicamente(opcoes.saida, codigo)
+    print(f"Parser gerado em {opcoes.saida}")
+
+
+if __name__ == "__main__":
+    main()
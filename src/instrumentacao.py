@@ -0,0 +1,134 @@
+# instrumentacao.py
+"""
+Instrumentação das fases do compilador: tempo de relógio, tempo de CPU, pico
+de memória alocada (tracemalloc) e contagens de cada fase.
+
+    medidor = Medidor()
+    with medidor.fase("léxico") as fase:
+        tokens = list(tokenizer.iter_tokens())
+        fase.contar("tokens", len(tokens))
+    print(medidor.tabela())
+
+Quem não mede usa NULO, cujas fases não fazem nada: o custo fica em uma
+chamada de método por fase. As fases não devem ser aninhadas (o pico de
+memória de uma fase é medido a partir do seu início).
+"""
+import time
+import tracemalloc
+
+
+class Fase:
+    """Medidas de uma fase; usada como gerenciador de contexto."""
+
+    def __init__(self, nome, memoria):
+        self.nome = nome
+        self.wall = 0.0 # segundos
+        self.cpu = 0.0 # segundos de CPU do processo
+        self.memoria = None # pico de memória alocada durante a fase, em bytes (None sem tracemalloc)
+        self.contagens = {}
+        self._memoria = memoria
+
+    def contar(self, nome, valor):
+        self.contagens[nome] = self.contagens.get(nome, 0) + valor
+
+    def __enter__(self):
+        if self._memoria:
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = time.process_time() - self._cpu
+        if self._memoria:
+            self.memoria = max(tracemalloc.get_traced_memory()[1] - self._memoria_inicial, 0)
+        return False
+
+    def para_dict(self):
+        return {"phase": self.nome, "wall": self.wall, "cpu": self.cpu,
+                "peak_memory": self.memoria, "counts": dict(self.contagens)}
+
+
+class Medidor:
+    """
+    Guarda as fases medidas, na ordem em que rodaram. Com memoria=True o
+    tracemalloc é ligado (se ainda não estiver) até encerrar(); ele deixa o
+    código bem mais lento, então os tempos medidos junto com a memória
+    servem apenas para comparar as fases entre si.
+    """
+    ativo = True
+
+    def __init__(self, memoria=True):
+        self.fases = []
+        self.memoria = memoria
+        self._iniciou_tracemalloc = memoria and not tracemalloc.is_tracing()
+        if self._iniciou_tracemalloc:
+            tracemalloc.start()
+
+    def fase(self, nome):
+        fase = Fase(nome, self.memoria)
+        self.fases.append(fase)
+        return fase
+
+    def contar(self, nome_fase, nome, valor):
+        """Acrescenta uma contagem à última fase chamada nome_fase (se houver)."""
+        for fase in reversed(self.fases):
+            if fase.nome == nome_fase:
+                fase.contar(nome, valor)
+                return
+
+    def encerrar(self):
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def para_dict(self):
+        return {
+            "phases": [fase.para_dict() for fase in self.fases],
+            "total": {"wall": sum(fase.wall for fase in self.fases),
+                      "cpu": sum(fase.cpu for fase in self.fases)},
+        }
+
+    def tabela(self):
+        """As fases em uma tabela de texto, com uma linha de total."""
+        linhas = [f"{'fase':<18}{'tempo (ms)':>12}{'CPU (ms)':>12}{'memória (KiB)':>15}  contagens"]
+        for fase in self.fases:
+            memoria = f"{fase.memoria / 1024:15.1f}" if fase.memoria is not None else f"{'-':>15}"
+            contagens = ", ".join(f"{nome}={valor}" for nome, valor in fase.contagens.items())
+            linhas.append(f"{fase.nome:<18}{fase.wall * 1000:12.3f}{fase.cpu * 1000:12.3f}{memoria}  {contagens}")
+        total = self.para_dict()["total"]
+        linhas.append(f"{'total':<18}{total['wall'] * 1000:12.3f}{total['cpu'] * 1000:12.3f}")
+        return "\n".join(linhas)
+
+
+class _FaseNula:
+    def contar(self, nome, valor):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+class _MedidorNulo:
+    """Medidor que não mede nada (ver NULO)."""
+    ativo = False
+    fases = ()
+    _fase = _FaseNula()
+
+    def fase(self, nome):
+        return self._fase
+
+    def contar(self, nome_fase, nome, valor):
+        pass
+
+    def encerrar(self):
+        pass
+
+
+# Medidor usado quando nenhum é informado.
+NULO = _MedidorNulo()
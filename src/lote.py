@@ -0,0 +1,211 @@
+# lote.py
+"""
+Compilação em lote: compila muitos programas TurtleScript em uma única
+execução, com um único Compiler (o parser é escolhido e a tabela LL(1)
+montada uma só vez), distribuindo os arquivos entre processos de um
+ProcessPoolExecutor.
+
+As entradas podem ser arquivos, diretórios (percorridos recursivamente atrás
+de arquivos com a extensão dada), padrões glob ou um manifesto com um
+caminho ou padrão por linha. Cada saída é gravada ao lado da entrada, com a
+extensão .py, ou em --saida-dir preservando o caminho relativo.
+
+    python lote.py tests/ outros/*.txt --manifesto lista.txt --workers 4
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from tokenizer import MOTORES
+from gerador import PERFIS
+from compilador import Compiler
+from cache_compilacao import CacheCompilacao, LIMITE_PADRAO
+from utils import escrever_atomicamente
+from diagnostico import Diagnostico, DestinoStderr, AVISO
+
+# Compilador de cada processo trabalhador, preenchido por _iniciar_trabalhador.
+_compilador = None
+
+
+def _iniciar_trabalhador(compilador):
+    global _compilador
+    _compilador = compilador
+
+
+def _compilar_arquivo(tarefa):
+    """
+    Compila tarefa = (entrada, saida) e devolve
+    (entrada, saida, erro ou None, segundos, bytes lidos).
+    """
+    entrada, saida = tarefa
+    inicio = time.perf_counter()
+    tamanho = 0
+    try:
+        with open(entrada, "r", encoding="utf-8") as arquivo:
+            fonte = arquivo.read()
+        tamanho = len(fonte)
+        resultado = _compilador.compile(fonte, keep_tokens=False)
+        if resultado.ok:
+            escrever_atomicamente(saida, resultado.code)
+            erro = None
+        else:
+            erro = str(resultado.errors[0])
+    except OSError as e:
+        erro = f"Erro de E/S: {e}"
+    except Exception as e:
+        # Um arquivo com problema não pode interromper o lote
+        erro = f"Erro interno ({type(e).__name__}): {e}"
+    return entrada, saida, erro, time.perf_counter() - inicio, tamanho
+
+
+def ler_manifesto(caminho):
+    """Caminhos ou padrões de um manifesto (um por linha; '#' inicia comentário),
+    relativos ao diretório do manifesto."""
+    base = os.path.dirname(os.path.abspath(caminho))
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            linha = linha.split("#", 1)[0].strip()
+            if linha:
+                yield os.path.join(base, linha)
+
+
+def expandir_entradas(padroes, extensao=".txt"):
+    """
+    Lista de pares (arquivo, base) para os arquivos, diretórios e padrões
+    glob dados, sem repetições e na ordem em que aparecem. base é o diretório
+    em relação ao qual o caminho da saída é preservado em --saida-dir.
+    """
+    vistos = set()
+    encontrados = []
+
+    def adicionar(arquivo, base):
+        chave = os.path.abspath(arquivo)
+        if chave not in vistos:
+            vistos.add(chave)
+            encontrados.append((arquivo, base))
+
+    for padrao in padroes:
+        if os.path.isdir(padrao):
+            for raiz, diretorios, arquivos in os.walk(padrao):
+                diretorios.sort()
+                for nome in sorted(arquivos):
+                    if nome.endswith(extensao):
+                        adicionar(os.path.join(raiz, nome), padrao)
+        elif os.path.isfile(padrao):
+            adicionar(padrao, os.path.dirname(padrao))
+        else:
+            correspondencias = sorted(glob.glob(padrao, recursive=True))
+            if not correspondencias:
+                raise FileNotFoundError(f"nenhum arquivo corresponde a {padrao!r}")
+            for arquivo in correspondencias:
+                if os.path.isfile(arquivo):
+                    adicionar(arquivo, os.path.dirname(arquivo))
+    return encontrados
+
+
+def caminho_saida(arquivo, base, saida_dir=None):
+    """Arquivo .py gerado para arquivo: ao lado dele ou em saida_dir."""
+    if saida_dir is None:
+        destino = arquivo
+    else:
+        destino = os.path.join(saida_dir, os.path.relpath(arquivo, base or "."))
+    return os.path.splitext(destino)[0] + ".py"
+
+
+def compilar_lote(tarefas, compilador, workers=None, chunksize=None):
+    """
+    Compila as tarefas (entrada, saida) e gera os resultados de
+    _compilar_arquivo na mesma ordem. Com workers=1 tudo roda neste processo.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tarefas) <= 1:
+        _iniciar_trabalhador(compilador)
+        yield from map(_compilar_arquivo, tarefas)
+        return
+
+    # Lotes grandes o bastante para diluir o custo de comunicação, mas com
+    # algumas rodadas por processo para equilibrar a carga
+    chunksize = chunksize or max(1, len(tarefas) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_iniciar_trabalhador, initargs=(compilador,)) as executor:
+        yield from executor.map(_compilar_arquivo, tarefas, chunksize=chunksize)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("entradas", nargs="*", help="arquivos, diretórios ou padrões glob")
+    args.add_argument("--manifesto", action="append", default=[],
+                      help="arquivo com um caminho ou padrão por linha (pode ser repetido)")
+    args.add_argument("--extensao", default=".txt",
+                      help="extensão dos programas procurados nos diretórios (padrão: .txt)")
+    args.add_argument("--saida-dir", default=None,
+                      help="grava as saídas neste diretório em vez de ao lado das entradas")
+    args.add_argument("--workers", type=int, default=None,
+                      help="número de processos (padrão: número de CPUs; 1 compila neste processo)")
+    args.add_argument("--chunksize", type=int, default=None,
+                      help="arquivos enviados a um processo por vez (padrão: automático)")
+    args.add_argument("--lexer", choices=list(MOTORES), default="regex",
+                      help="motor do analisador léxico (padrão: regex)")
+    args.add_argument("--parser", choices=["gerado", "tabela"], default="gerado",
+                      help="parser gerado (padrão) ou ASTParser dirigido pela tabela LL(1)")
+    args.add_argument("--em-funcao", action="store_true",
+                      help="gera os programas dentro de uma função main() (ver main.py)")
+    args.add_argument("--otimizar", action="store_true",
+                      help="otimiza os programas antes de gerar o código (ver main.py)")
+    args.add_argument("--perfil", choices=list(PERFIS), default="interativo",
+                      help="renderização dos programas gerados (ver main.py)")
+    args.add_argument("--intervalo-atualizacao", type=int, default=0, metavar="N",
+                      help="com --perfil rapido ou lote, redesenha a tela a cada N traços")
+    args.add_argument("--cache-dir", default=None,
+                      help="diretório do cache da tabela LL(1) e das saídas (padrão: ~/.cache/turtlescript)")
+    args.add_argument("--sem-cache", action="store_true",
+                      help="não usa o cache de compilação: recompila todos os arquivos")
+    args.add_argument("--cache-max-mb", type=float, default=LIMITE_PADRAO / 2**20,
+                      help="tamanho máximo do cache de compilação, em MiB (padrão: %(default)g)")
+    args.add_argument("-q", "--quieto", action="store_true",
+                      help="mostra apenas os arquivos com erro e o resumo")
+    opcoes = args.parse_args()
+
+    diag = Diagnostico(AVISO, DestinoStderr())
+    padroes = list(opcoes.entradas)
+    try:
+        for manifesto in opcoes.manifesto:
+            padroes.extend(ler_manifesto(manifesto))
+        arquivos = expandir_entradas(padroes, opcoes.extensao)
+    except OSError as e:
+        diag.erro("Erro: {}", e)
+        return 2
+    if not arquivos:
+        diag.erro("Erro: nenhum arquivo de entrada.")
+        return 2
+
+    inicio = time.perf_counter()
+    cache = None if opcoes.sem_cache else CacheCompilacao(opcoes.cache_dir, int(opcoes.cache_max_mb * 2**20))
+    compilador = Compiler(opcoes.parser, opcoes.lexer, cache, diag, cache_dir=opcoes.cache_dir,
+                          em_funcao=opcoes.em_funcao, perfil=opcoes.perfil,
+                          intervalo_atualizacao=opcoes.intervalo_atualizacao, otimizar=opcoes.otimizar)
+    tarefas = [(arquivo, caminho_saida(arquivo, base, opcoes.saida_dir)) for arquivo, base in arquivos]
+
+    erros = 0
+    total_bytes = 0
+    for entrada, saida, erro, segundos, tamanho in compilar_lote(
+            tarefas, compilador, opcoes.workers, opcoes.chunksize):
+        total_bytes += tamanho
+        if erro is None:
+            if not opcoes.quieto:
+                print(f"ok    {entrada} -> {saida} ({segundos * 1000:.1f} ms)")
+        else:
+            erros += 1
+            print(f"ERRO  {entrada}: {erro}")
+    duracao = time.perf_counter() - inicio
+
+    print(f"\n{len(tarefas)} arquivos: {len(tarefas) - erros} compilados, {erros} com erro "
+          f"em {duracao:.2f} s ({len(tarefas) / duracao:.1f} arquivos/s, "
+          f"{total_bytes / duracao / 1024:.1f} KiB/s)")
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# lowering.py
+from utils import NodeVisitor, pausar_coletor
+from ast_nodes import No, Program, VarDecl, Assign, Repeat, While, If, Call, BinOp, Name, Literal
+
+
+class Lowering(NodeVisitor):
+    """
+    Converte a árvore de derivação (dicionários devolvidos por
+    ASTParser.parse_with_ast) na AST de ast_nodes. As recursões à direita da
+    gramática (CMDS -> CMD CMDS, REL' -> OP_REL ADD REL', ...) são
+    percorridas com laços: comandos viram listas e cadeias de operadores
+    viram BinOp associativos à esquerda.
+    """
+
+    def generic_visit(self, node):
+        raise ValueError(f"Nó inesperado na árvore de derivação: '{node['tag']}' (linha {node['linha']})")
+
+    # -- Programa e comandos --
+
+    def visit_S(self, node):
+        # S -> inicio B fim
+        return Program(self.visit(node['filhos'][1]), node['linha'])
+
+    def visit_B(self, node):
+        return self._comandos(node['filhos'][0])
+
+    def visit_CMDS(self, node):
+        return self._comandos(node)
+
+    def _comandos(self, cmds):
+        """Lista de comandos de uma cadeia CMDS -> CMD CMDS | #."""
+        corpo = []
+        while cmds.get('filhos'):
+            cmd, cmds = cmds['filhos']
+            corpo.append(self.visit(cmd))
+        return corpo
+
+    def visit_CMD(self, node):
+        return self.visit(node['filhos'][0])
+
+    def visit_DECL(self, node):
+        # DECL -> var TYPE : ID ;
+        var_type = node['filhos'][1]['filhos'][0]['tag']
+        name = node['filhos'][3]['filhos'][0]['valor']
+        return VarDecl(var_type, name, node['linha'])
+
+    def visit_ATR(self, node):
+        # ATR -> ATT ; e ATT -> ID = REL
+        id_node, _, rel = node['filhos'][0]['filhos']
+        return Assign(id_node['filhos'][0]['valor'], self.visit(rel), node['linha'])
+
+    def visit_REP(self, node):
+        # REP -> repita REL vezes CMDS fim_repita ;
+        filhos = node['filhos']
+        return Repeat(self.visit(filhos[1]), self._comandos(filhos[3]), node['linha'])
+
+    def visit_ENQ(self, node):
+        # ENQ -> enquanto REL faca CMDS fim_enquanto ;
+        filhos = node['filhos']
+        return While(self.visit(filhos[1]), self._comandos(filhos[3]), node['linha'])
+
+    def visit_SE(self, node):
+        # SE -> se REL entao CMDS SE_CONT e SE_CONT -> senao CMDS fim_se ; | fim_se ;
+        filhos = node['filhos']
+        se_cont = filhos[4]['filhos']
+        orelse = self._comandos(se_cont[1]) if len(se_cont) > 2 else None
+        return If(self.visit(filhos[1]), self._comandos(filhos[3]), orelse, node['linha'])
+
+    def _chamada(self, node):
+        """Comandos da tartaruga viram Call(palavra-chave, nós REL do comando)."""
+        filhos = node['filhos']
+        args = [self.visit(filho) for filho in filhos[1:] if filho['tag'] == 'REL']
+        return Call(filhos[0]['tag'], args, node['linha'])
+
+    visit_AV = _chamada
+    visit_REC = _chamada
+    visit_GD = _chamada
+    visit_GE = _chamada
+    visit_IRP = _chamada
+    visit_LC = _chamada
+    visit_AC = _chamada
+    visit_DC = _chamada
+    visit_DE = _chamada
+    visit_CDF = _chamada
+    visit_LP = _chamada
+    visit_DSQ = _chamada
+    visit_DSC = _chamada
+
+    # -- Expressões --
+
+    def _cadeia(self, node):
+        """
+        X -> Y X' com X' -> op Y X' | #: devolve os operandos Y combinados
+        da esquerda para a direita em BinOp.
+        """
+        primeiro, resto = node['filhos']
+        esquerda = self.visit(primeiro)
+        while resto.get('filhos'):
+            op, operando, resto = resto['filhos']
+            if op['tag'] == 'OP_REL':
+                op = op['filhos'][0]
+            esquerda = BinOp(op['valor'], esquerda, self.visit(operando), op['linha'])
+        return esquerda
+
+    visit_REL = visit_ADD = visit_MUL = _cadeia
+
+    def visit_FACTOR(self, node):
+        # FACTOR -> ( REL ) | ID | NUM | TEXT | BOOL
+        filhos = node['filhos']
+        if filhos[0]['tag'] == '(':
+            return self.visit(filhos[1])
+        return self.visit(filhos[0])
+
+    def visit_ID(self, node):
+        terminal = node['filhos'][0]
+        return Name(terminal['valor'], terminal['linha'])
+
+    def visit_NUM(self, node):
+        terminal = node['filhos'][0]
+        kind = 'inteiro' if terminal['tag'] == 'numero_inteiro' else 'real'
+        return Literal(kind, terminal['valor'], terminal['linha'])
+
+    def visit_TEXT(self, node):
+        terminal = node['filhos'][0]
+        return Literal('texto', terminal['valor'], terminal['linha'])
+
+    def visit_BOOL(self, node):
+        terminal = node['filhos'][0]
+        return Literal('logico', terminal['valor'] == 'verdadeiro', terminal['linha'])
+
+
+def lower(arvore):
+    """
+    AST (Program) de uma árvore de derivação. Uma AST recebida é devolvida
+    sem alterações, de modo que as fases seguintes aceitam as duas formas.
+    """
+    if isinstance(arvore, No):
+        return arvore
+    with pausar_coletor():
+        return Lowering().visit(arvore)
@@ -1,68 +1,121 @@
 import os
-import json
 import sys
-from tokenizer import Tokenizer, TokenType, ScanError
-from parser import ASTParser
-from semantico import SemanticAnalyzer, SemanticError
-from gerador import GeradorCodigoVisitor
-from utils import rules, nonterm_userdef, term_userdef
+import json
+import argparse
+from tokenizer import MOTORES
+from gerador import PERFIS
+from compilador import Compiler, LEXICO
+from cache_compilacao import CacheCompilacao
+from utils import escrever_atomicamente
+from diagnostico import Diagnostico, DestinoStderr, DestinoArquivo, DEBUG, INFO, AVISO
+from instrumentacao import Medidor, NULO
+import ast_binario
+
+arg_parser = argparse.ArgumentParser(description="Compilador TurtleScript -> Python (turtle)")
+arg_parser.add_argument("entrada", help="arquivo de entrada, relativo a tests/")
+arg_parser.add_argument("saida", help="arquivo de saída, relativo a tests/")
+arg_parser.add_argument("--lexer", choices=list(MOTORES), default="regex",
+                        help="motor do analisador léxico (padrão: regex)")
+arg_parser.add_argument("--cache-dir", default=None,
+                        help="diretório do cache da tabela LL(1) e das saídas (padrão: ~/.cache/turtlescript)")
+arg_parser.add_argument("--sem-cache", action="store_true",
+                        help="não consulta nem grava o cache de compilação")
+arg_parser.add_argument("--reconstruir-tabela", action="store_true",
+                        help="ignora o cache e reconstrói a tabela LL(1)")
+arg_parser.add_argument("--parser", choices=["gerado", "tabela"], default="gerado",
+                        help="parser gerado por gerador_parser.py (padrão) ou ASTParser dirigido pela tabela LL(1)")
+arg_parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="mostra mensagens de progresso (-v) e de depuração (-vv)")
+arg_parser.add_argument("--log", default=None,
+                        help="grava as mensagens neste arquivo em vez de stderr")
+arg_parser.add_argument("--em-funcao", action="store_true",
+                        help="gera o programa dentro de uma função main(), com variáveis locais e uma única tartaruga")
+arg_parser.add_argument("--otimizar", action="store_true",
+                        help="dobra expressões constantes, propaga variáveis constantes e remove comandos de "
+                             "estado (caneta, cor, espessura, fundo) redundantes antes de gerar o código")
+arg_parser.add_argument("--perfil", choices=list(PERFIS), default="interativo",
+                        help="renderização: interativo (anima cada traço), rapido (desenha sem animação) "
+                             "ou lote (como rapido, mas encerra no fim em vez de esperar a janela ser fechada)")
+arg_parser.add_argument("--intervalo-atualizacao", type=int, default=0, metavar="N",
+                        help="com --perfil rapido ou lote, redesenha a tela a cada N traços (padrão: só no fim)")
+arg_parser.add_argument("--imagem", default=None, metavar="ARQUIVO",
+                        help="com --perfil lote, o programa gerado salva o desenho neste arquivo PostScript")
+arg_parser.add_argument("--ast", action="store_true",
+                        help="a entrada é uma AST binária (gravada com --salvar-ast): compila a partir da análise semântica")
+arg_parser.add_argument("--salvar-ast", default=None, metavar="ARQUIVO",
+                        help="grava também a AST em formato binário neste arquivo, relativo a tests/")
+arg_parser.add_argument("--stats", nargs="?", const="tabela", choices=["tabela", "json"], default=None,
+                        help="mostra tempo, CPU, memória e contagens de cada fase, em tabela (padrão) ou JSON "
+                             "(sem usar o cache de compilação)")
+arg_parser.add_argument("--stats-sem-memoria", action="store_true",
+                        help="com --stats, não mede a memória (o tracemalloc deixa as fases mais lentas)")
+
+
+def main(argv=None):
+  args = arg_parser.parse_args(argv)
+
+  # Diagnóstico: por padrão apenas avisos e erros, em stderr
+  nivel = [AVISO, INFO, DEBUG][min(args.verbose, 2)]
+  diag = Diagnostico(nivel, DestinoArquivo(args.log) if args.log else DestinoStderr())
+
+  caminho_script = os.path.dirname(__file__)
+  caminho_entrada = os.path.join(caminho_script, 'tests', args.entrada)
+  caminho_saida = os.path.join(caminho_script, 'tests', args.saida)
 
-ENTRADA_1_CONTEUDO = None
-caminho_script = os.path.dirname(__file__)
-caminho_entrada = os.path.join(caminho_script, 'tests', sys.argv[1])
-caminho_saida = os.path.join(caminho_script, 'tests', sys.argv[2])
+  try:
+    try:
+      if args.ast:
+        with open(caminho_entrada, 'rb') as arquivo:
+          ast = ast_binario.load(arquivo)
+      else:
+        with open(caminho_entrada, 'r', encoding="utf-8") as arquivo:
+          fonte = arquivo.read()
+        diag.debug(fonte)
+    except FileNotFoundError:
+      diag.erro("O arquivo de entrada não foi encontrado em: {}", caminho_entrada)
+      return 1
+    except Exception as e:
+      diag.erro("Ocorreu um erro: {}", e)
+      return 1
 
-try:
-  with open(caminho_entrada, 'r', encoding="utf-8") as arquivo:
-    ENTRADA_1_CONTEUDO = arquivo.read()
-except FileNotFoundError:
-  print(f"O arquivo de entrada não foi encontrado em: {caminho_entrada}")
-except Exception as e:
-  print(f"Ocorreu um erro: {e}")
+    medidor = Medidor(memoria=not args.stats_sem_memoria) if args.stats else NULO
+    # Uma saída do cache não tem AST nem fases medidas: com --salvar-ast ou
+    # --stats o programa é sempre compilado
+    cache = None if args.sem_cache or args.salvar_ast or args.stats else CacheCompilacao(args.cache_dir)
+    compilador = Compiler(args.parser, args.lexer, cache, diag, cache_dir=args.cache_dir,
+                          reconstruir_tabela=args.reconstruir_tabela, medidor=medidor, em_funcao=args.em_funcao,
+                          perfil=args.perfil, intervalo_atualizacao=args.intervalo_atualizacao, imagem=args.imagem,
+                          otimizar=args.otimizar)
+    if args.ast:
+      resultado = compilador.compile_ast(ast, medidor=medidor)
+    else:
+      resultado = compilador.compile(fonte, keep_tokens=False, medidor=medidor)
+    if args.salvar_ast and resultado.ast is not None:
+      caminho_ast = os.path.join(caminho_script, 'tests', args.salvar_ast)
+      escrever_atomicamente(caminho_ast, ast_binario.dumps(resultado.ast))
+      diag.info("AST salva em {}", caminho_ast)
+    medidor.encerrar()
+    if args.stats == "json":
+      print(json.dumps(medidor.para_dict(), indent=2, ensure_ascii=False))
+    elif args.stats:
+      print(medidor.tabela())
 
+    if not resultado.ok:
+      for erro in resultado.errors:
+        if erro.phase == LEXICO:
+          diag.erro("Erro de Análise Léxica: {}", erro)
+        else:
+          diag.erro(erro)
+      return 1
 
-# Etapa 2: Análise Sintática (Parser)
-try:
-  print(ENTRADA_1_CONTEUDO)
-  tokenizer = Tokenizer(ENTRADA_1_CONTEUDO)
-  tokens_list = []
-  tok = tokenizer.obter_next_token()
-  while tok.type != TokenType.EOF:
-      tokens_list.append(tok)
-      tok = tokenizer.obter_next_token()
+    diag.debug("\n--- Código Gerado ---")
+    diag.debug(resultado.code)
+    escrever_atomicamente(caminho_saida, resultado.code)
+    diag.info("\nCódigo salvo em {}", caminho_saida)
+    return 0
+  finally:
+    diag.fechar()
 
-  # Para o parser antigo, que usava a string
-  token_string_for_parser = " ".join([t.literal if t.type in {TokenType.ATRIBUICAO, TokenType.PONTO_VIRGULA, TokenType.DOIS_PONTOS} else t.type.name.lower() for t in tokens_list])
-  parser = ASTParser(rules, nonterm_userdef, term_userdef, token_string_for_parser)
-  parser.computeAllFirsts()
-  parser.start_symbol = list(parser.diction.keys())[0]
-  parser.computeAllFollows()
-  table, result, tab_terms = parser.createParseTable()
-  
-  # Geração da AST usando a lista de tokens original
-  print("\n--- Iniciando Geração da AST ---")
-  ast = parser.parse_with_ast(table, result, tab_terms, tokens_list)
-  print("--- AST Gerada com Sucesso! ---")
-  print(json.dumps(ast, indent=2)) # Imprime a AST formatada
-  
-  # Etapa 3: Análise Semântica
-  semantic_analyzer = SemanticAnalyzer(ast)
-  semantic_analyzer.analyze()
-  
-  # Etapa 4: Geração de Código
-  gerador = GeradorCodigoVisitor()
-  codigo_gerado = gerador.gerar_codigo(ast)
-  print("\n--- Código Gerado ---")
-  print(codigo_gerado)
-  with open(caminho_saida, 'w', encoding='utf-8') as f:
-    f.write(codigo_gerado)
-  print(f"\nCódigo salvo em {caminho_saida}")
-except ScanError as e:
-  print(f"Erro de Análise Léxica: {e}")
-# except SyntaxError as e:
-#   print(e)
-except SemanticError as e:
-  print(e)
-# except Exception as e:
-#   print(f"Ocorreu um erro durante a análise semântica: {e}")
 
+if __name__ == "__main__":
+  sys.exit(main())
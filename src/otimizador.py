@@ -0,0 +1,375 @@
+# otimizador.py
+"""
+Otimização da AST entre a análise semântica e a geração de código:
+dobramento de constantes (expressões aritméticas e relacionais cujos
+operandos são literais viram um único literal) e propagação de constantes
+(usos de uma variável atribuída uma única vez, no nível do programa, com um
+valor constante), em Otimizador; e eliminação de comandos de estado da
+tartaruga redundantes (caneta, cor, espessura e cor de fundo), em
+OtimizadorEstado.
+
+    otimizador = Otimizador()
+    programa = otimizador.otimizar(ast)
+    print(otimizador.dobradas, otimizador.propagadas)
+
+A AST recebida não é alterada: os nós que mudam são copiados. A AST precisa
+ter passado pela análise semântica (os tipos das expressões são mantidos);
+expressões sem tipo ou com operandos de tipos incompatíveis nunca são
+dobradas.
+"""
+import math
+import operator
+import collections
+
+from utils import NodeVisitor
+from semantico import tipo_resultado
+from ast_nodes import Program, VarDecl, Assign, Repeat, While, If, Call, BinOp, Name, Literal
+
+# Operações avaliadas em tempo de compilação: as mesmas do Python que o
+# código gerado executaria (a divisão de inteiros dá real, como em tipo_resultado).
+OPERACOES = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv,
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt, ">": operator.gt,
+    "<=": operator.le, ">=": operator.ge,
+}
+
+# Comandos que definem o estado da tartaruga -> parte do estado definida.
+# levantar_caneta e abaixar_caneta definem a mesma parte, com valores
+# diferentes (o valor de um comando é o próprio comando com seus argumentos).
+ESTADO = {
+    "levantar_caneta": "caneta", "abaixar_caneta": "caneta",
+    "definir_cor": "cor", "definir_espessura": "espessura", "cor_de_fundo": "fundo",
+}
+
+# Outros comandos que mudam o estado: no modo em_funcao, desenhar_quadrado
+# e desenhar_circulo trocam a cor da própria tartaruga. (limpar_tela gera
+# clear(), que apaga os desenhos mas não muda o estado.)
+ALTERAM_ESTADO = {"desenhar_quadrado": "cor", "desenhar_circulo": "cor"}
+
+
+def _kind(valor):
+    """Tipo TurtleScript de um valor Python (bool antes de int: bool é subclasse de int)."""
+    if isinstance(valor, bool):
+        return "logico"
+    if isinstance(valor, int):
+        return "inteiro"
+    if isinstance(valor, float):
+        return "real"
+    return "texto"
+
+
+def avaliar(op, esquerda, direita):
+    """
+    Valor de `esquerda op direita` ou None quando a operação deve ficar para
+    a execução: divisão por zero (o erro continua acontecendo no programa),
+    resultados reais infinitos ou NaN (não há literal para eles) e textos com
+    barra invertida (o gerador copia o texto entre aspas, então as sequências
+    de escape só são interpretadas no programa gerado).
+    """
+    if isinstance(esquerda, str) and ("\\" in esquerda or "\\" in direita):
+        return None
+    try:
+        valor = OPERACOES[op](esquerda, direita)
+    except ZeroDivisionError:
+        return None
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def _atribuicoes(programa):
+    """Número de atribuições de cada variável, em qualquer nível do programa."""
+    contagem = {}
+    pendentes = [programa]
+    while pendentes:
+        no = pendentes.pop()
+        if isinstance(no, Assign):
+            contagem[no.name] = contagem.get(no.name, 0) + 1
+        pendentes.extend(no.iter_filhos())
+    return contagem
+
+
+class Otimizador(NodeVisitor):
+    """
+    Dobra e propaga constantes. Cada visit devolve o próprio nó, quando nada
+    muda, ou uma cópia otimizada; dobradas e propagadas contam as expressões
+    substituídas por literais.
+
+    Uma variável é propagada quando tem uma única atribuição em todo o
+    programa, essa atribuição está no nível do programa (fora de laços e
+    condicionais) e o valor atribuído é constante. Só os usos nos comandos
+    seguintes à atribuição são substituídos: antes dela a variável ainda tem
+    o valor inicial da declaração. O literal propagado é o valor que o
+    programa guardaria na variável (ex.: uma variável real que recebe 10
+    guarda o inteiro 10), então os resultados não mudam.
+    """
+
+    def __init__(self):
+        self.dobradas = 0
+        self.propagadas = 0
+        self._constantes = {} # nome -> Literal, válidas a partir da atribuição
+        self._unicas = frozenset()
+
+    def otimizar(self, programa):
+        """Devolve o programa otimizado."""
+        self._unicas = frozenset(nome for nome, n in _atribuicoes(programa).items() if n == 1)
+        return self.visit(programa)
+
+    # -- Comandos --
+
+    def visit_Program(self, node):
+        corpo = []
+        for comando in node.body:
+            comando = self.visit(comando)
+            corpo.append(comando)
+            if (isinstance(comando, Assign) and comando.name in self._unicas
+                    and isinstance(comando.value, Literal)):
+                self._constantes[comando.name] = comando.value
+        return node if _mesmos(corpo, node.body) else Program(corpo, node.linha)
+
+    def _lista(self, nos):
+        """Os nós de uma lista (bloco ou argumentos) otimizados; a própria lista se nenhum mudou."""
+        if nos is None:
+            return None
+        novos = [self.visit(no) for no in nos]
+        return nos if _mesmos(novos, nos) else novos
+
+    def visit_VarDecl(self, node):
+        return node
+
+    def visit_Assign(self, node):
+        valor = self.visit(node.value)
+        return Assign(node.name, valor, node.linha) if valor is not node.value else node
+
+    def visit_Repeat(self, node):
+        count, body = self.visit(node.count), self._lista(node.body)
+        if count is node.count and body is node.body:
+            return node
+        return Repeat(count, body, node.linha)
+
+    def visit_While(self, node):
+        cond, body = self.visit(node.cond), self._lista(node.body)
+        if cond is node.cond and body is node.body:
+            return node
+        return While(cond, body, node.linha)
+
+    def visit_If(self, node):
+        cond, then, orelse = self.visit(node.cond), self._lista(node.then), self._lista(node.orelse)
+        if cond is node.cond and then is node.then and orelse is node.orelse:
+            return node
+        return If(cond, then, orelse, node.linha)
+
+    def visit_Call(self, node):
+        args = self._lista(node.args)
+        return Call(node.cmd, args, node.linha) if args is not node.args else node
+
+    # -- Expressões --
+
+    def visit_BinOp(self, node):
+        left, right = self.visit(node.left), self.visit(node.right)
+        if (isinstance(left, Literal) and isinstance(right, Literal) and node.tipo is not None
+                and tipo_resultado(node.op, left.kind, right.kind) is not None):
+            valor = avaliar(node.op, left.value, right.value)
+            if valor is not None:
+                self.dobradas += 1
+                return _literal(valor, node)
+        if left is node.left and right is node.right:
+            return node
+        novo = BinOp(node.op, left, right, node.linha)
+        novo.tipo = node.tipo
+        return novo
+
+    def visit_Name(self, node):
+        constante = self._constantes.get(node.name)
+        if constante is None:
+            return node
+        self.propagadas += 1
+        return _literal(constante.value, node)
+
+    def visit_Literal(self, node):
+        return node
+
+
+def _mesmos(novos, antigos):
+    return all(novo is antigo for novo, antigo in zip(novos, antigos))
+
+
+def _literal(valor, original):
+    """Literal com o valor calculado, na linha e com o tipo semântico da expressão original."""
+    literal = Literal(_kind(valor), valor, original.linha)
+    literal.tipo = original.tipo
+    return literal
+
+
+class OtimizadorEstado(NodeVisitor):
+    """
+    Remove comandos de estado (ver ESTADO) que não mudam o estado, e move
+    para antes de um 'repita' os que o corpo repete a cada volta. removidos
+    e movidos contam os comandos retirados e os movidos.
+
+    O estado conhecido de cada parte é o valor do último comando que a
+    definiu: o nome do comando e a forma dos argumentos. Ele é seguido pelos
+    comandos em sequência. Uma atribuição esquece as partes cujos argumentos
+    usam a variável, já que a mesma expressão pode passar a ter outro valor.
+    Depois de um 'se', só vale o que as duas alternativas deixam igual. Em um
+    laço, o corpo começa sem as partes que ele próprio pode mudar, e depois
+    do laço vale o que é igual antes e depois do corpo, já que o laço pode
+    não executar nenhuma vez. No início do programa nada é conhecido.
+
+    Um comando de estado só sai do corpo de um 'repita' se fizer parte dos
+    comandos de estado que abrem o corpo (nada foi desenhado antes dele), se
+    for o único comando do corpo a mudar aquela parte do estado, se o corpo
+    não mudar as variáveis dos seus argumentos e se o laço executar ao menos
+    uma vez (contador constante positivo).
+    """
+
+    def __init__(self):
+        self.removidos = 0
+        self.movidos = 0
+        self._estado = {} # parte -> (valor, variáveis usadas nos argumentos)
+
+    def otimizar(self, programa):
+        """Devolve o programa otimizado."""
+        return self.visit(programa)
+
+    def _bloco(self, comandos):
+        """Os comandos de um bloco, sem os redundantes; a própria lista se nada mudou."""
+        novos = []
+        for comando in comandos:
+            if isinstance(comando, Repeat):
+                antes, comando = self._mover_invariantes(comando)
+                for movido in antes:
+                    movido = self.visit(movido)
+                    if movido is not None:
+                        novos.append(movido)
+            comando = self.visit(comando)
+            if comando is not None:
+                novos.append(comando)
+        if len(novos) == len(comandos) and _mesmos(novos, comandos):
+            return comandos
+        return novos
+
+    def _mover_invariantes(self, node):
+        """Comandos que podem sair do corpo do laço e o laço sem eles."""
+        contador = node.count
+        if not (isinstance(contador, Literal) and contador.kind == "inteiro" and contador.value > 0):
+            return [], node
+        partes, variaveis = _alteracoes(node.body)
+        movidos = []
+        for comando in node.body:
+            if not (isinstance(comando, Call) and comando.cmd in ESTADO):
+                break
+            if partes[ESTADO[comando.cmd]] == 1 and not (_variaveis(comando.args) & variaveis):
+                movidos.append(comando)
+        if not movidos:
+            return [], node
+        self.movidos += len(movidos)
+        corpo = [comando for comando in node.body if not any(comando is movido for movido in movidos)]
+        return movidos, Repeat(contador, corpo, node.linha)
+
+    # -- Comandos --
+
+    def visit_Program(self, node):
+        corpo = self._bloco(node.body)
+        return node if corpo is node.body else Program(corpo, node.linha)
+
+    def visit_Call(self, node):
+        parte = ESTADO.get(node.cmd)
+        if parte is None:
+            self._estado.pop(ALTERAM_ESTADO.get(node.cmd), None)
+            return node
+        valor = (node.cmd, tuple(_forma(arg) for arg in node.args))
+        if self._estado.get(parte, (None,))[0] == valor:
+            self.removidos += 1
+            return None
+        self._estado[parte] = (valor, _variaveis(node.args))
+        return node
+
+    def _atribui(self, nome):
+        self._estado = {parte: conhecido for parte, conhecido in self._estado.items() if nome not in conhecido[1]}
+
+    def visit_VarDecl(self, node):
+        # A declaração também atribui (o valor inicial)
+        self._atribui(node.name)
+        return node
+
+    def visit_Assign(self, node):
+        self._atribui(node.name)
+        return node
+
+    def visit_If(self, node):
+        entrada = self._estado
+        self._estado = dict(entrada)
+        then = self._bloco(node.then)
+        saida_then, self._estado = self._estado, dict(entrada)
+        orelse = self._bloco(node.orelse) if node.orelse is not None else None
+        self._estado = _comum(saida_then, self._estado)
+        if then is node.then and orelse is node.orelse:
+            return node
+        return If(node.cond, then, orelse, node.linha)
+
+    def _laco(self, node):
+        """Corpo otimizado de um laço (Repeat ou While)."""
+        entrada = self._estado
+        partes, variaveis = _alteracoes(node.body)
+        self._estado = {parte: conhecido for parte, conhecido in entrada.items()
+                        if parte not in partes and not (conhecido[1] & variaveis)}
+        corpo = self._bloco(node.body)
+        self._estado = _comum(entrada, self._estado)
+        return corpo
+
+    def visit_Repeat(self, node):
+        corpo = self._laco(node)
+        return node if corpo is node.body else Repeat(node.count, corpo, node.linha)
+
+    def visit_While(self, node):
+        corpo = self._laco(node)
+        return node if corpo is node.body else While(node.cond, corpo, node.linha)
+
+
+def _forma(expressao):
+    """Forma de uma expressão, comparável e hashable: expressões iguais têm a mesma forma."""
+    if isinstance(expressao, Literal):
+        return (expressao.kind, expressao.value)
+    if isinstance(expressao, Name):
+        return expressao.name
+    return (expressao.op, _forma(expressao.left), _forma(expressao.right))
+
+
+def _variaveis(expressoes):
+    """Variáveis usadas nas expressões."""
+    nomes = set()
+    pendentes = list(expressoes)
+    while pendentes:
+        no = pendentes.pop()
+        if isinstance(no, Name):
+            nomes.add(no.name)
+        pendentes.extend(no.iter_filhos())
+    return frozenset(nomes)
+
+
+def _alteracoes(comandos):
+    """
+    Quantas vezes cada parte do estado é mudada nos comandos (inclusive nos
+    blocos internos) e as variáveis atribuídas ou declaradas neles.
+    """
+    partes = collections.Counter()
+    variaveis = set()
+    pendentes = list(comandos)
+    while pendentes:
+        no = pendentes.pop()
+        if isinstance(no, Call):
+            parte = ESTADO.get(no.cmd) or ALTERAM_ESTADO.get(no.cmd)
+            if parte is not None:
+                partes[parte] += 1
+        elif isinstance(no, (Assign, VarDecl)):
+            variaveis.add(no.name)
+        elif isinstance(no, (Repeat, While, If)):
+            pendentes.extend(no.iter_filhos())
+    return partes, variaveis
+
+
+def _comum(estado, outro):
+    """As partes conhecidas com o mesmo valor nos dois estados."""
+    return {parte: conhecido for parte, conhecido in estado.items()
+            if outro.get(parte, (None,))[0] == conhecido[0]}
@@ -1,8 +1,14 @@
-from tokenizer import TokenType, Token, lista_tokens
+from tokenizer import TokenType, Token, ErroSintatico, nome_terminal
+from token_buffer import TokenBuffer, SEM_TERMINAL
+from first_follow import FirstFollow
+from tabela_ll1 import TabelaLL1, VAZIA
+from utils import pausar_coletor
+from diagnostico import PADRAO, DEBUG
+from instrumentacao import NULO
 
 
 class Parser:
-    def __init__(self, rules, nonterm_userdef, term_userdef, sample_input_string=None):
+    def __init__(self, rules, nonterm_userdef, term_userdef, sample_input_string=None, diagnostico=None):
         self.rules = rules
         self.nonterm_userdef = nonterm_userdef
         self.term_userdef = term_userdef
@@ -11,6 +17,10 @@ class Parser:
         self.firsts = {}
         self.follows = {}
         self.start_symbol = None
+        self.conjuntos = None # FirstFollow da gramática, criado em computeAllFirsts
+        self.tabela = None # TabelaLL1 densa, criada em createParseTable
+        self._matriz_tabela = None # Tabela em texto correspondente a self.tabela
+        self.diag = diagnostico or PADRAO # Saída de depuração (silenciosa por padrão)
 
     def removeLeftRecursion(self, rulesDiction):
         store = {}
@@ -68,6 +78,10 @@ class Parser:
                 newDict[key] = tempo_dict[key]
         self.diction = newDict
 
+    # first() e follow() são as implementações recursivas originais, sem
+    # cache. computeAllFirsts/computeAllFollows/createParseTable usam o
+    # cálculo por ponto fixo de first_follow.FirstFollow.
+
     def first(self, rule):
         if len(rule) != 0 and (rule is not None):
             if rule[0] in self.term_userdef:
@@ -155,161 +169,144 @@ class Parser:
                 multirhs[i] = multirhs[i].split()
             self.diction[k[0]] = multirhs
 
-        print(f"\nRules: \n")
-        for y in self.diction:
-            print(f"{y}->{self.diction[y]}")
-        print(f"\nAfter elimination of left recursion:\n")
+        # A saída de depuração só é montada se o nível DEBUG estiver ativo
+        depurar = self.diag.ativo(DEBUG)
+        if depurar:
+            self.diag.debug("\nRules: \n")
+            self._depurar_regras()
+            self.diag.debug("\nAfter elimination of left recursion:\n")
 
         self.removeLeftRecursion(self.diction)
-        for y in self.diction:
-            print(f"{y}->{self.diction[y]}")
-        print("\nAfter left factoring:\n")
+        if depurar:
+            self._depurar_regras()
+            self.diag.debug("\nAfter left factoring:\n")
 
         self.LeftFactoring(self.diction)
-        for y in self.diction:
-            print(f"{y}->{self.diction[y]}")
-
-        for y in list(self.diction.keys()):
-            t = set()
-            for sub in self.diction.get(y):
-                res = self.first(sub)
-                if res is not None:
-                    if type(res) is list:
-                        for u in res:
-                            t.add(u)
-                    else:
-                        t.add(res)
-            self.firsts[y] = t
+        if depurar:
+            self._depurar_regras()
+
+        self.conjuntos = FirstFollow(self.diction, self.term_userdef)
+        self.firsts = self.conjuntos.firsts()
 
-        print("\nCalculated firsts: ")
-        key_list = list(self.firsts.keys())
-        index = 0
-        for gg in self.firsts:
-            print(f"first({key_list[index]}) => {self.firsts.get(gg)}")
-            index += 1
+        if depurar:
+            self.diag.debug("\nCalculated firsts: ")
+            for nt, first in self.firsts.items():
+                self.diag.debug("first({}) => {}", nt, first)
+
+    def _depurar_regras(self):
+        for y in self.diction:
+            self.diag.debug("{}->{}", y, self.diction[y])
 
     def computeAllFollows(self):
-        for NT in self.diction:
-            solset = set()
-            sol = self.follow(NT)
-            if sol is not None:
-                for g in sol:
-                    solset.add(g)
-            self.follows[NT] = solset
-
-        print("\nCalculated follows: ")
-        key_list = list(self.follows.keys())
-        index = 0
-        for gg in self.follows:
-            print(f"follow({key_list[index]}) => {self.follows[gg]}")
-            index += 1
+        self.follows = self.conjuntos.follows(self.start_symbol)
+
+        if self.diag.ativo(DEBUG):
+            self.diag.debug("\nCalculated follows: ")
+            for nt, follow in self.follows.items():
+                self.diag.debug("follow({}) => {}", nt, follow)
 
     def createParseTable(self):
         import copy
-        print("\nFirsts and Follow Result table\n")
-        mx_len_first = 0
-        mx_len_fol = 0
-        for u in self.diction:
-            k1 = len(str(self.firsts[u]))
-            k2 = len(str(self.follows[u]))
-            if k1 > mx_len_first:
-                mx_len_first = k1
-            if k2 > mx_len_fol:
-                mx_len_fol = k2
-
-        print(f"{{:<{10}}} {{:<{mx_len_first + 5}}} {{:<{mx_len_fol + 5}}}".format("Non-T", "FIRST", "FOLLOW"))
-        for u in self.diction:
-            print(f"{{:<{10}}} {{:<{mx_len_first + 5}}} {{:<{mx_len_fol + 5}}}".format(u, str(self.firsts[u]), str(self.follows[u])))
+        depurar = self.diag.ativo(DEBUG)
+        if depurar:
+            self.diag.debug("\nFirsts and Follow Result table\n")
+            mx_len_first = 0
+            mx_len_fol = 0
+            for u in self.diction:
+                k1 = len(str(self.firsts[u]))
+                k2 = len(str(self.follows[u]))
+                if k1 > mx_len_first:
+                    mx_len_first = k1
+                if k2 > mx_len_fol:
+                    mx_len_fol = k2
+
+            frmt = f"{{:<{10}}} {{:<{mx_len_first + 5}}} {{:<{mx_len_fol + 5}}}"
+            self.diag.debug(frmt, "Non-T", "FIRST", "FOLLOW")
+            for u in self.diction:
+                self.diag.debug(frmt, u, str(self.firsts[u]), str(self.follows[u]))
 
         ntlist = list(self.diction.keys())
         terminals = copy.deepcopy(self.term_userdef)
         terminals.append('$')
 
-        mat = []
-        for x in self.diction:
-            row = []
-            for y in terminals:
-                row.append('')
-            mat.append(row)
-
-        grammar_is_LL = True
-
+        tabela = TabelaLL1(ntlist, terminals)
         for lhs in self.diction:
             rhs = self.diction[lhs]
             for y in rhs:
-                res = self.first(y)
+                id_producao = tabela.adicionar_producao(lhs, y)
+                res = self.conjuntos.first_seq(y)
                 if '#' in res:
-                    if type(res) == str:
-                        firstFollow = []
-                        fol_op = self.follows[lhs]
-                        if isinstance(fol_op, str):
-                            firstFollow.append(fol_op)
-                        else:
-                            for u in fol_op:
-                                firstFollow.append(u)
-                        res = firstFollow
-                    else:
-                        res = list(res)
-                        res.remove('#')
-                        res = list(res) + list(self.follows[lhs])
-                ttemp = []
-                if type(res) is str:
-                    ttemp.append(res)
-                    res = copy.deepcopy(ttemp)
-                for c in res:
-                    xnt = ntlist.index(lhs)
-                    yt = terminals.index(c)
-                    if mat[xnt][yt] == '':
-                        mat[xnt][yt] = mat[xnt][yt] + f"{lhs}->{' '.join(y)}"
-                    else:
-                        if f"{lhs}->{y}" in mat[xnt][yt]:
-                            continue
-                        else:
-                            grammar_is_LL = False
-                            mat[xnt][yt] = mat[xnt][yt] + f",{lhs}->{' '.join(y)}"
-
-        print("\nGenerated parsing table:\n")
-        frmt = "{:>12}" * len(terminals)
-        print(frmt.format(*terminals))
-
-        j = 0
-        for y in mat:
-            frmt1 = "{:>12}" * len(y)
-            print(f"{ntlist[j]} {frmt1.format(*y)}")
-            j += 1
+                    res = (res - {'#'}) | self.follows[lhs]
+                # Percorre na ordem dos terminais para que a tabela (e a ordem
+                # das regras em conflito) não dependa da ordem do conjunto
+                for c in terminals:
+                    if c in res:
+                        tabela.definir(lhs, c, id_producao)
+
+        mat = tabela.como_matriz()
+        grammar_is_LL = tabela.is_LL1
+        self.tabela = tabela
+        self._matriz_tabela = mat
+
+        if depurar:
+            self.diag.debug("\nGenerated parsing table:\n")
+            frmt = "{:>12}" * len(terminals)
+            self.diag.debug(frmt, *terminals)
+
+            for nt, y in zip(ntlist, mat):
+                self.diag.debug("{} " + "{:>12}" * len(y), nt, *y)
 
         return (mat, grammar_is_LL, terminals)
 
+    def tabela_densa(self, parsing_table, table_term_list):
+        """
+        TabelaLL1 correspondente à tabela recebida: a própria, se já for uma
+        TabelaLL1, a construída por createParseTable, se for a mesma matriz, ou
+        uma conversão da tabela em texto (feita uma vez e guardada).
+        """
+        if isinstance(parsing_table, TabelaLL1):
+            return parsing_table
+        if self.tabela is None or self._matriz_tabela is not parsing_table:
+            self.tabela = TabelaLL1.from_matriz(parsing_table, list(self.diction.keys()), table_term_list)
+            self._matriz_tabela = parsing_table
+        return self.tabela
+
     def validateStringUsingStackBuffer(self, parsing_table, grammarll1, table_term_list, input_string):
-        print(f"\nValidate String => {input_string}\n")
+        depurar = self.diag.ativo(DEBUG)
+        self.diag.info("\nValidate String => {}\n", input_string)
         if grammarll1 == False:
             return f"\nInput String = \"{input_string}\"\nGrammar is not LL(1)"
-        stack = [self.start_symbol, '$']
+        tabela = self.tabela_densa(parsing_table, table_term_list)
+        nomes = tabela.simbolos
+        fim = tabela.codigo('$')
+        stack = [tabela.codigo(self.start_symbol), fim]
         input_string = input_string.split()
         input_string.reverse()
-        buffer = ['$'] + input_string
+        buffer = [fim] + [tabela.ids.get(simbolo, VAZIA) for simbolo in input_string]
 
-        print("{:>20} {:>20} {:>20}".format("Buffer", "Stack", "Action"))
+        def texto(simbolos):
+            return ' '.join(nomes[s] if s != VAZIA else '?' for s in simbolos)
+
+        self.diag.debug("{:>20} {:>20} {:>20}", "Buffer", "Stack", "Action")
 
         while True:
-            if stack == ['$'] and buffer == ['$']:
-                print("{:>20} {:>20} {:>20}".format(' '.join(buffer), ' '.join(stack), "Valid"))
+            if stack == [fim] and buffer == [fim]:
+                if depurar:
+                    self.diag.debug("{:>20} {:>20} {:>20}", texto(buffer), texto(stack), "Valid")
                 return "\nValid String!"
-            elif stack[0] not in self.term_userdef:
-                x = list(self.diction.keys()).index(stack[0])
-                y = table_term_list.index(buffer[-1])
-                if parsing_table[x][y] != '':
-                    entry = parsing_table[x][y]
-                    print("{:>20} {:>20} {:>25}".format(' '.join(buffer), ' '.join(stack), f"T[{stack[0]}][{buffer[-1]}] = {entry}"))
-                    lhs_rhs = entry.split("->")
-                    lhs_rhs[1] = lhs_rhs[1].replace('#', '').strip()
-                    entryrhs = lhs_rhs[1].split()
-                    stack = entryrhs + stack[1:]
+            elif stack[0] >= tabela.num_terminais:
+                entry = tabela.producao(stack[0], buffer[-1]) if 0 <= buffer[-1] < tabela.num_terminais else VAZIA
+                if entry != VAZIA:
+                    if depurar:
+                        self.diag.debug("{:>20} {:>20} {:>25}", texto(buffer), texto(stack), f"T[{nomes[stack[0]]}][{nomes[buffer[-1]]}] = {tabela.producoes_texto[entry]}")
+                    stack = list(tabela.producoes[entry][1]) + stack[1:]
                 else:
-                    return f"\nInvalid String! No rule at Table[{stack[0]}][{buffer[-1]}]."
+                    topo = nomes[buffer[-1]] if buffer[-1] != VAZIA else input_string[len(buffer) - 2]
+                    return f"\nInvalid String! No rule at Table[{nomes[stack[0]]}][{topo}]."
             else:
                 if stack[0] == buffer[-1]:
-                    print("{:>20} {:>20} {:>20}".format(' '.join(buffer), ' '.join(stack), f"Matched:{stack[0]}"))
+                    if depurar:
+                        self.diag.debug("{:>20} {:>20} {:>20}", texto(buffer), texto(stack), f"Matched:{nomes[stack[0]]}")
                     buffer = buffer[:-1]
                     stack = stack[1:]
                 else:
@@ -322,9 +319,9 @@ class Parser:
         parsing_table, result, tabTerm = self.createParseTable()
         if self.sample_input_string is not None:
             validity = self.validateStringUsingStackBuffer(parsing_table, result, tabTerm, self.sample_input_string)
-            print(validity)
+            self.diag.info(validity)
         else:
-            print("\nNo input String detected")
+            self.diag.info("\nNo input String detected")
 
 class ASTNode:
     def __init__(self, tag, linha, valor=None, **kwargs): # Adicione 'valor'
@@ -334,53 +331,84 @@ class ASTNode:
         self.children = []
         for k, v in kwargs.items():
             setattr(self, k, v)
-    def to_dict(self):
+    def _dict_base(self):
         base = {"tag": self.tag, "linha": self.linha}
         if self.valor is not None: # Adicione esta condição
             base["valor"] = self.valor
-        base.update({k: v for k, v in self.__dict__.items() if k not in ["tag", "linha", "children", "valor"]})
-        if self.children:
-            base["filhos"] = [child.to_dict() for child in self.children]
+        if len(self.__dict__) > 4: # Atributos extras (kwargs)
+            base.update({k: v for k, v in self.__dict__.items() if k not in ["tag", "linha", "children", "valor"]})
         return base
 
+    def to_dict(self):
+        # Iterativo (pilha explícita): a recursão à direita de CMDS deixa a
+        # árvore com profundidade proporcional ao número de comandos
+        raiz = self._dict_base()
+        pendentes = [(self, raiz)]
+        while pendentes:
+            no, base = pendentes.pop()
+            if no.children:
+                filhos = [child._dict_base() for child in no.children]
+                base["filhos"] = filhos
+                pendentes.extend(zip(no.children, filhos))
+        return raiz
+
 class ASTParser(Parser):
-    # ... (init, next_token, peek_token não mudam) ...
-    def init(self, rules, nonterm_userdef, term_userdef, sample_input_string=None):
-        super().init(rules, nonterm_userdef, term_userdef, sample_input_string)
-        self.input_tokens = []
-        self.current_token_index = 0
-
-    def next_token(self):
-        if self.current_token_index < len(self.input_tokens):
-            tok = self.input_tokens[self.current_token_index]
-            self.current_token_index += 1
-            return tok
-        return ('$','EOF')
-
-    def peek_token(self):
-        if self.current_token_index < len(self.input_tokens):
-            return self.input_tokens[self.current_token_index]
-        return ('$','EOF')
-
-    def parse_with_ast(self, parsing_table, grammarll1, table_term_list, input_string):
+    # Ids de terminal por TokenType, por lista de terminais (ver ids_por_tipo).
+    # Compartilhado entre instâncias: depende apenas da lista de terminais.
+    _ids_por_tipo = {}
+
+    def ids_por_tipo(self, table_term_list):
+        """
+        Id do terminal (posição em table_term_list) de cada TokenType, ou
+        SEM_TERMINAL. Calculado uma vez por lista de terminais.
+        """
+        chave = tuple(table_term_list)
+        ids = self._ids_por_tipo.get(chave)
+        if ids is None:
+            posicao = {nome: i for i, nome in enumerate(table_term_list)}
+            ids = {tipo: posicao.get(nome_terminal(tipo), SEM_TERMINAL) for tipo in TokenType}
+            self._ids_por_tipo[chave] = ids
+        return ids
+
+    def parse_with_ast(self, parsing_table, grammarll1, table_term_list, input_tokens, medidor=NULO):
         if not grammarll1:
             raise ValueError("Grammar is not LL(1)")
 
-    def parse_with_ast(self, parsing_table, grammarll1, table_term_list, input_tokens):
-        if not grammarll1:
-            raise ValueError("Grammar is not LL(1)")
-        
-        # O input agora deve ser a lista de Tokens do tokenizer, não a string
-        self.input_tokens = input_tokens + [Token(TokenType.EOF, '$', -1)]
-        self.current_token_index = 0
+        # A árvore não tem ciclos: pausar o coletor de lixo evita que ele
+        # percorra repetidamente os milhares de nós recém-criados, o que
+        # tornaria o tempo de parsing superlinear em programas grandes
+        with pausar_coletor():
+            with medidor.fase("sintático"):
+                raiz = self._derivar(parsing_table, table_term_list, input_tokens)
+            with medidor.fase("to_dict"):
+                return raiz.to_dict()
+
+    def _derivar(self, parsing_table, table_term_list, input_tokens):
+        # O input pode ser qualquer iterável de Tokens (lista, TokenBuffer ou o
+        # gerador iter_tokens do tokenizer): os tokens são consumidos sob
+        # demanda e o fim da entrada equivale a um token EOF. Nada é guardado
+        # no parser, que pode ser usado por várias threads ao mesmo tempo.
+        eof = Token(TokenType.EOF, '$', -1)
+        id_fim = table_term_list.index('$')
+
+        # Pares (id do terminal, token); no TokenBuffer os ids já vêm prontos
+        if isinstance(input_tokens, TokenBuffer):
+            entrada = zip(input_tokens.ids_terminais(table_term_list), input_tokens)
+        else:
+            por_tipo = self.ids_por_tipo(table_term_list)
+            entrada = ((por_tipo[tok.type], tok) for tok in input_tokens)
+
+        tabela = self.tabela_densa(parsing_table, table_term_list)
+        num_terminais = tabela.num_terminais
+        celulas = tabela.celulas
+        producoes = tabela.producoes
 
-        stack = [self.start_symbol]
         root = ASTNode("Bloco", 1) 
+        # Pilha com o topo no fim da lista: cada passo é um pop()/extend()
+        # de custo proporcional só ao lado direito da produção
+        stack = [tabela.codigo(self.start_symbol)]
         node_stack = [root]
         
-        # Mapeia nome do token para o tipo de token literal do tokenizer
-        token_map = {t.name.lower(): t for t in TokenType}
-        
         # ---------- FUNÇÃO AUXILIAR ----------
         def _tag_ok(simbolo: str) -> str:
             """
@@ -389,61 +417,46 @@ class ASTParser(Parser):
             """
             return simbolo.replace("'", "_prime")
 
+        # Tag de nó de cada símbolo, indexada pelo id do símbolo na tabela
+        tags = [_tag_ok(simbolo) for simbolo in tabela.simbolos]
+
+        # Token atual (lookahead) e o id do seu terminal
+        y, tok_obj = next(entrada, (id_fim, eof))
+
         while stack:
-            # ... (lógica inicial do loop) ...
-            top = stack.pop(0)
-            current_node = node_stack.pop(0) if node_stack else None
-
-            # Obter o token atual do tokenizer
-            tok_obj = self.peek_token()
-            tok_type_name = tok_obj.type.name.lower()
-            
-            # Mapeia token de pontuação para seu próprio literal
-            if tok_obj.type in {
-                TokenType.ATRIBUICAO, TokenType.PONTO_VIRGULA, TokenType.DOIS_PONTOS,
-                TokenType.VIRGULA, TokenType.SOMA, TokenType.SUBTRACAO,
-                TokenType.MULTIPLICACAO, TokenType.DIVISAO, TokenType.RESTO,
-                TokenType.IGUAL, TokenType.MENOR, TokenType.MAIOR,
-                TokenType.PARENTESE_ESQ, TokenType.PARENTESE_DIR
-            }:
-                tok_type_name = tok_obj.literal
-
-            if tok_obj.type == TokenType.EOF:
-                tok_type_name = '$'
-
-            if top == '#':
-                continue
-            elif top in self.term_userdef:
-                if top == tok_type_name:
+            top = stack.pop()
+            current_node = node_stack.pop()
+
+            if top < num_terminais:
+                if top == y:
                     # Se for um terminal, atualiza o nó atual com seu valor e linha.
                     # Nós terminais são folhas e não terão filhos.
-                    if current_node:
-                       current_node.valor = tok_obj.literal
-                       current_node.linha = tok_obj.line
-                    self.next_token()
+                    current_node.valor = tok_obj.literal
+                    current_node.linha = tok_obj.line
+                    y, tok_obj = next(entrada, (id_fim, eof))
                 else:
-                    raise SyntaxError(f"Erro de Sintaxe: Esperado '{top}', mas encontrou '{tok_type_name}' na linha {tok_obj.line}")
-            elif top in self.nonterm_userdef:
+                    tok_type_name = table_term_list[y] if y != SEM_TERMINAL else nome_terminal(tok_obj.type)
+                    raise ErroSintatico(f"Erro de Sintaxe: Esperado '{tabela.simbolos[top]}', mas encontrou '{tok_type_name}' na linha {tok_obj.line}", tok_obj.line)
+            else:
                 # Lógica para não-terminais (consulta à tabela de parsing)
-                x = list(self.diction.keys()).index(top)
-                y = table_term_list.index(tok_type_name)
-                rule = parsing_table[x][y]
+                rule = celulas[(top - num_terminais) * num_terminais + y] if y != SEM_TERMINAL else VAZIA
 
-                if rule == '':
-                    raise SyntaxError(f"Erro de Sintaxe: Token inesperado '{tok_type_name}' para a regra '{top}' na linha {tok_obj.line}")
+                if rule == VAZIA:
+                    tok_type_name = table_term_list[y] if y != SEM_TERMINAL else nome_terminal(tok_obj.type)
+                    raise ErroSintatico(f"Erro de Sintaxe: Token inesperado '{tok_type_name}' para a regra '{tabela.simbolos[top]}' na linha {tok_obj.line}", tok_obj.line)
 
-                lhs, rhs_str = rule.split("->")
-                rhs_symbols = [sym for sym in rhs_str.strip().split() if sym != '#']
+                rhs_symbols = producoes[rule][1]
 
                 # Atualiza o nó atual com a regra que está sendo aplicada
-                current_node.tag = _tag_ok(lhs)
+                current_node.tag = tags[top]
                 
                 children_nodes = [
-                    ASTNode(tag=_tag_ok(sym), linha=tok_obj.line) for sym in rhs_symbols
+                    ASTNode(tag=tags[sym], linha=tok_obj.line) for sym in rhs_symbols
                 ]
                 current_node.children.extend(children_nodes)
 
-                stack = rhs_symbols + stack
-                node_stack = children_nodes + node_stack
+                # Empilha o lado direito invertido: o primeiro símbolo fica no topo
+                stack.extend(reversed(rhs_symbols))
+                node_stack.extend(reversed(children_nodes))
         
-        return root.to_dict()
+        return root
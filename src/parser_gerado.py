@@ -0,0 +1,588 @@
+# parser_gerado.py
+# Gerado por gerador_parser.py a partir de utils.rules. Não edite à mão:
+# altere a gramática e execute `python gerador_parser.py`.
+"""
+Parser descendente recursivo gerado para a gramática do TurtleScript.
+
+parse(tokens) devolve a mesma árvore de derivação (dicionários) que
+ASTParser.parse_with_ast e lança os mesmos SyntaxError, sem construir a
+tabela LL(1) nem processar a gramática ao ser importado.
+"""
+from tokenizer import Token, TokenType, ErroSintatico, nome_terminal
+from token_buffer import TokenBuffer, SEM_TERMINAL
+from utils import pausar_coletor
+from instrumentacao import NULO
+
+HASH_GRAMATICA = '331a12b9cce7752d2d51cf522c9a9dc8765245343e7066aec464d7337d65fd54'
+
+TERMINAIS = ['inicio', 'fim', 'avancar', 'recuar', 'girar_direita', 'girar_esquerda', 'ir_para', 'levantar_caneta', 'abaixar_caneta', 'definir_cor', 'definir_espessura', 'cor_de_fundo', 'limpar_tela', 'desenhar_quadrado', 'desenhar_circulo', 'var', 'inteiro', 'texto', 'real', 'logico', '=', ';', ':', ',', 'repita', 'vezes', 'fim_repita', 'enquanto', 'faca', 'fim_enquanto', 'se', 'entao', 'senao', 'fim_se', '#', '+', '-', '*', '/', '(', ')', '<=', '<', '>=', '>', '==', '!=', 'identificador', 'literal_texto', 'numero_inteiro', 'numero_real', 'verdadeiro', 'falso', '$']
+
+# Id do terminal (posição em TERMINAIS) de cada TokenType
+ID_POR_TIPO = {
+    TokenType.INICIO: 0,
+    TokenType.FIM: 1,
+    TokenType.VAR: 15,
+    TokenType.INTEIRO: 16,
+    TokenType.TEXTO: 17,
+    TokenType.REAL: 18,
+    TokenType.LOGICO: 19,
+    TokenType.AVANCAR: 2,
+    TokenType.RECUAR: 3,
+    TokenType.GIRAR_DIREITA: 4,
+    TokenType.GIRAR_ESQUERDA: 5,
+    TokenType.IR_PARA: 6,
+    TokenType.LEVANTAR_CANETA: 7,
+    TokenType.ABAIXAR_CANETA: 8,
+    TokenType.DEFINIR_COR: 9,
+    TokenType.DESENHAR_QUADRADO: 13,
+    TokenType.DESENHAR_CIRCULO: 14,
+    TokenType.DEFINIR_ESPESSURA: 10,
+    TokenType.COR_DE_FUNDO: 11,
+    TokenType.LIMPAR_TELA: 12,
+    TokenType.REPITA: 24,
+    TokenType.VEZES: 25,
+    TokenType.FIM_REPITA: 26,
+    TokenType.SE: 30,
+    TokenType.ENTAO: 31,
+    TokenType.SENAO: 32,
+    TokenType.FIM_SE: 33,
+    TokenType.ENQUANTO: 27,
+    TokenType.FACA: 28,
+    TokenType.FIM_ENQUANTO: 29,
+    TokenType.VERDADEIRO: 51,
+    TokenType.FALSO: 52,
+    TokenType.IDENTIFICADOR: 47,
+    TokenType.NUMERO_INTEIRO: 49,
+    TokenType.NUMERO_REAL: 50,
+    TokenType.LITERAL_TEXTO: 48,
+    TokenType.ATRIBUICAO: 20,
+    TokenType.DOIS_PONTOS: 22,
+    TokenType.PONTO_VIRGULA: 21,
+    TokenType.VIRGULA: 23,
+    TokenType.SOMA: 35,
+    TokenType.SUBTRACAO: 36,
+    TokenType.MULTIPLICACAO: 37,
+    TokenType.DIVISAO: 38,
+    TokenType.RESTO: 255,
+    TokenType.IGUAL: 45,
+    TokenType.MENOR: 42,
+    TokenType.MAIOR: 44,
+    TokenType.PARENTESE_ESQ: 39,
+    TokenType.PARENTESE_DIR: 40,
+    TokenType.EOF: 53
+}
+
+_FIM = (53, Token(TokenType.EOF, '$', -1))
+
+_C0 = frozenset([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 24, 27, 30, 47])
+_C1 = frozenset([2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 24, 27, 30, 47])
+_C2 = frozenset([1, 26, 29, 32, 33])
+_C3 = frozenset([39, 47, 48, 49, 50, 51, 52])
+_C4 = frozenset([41, 42, 43, 44, 45, 46])
+_C5 = frozenset([21, 25, 28, 31, 39, 40, 47, 48, 49, 50, 51, 52])
+_C6 = frozenset([21, 25, 28, 31, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52])
+_C7 = frozenset([21, 25, 28, 31, 35, 36, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52])
+_C8 = frozenset([49, 50])
+_C9 = frozenset([51, 52])
+
+
+class _Entrada:
+    """Token atual (tok), id do seu terminal (y) e os pares (id, token) restantes."""
+    __slots__ = ("y", "tok", "pares")
+
+    def __init__(self, pares):
+        self.pares = pares
+        self.y, self.tok = next(pares, _FIM)
+
+
+def _nome_atual(s):
+    return TERMINAIS[s.y] if s.y != SEM_TERMINAL else nome_terminal(s.tok.type)
+
+
+def _erro_regra(s, regra):
+    raise ErroSintatico(f"Erro de Sintaxe: Token inesperado '{_nome_atual(s)}' para a regra '{regra}' na linha {s.tok.line}", s.tok.line)
+
+
+def _casar(s, esperado):
+    if s.y != esperado:
+        raise ErroSintatico(f"Erro de Sintaxe: Esperado '{TERMINAIS[esperado]}', mas encontrou '{_nome_atual(s)}' na linha {s.tok.line}", s.tok.line)
+    tok = s.tok
+    no = {"tag": TERMINAIS[esperado], "linha": tok.line, "valor": tok.literal}
+    s.y, s.tok = next(s.pares, _FIM)
+    return no
+
+
+def _casar_atual(s, linha):
+    return _casar(s, s.y)
+
+
+def _p_S(s, linha):
+    y = s.y
+    if y == 0: # S -> inicio B fim
+        l = s.tok.line
+        f0 = _casar(s, 0)
+        f1 = _p_B(s, l)
+        f2 = _casar(s, 1)
+        return {"tag": "S", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'S')
+
+
+def _p_B(s, linha):
+    y = s.y
+    if y in _C0: # B -> CMDS
+        l = s.tok.line
+        f0 = _p_CMDS(s, l)
+        return {"tag": "B", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'B')
+
+
+def _p_CMDS(s, linha):
+    raiz = no = {"tag": "CMDS", "linha": linha}
+    while True:
+        y = s.y
+        if y in _C1: # CMDS -> CMD CMDS
+            l = s.tok.line
+            f0 = _p_CMD(s, l)
+            prox = {"tag": "CMDS", "linha": l}
+            no["filhos"] = [f0, prox]
+            no = prox
+        elif y in _C2: # CMDS -> #
+            return raiz
+        else:
+            _erro_regra(s, 'CMDS')
+
+
+def _p_CMD(s, linha):
+    f = _D_CMD.get(s.y)
+    if f is None:
+        _erro_regra(s, 'CMD')
+    return {"tag": "CMD", "linha": linha, "filhos": [f(s, s.tok.line)]}
+
+
+def _p_ATR(s, linha):
+    y = s.y
+    if y == 47: # ATR -> ATT ;
+        l = s.tok.line
+        f0 = _p_ATT(s, l)
+        f1 = _casar(s, 21)
+        return {"tag": "ATR", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'ATR')
+
+
+def _p_AV(s, linha):
+    y = s.y
+    if y == 2: # AV -> avancar REL ;
+        l = s.tok.line
+        f0 = _casar(s, 2)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "AV", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'AV')
+
+
+def _p_REC(s, linha):
+    y = s.y
+    if y == 3: # REC -> recuar REL ;
+        l = s.tok.line
+        f0 = _casar(s, 3)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "REC", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'REC')
+
+
+def _p_GD(s, linha):
+    y = s.y
+    if y == 4: # GD -> girar_direita REL ;
+        l = s.tok.line
+        f0 = _casar(s, 4)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "GD", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'GD')
+
+
+def _p_GE(s, linha):
+    y = s.y
+    if y == 5: # GE -> girar_esquerda REL ;
+        l = s.tok.line
+        f0 = _casar(s, 5)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "GE", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'GE')
+
+
+def _p_IRP(s, linha):
+    y = s.y
+    if y == 6: # IRP -> ir_para REL REL ;
+        l = s.tok.line
+        f0 = _casar(s, 6)
+        f1 = _p_REL(s, l)
+        f2 = _p_REL(s, l)
+        f3 = _casar(s, 21)
+        return {"tag": "IRP", "linha": linha, "filhos": [f0, f1, f2, f3]}
+    _erro_regra(s, 'IRP')
+
+
+def _p_LC(s, linha):
+    y = s.y
+    if y == 7: # LC -> levantar_caneta ;
+        f0 = _casar(s, 7)
+        f1 = _casar(s, 21)
+        return {"tag": "LC", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'LC')
+
+
+def _p_AC(s, linha):
+    y = s.y
+    if y == 8: # AC -> abaixar_caneta ;
+        f0 = _casar(s, 8)
+        f1 = _casar(s, 21)
+        return {"tag": "AC", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'AC')
+
+
+def _p_DC(s, linha):
+    y = s.y
+    if y == 9: # DC -> definir_cor REL ;
+        l = s.tok.line
+        f0 = _casar(s, 9)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "DC", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'DC')
+
+
+def _p_DE(s, linha):
+    y = s.y
+    if y == 10: # DE -> definir_espessura REL ;
+        l = s.tok.line
+        f0 = _casar(s, 10)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "DE", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'DE')
+
+
+def _p_CDF(s, linha):
+    y = s.y
+    if y == 11: # CDF -> cor_de_fundo REL ;
+        l = s.tok.line
+        f0 = _casar(s, 11)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 21)
+        return {"tag": "CDF", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'CDF')
+
+
+def _p_LP(s, linha):
+    y = s.y
+    if y == 12: # LP -> limpar_tela ;
+        f0 = _casar(s, 12)
+        f1 = _casar(s, 21)
+        return {"tag": "LP", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'LP')
+
+
+def _p_DSQ(s, linha):
+    y = s.y
+    if y == 13: # DSQ -> desenhar_quadrado REL REL ;
+        l = s.tok.line
+        f0 = _casar(s, 13)
+        f1 = _p_REL(s, l)
+        f2 = _p_REL(s, l)
+        f3 = _casar(s, 21)
+        return {"tag": "DSQ", "linha": linha, "filhos": [f0, f1, f2, f3]}
+    _erro_regra(s, 'DSQ')
+
+
+def _p_DSC(s, linha):
+    y = s.y
+    if y == 14: # DSC -> desenhar_circulo REL REL REL ;
+        l = s.tok.line
+        f0 = _casar(s, 14)
+        f1 = _p_REL(s, l)
+        f2 = _p_REL(s, l)
+        f3 = _p_REL(s, l)
+        f4 = _casar(s, 21)
+        return {"tag": "DSC", "linha": linha, "filhos": [f0, f1, f2, f3, f4]}
+    _erro_regra(s, 'DSC')
+
+
+def _p_DECL(s, linha):
+    y = s.y
+    if y == 15: # DECL -> var TYPE : ID ;
+        l = s.tok.line
+        f0 = _casar(s, 15)
+        f1 = _p_TYPE(s, l)
+        f2 = _casar(s, 22)
+        f3 = _p_ID(s, l)
+        f4 = _casar(s, 21)
+        return {"tag": "DECL", "linha": linha, "filhos": [f0, f1, f2, f3, f4]}
+    _erro_regra(s, 'DECL')
+
+
+def _p_TYPE(s, linha):
+    f = _D_TYPE.get(s.y)
+    if f is None:
+        _erro_regra(s, 'TYPE')
+    return {"tag": "TYPE", "linha": linha, "filhos": [f(s, s.tok.line)]}
+
+
+def _p_ATT(s, linha):
+    y = s.y
+    if y == 47: # ATT -> ID = REL
+        l = s.tok.line
+        f0 = _p_ID(s, l)
+        f1 = _casar(s, 20)
+        f2 = _p_REL(s, l)
+        return {"tag": "ATT", "linha": linha, "filhos": [f0, f1, f2]}
+    _erro_regra(s, 'ATT')
+
+
+def _p_REP(s, linha):
+    y = s.y
+    if y == 24: # REP -> repita REL vezes CMDS fim_repita ;
+        l = s.tok.line
+        f0 = _casar(s, 24)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 25)
+        f3 = _p_CMDS(s, l)
+        f4 = _casar(s, 26)
+        f5 = _casar(s, 21)
+        return {"tag": "REP", "linha": linha, "filhos": [f0, f1, f2, f3, f4, f5]}
+    _erro_regra(s, 'REP')
+
+
+def _p_ENQ(s, linha):
+    y = s.y
+    if y == 27: # ENQ -> enquanto REL faca CMDS fim_enquanto ;
+        l = s.tok.line
+        f0 = _casar(s, 27)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 28)
+        f3 = _p_CMDS(s, l)
+        f4 = _casar(s, 29)
+        f5 = _casar(s, 21)
+        return {"tag": "ENQ", "linha": linha, "filhos": [f0, f1, f2, f3, f4, f5]}
+    _erro_regra(s, 'ENQ')
+
+
+def _p_SE(s, linha):
+    y = s.y
+    if y == 30: # SE -> se REL entao CMDS SE_CONT
+        l = s.tok.line
+        f0 = _casar(s, 30)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 31)
+        f3 = _p_CMDS(s, l)
+        f4 = _p_SE_CONT(s, l)
+        return {"tag": "SE", "linha": linha, "filhos": [f0, f1, f2, f3, f4]}
+    _erro_regra(s, 'SE')
+
+
+def _p_SE_CONT(s, linha):
+    y = s.y
+    if y == 32: # SE_CONT -> senao CMDS fim_se ;
+        l = s.tok.line
+        f0 = _casar(s, 32)
+        f1 = _p_CMDS(s, l)
+        f2 = _casar(s, 33)
+        f3 = _casar(s, 21)
+        return {"tag": "SE_CONT", "linha": linha, "filhos": [f0, f1, f2, f3]}
+    elif y == 33: # SE_CONT -> fim_se ;
+        f0 = _casar(s, 33)
+        f1 = _casar(s, 21)
+        return {"tag": "SE_CONT", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'SE_CONT')
+
+
+def _p_REL(s, linha):
+    y = s.y
+    if y in _C3: # REL -> ADD REL'
+        l = s.tok.line
+        f0 = _p_ADD(s, l)
+        f1 = _p_REL_prime(s, l)
+        return {"tag": "REL", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'REL')
+
+
+def _p_REL_prime(s, linha):
+    raiz = no = {"tag": "REL_prime", "linha": linha}
+    while True:
+        y = s.y
+        if y in _C4: # REL' -> OP_REL ADD REL'
+            l = s.tok.line
+            f0 = _p_OP_REL(s, l)
+            f1 = _p_ADD(s, l)
+            prox = {"tag": "REL_prime", "linha": l}
+            no["filhos"] = [f0, f1, prox]
+            no = prox
+        elif y in _C5: # REL' -> #
+            return raiz
+        else:
+            _erro_regra(s, "REL'")
+
+
+def _p_OP_REL(s, linha):
+    f = _D_OP_REL.get(s.y)
+    if f is None:
+        _erro_regra(s, 'OP_REL')
+    return {"tag": "OP_REL", "linha": linha, "filhos": [f(s, s.tok.line)]}
+
+
+def _p_ADD(s, linha):
+    y = s.y
+    if y in _C3: # ADD -> MUL ADD'
+        l = s.tok.line
+        f0 = _p_MUL(s, l)
+        f1 = _p_ADD_prime(s, l)
+        return {"tag": "ADD", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'ADD')
+
+
+def _p_ADD_prime(s, linha):
+    raiz = no = {"tag": "ADD_prime", "linha": linha}
+    while True:
+        y = s.y
+        if y == 35: # ADD' -> + MUL ADD'
+            l = s.tok.line
+            f0 = _casar(s, 35)
+            f1 = _p_MUL(s, l)
+            prox = {"tag": "ADD_prime", "linha": l}
+            no["filhos"] = [f0, f1, prox]
+            no = prox
+        elif y == 36: # ADD' -> - MUL ADD'
+            l = s.tok.line
+            f0 = _casar(s, 36)
+            f1 = _p_MUL(s, l)
+            prox = {"tag": "ADD_prime", "linha": l}
+            no["filhos"] = [f0, f1, prox]
+            no = prox
+        elif y in _C6: # ADD' -> #
+            return raiz
+        else:
+            _erro_regra(s, "ADD'")
+
+
+def _p_MUL(s, linha):
+    y = s.y
+    if y in _C3: # MUL -> FACTOR MUL'
+        l = s.tok.line
+        f0 = _p_FACTOR(s, l)
+        f1 = _p_MUL_prime(s, l)
+        return {"tag": "MUL", "linha": linha, "filhos": [f0, f1]}
+    _erro_regra(s, 'MUL')
+
+
+def _p_MUL_prime(s, linha):
+    raiz = no = {"tag": "MUL_prime", "linha": linha}
+    while True:
+        y = s.y
+        if y == 37: # MUL' -> * FACTOR MUL'
+            l = s.tok.line
+            f0 = _casar(s, 37)
+            f1 = _p_FACTOR(s, l)
+            prox = {"tag": "MUL_prime", "linha": l}
+            no["filhos"] = [f0, f1, prox]
+            no = prox
+        elif y == 38: # MUL' -> / FACTOR MUL'
+            l = s.tok.line
+            f0 = _casar(s, 38)
+            f1 = _p_FACTOR(s, l)
+            prox = {"tag": "MUL_prime", "linha": l}
+            no["filhos"] = [f0, f1, prox]
+            no = prox
+        elif y in _C7: # MUL' -> #
+            return raiz
+        else:
+            _erro_regra(s, "MUL'")
+
+
+def _p_FACTOR(s, linha):
+    y = s.y
+    if y == 39: # FACTOR -> ( REL )
+        l = s.tok.line
+        f0 = _casar(s, 39)
+        f1 = _p_REL(s, l)
+        f2 = _casar(s, 40)
+        return {"tag": "FACTOR", "linha": linha, "filhos": [f0, f1, f2]}
+    elif y == 47: # FACTOR -> ID
+        l = s.tok.line
+        f0 = _p_ID(s, l)
+        return {"tag": "FACTOR", "linha": linha, "filhos": [f0]}
+    elif y in _C8: # FACTOR -> NUM
+        l = s.tok.line
+        f0 = _p_NUM(s, l)
+        return {"tag": "FACTOR", "linha": linha, "filhos": [f0]}
+    elif y == 48: # FACTOR -> TEXT
+        l = s.tok.line
+        f0 = _p_TEXT(s, l)
+        return {"tag": "FACTOR", "linha": linha, "filhos": [f0]}
+    elif y in _C9: # FACTOR -> BOOL
+        l = s.tok.line
+        f0 = _p_BOOL(s, l)
+        return {"tag": "FACTOR", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'FACTOR')
+
+
+def _p_ID(s, linha):
+    y = s.y
+    if y == 47: # ID -> identificador
+        f0 = _casar(s, 47)
+        return {"tag": "ID", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'ID')
+
+
+def _p_NUM(s, linha):
+    y = s.y
+    if y == 49: # NUM -> numero_inteiro
+        f0 = _casar(s, 49)
+        return {"tag": "NUM", "linha": linha, "filhos": [f0]}
+    elif y == 50: # NUM -> numero_real
+        f0 = _casar(s, 50)
+        return {"tag": "NUM", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'NUM')
+
+
+def _p_TEXT(s, linha):
+    y = s.y
+    if y == 48: # TEXT -> literal_texto
+        f0 = _casar(s, 48)
+        return {"tag": "TEXT", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'TEXT')
+
+
+def _p_BOOL(s, linha):
+    y = s.y
+    if y == 51: # BOOL -> verdadeiro
+        f0 = _casar(s, 51)
+        return {"tag": "BOOL", "linha": linha, "filhos": [f0]}
+    elif y == 52: # BOOL -> falso
+        f0 = _casar(s, 52)
+        return {"tag": "BOOL", "linha": linha, "filhos": [f0]}
+    _erro_regra(s, 'BOOL')
+
+
+_D_CMD = {2: _p_AV, 3: _p_REC, 4: _p_GD, 5: _p_GE, 6: _p_IRP, 7: _p_LC, 8: _p_AC, 9: _p_DC, 10: _p_DE, 11: _p_CDF, 12: _p_LP, 13: _p_DSQ, 14: _p_DSC, 15: _p_DECL, 24: _p_REP, 27: _p_ENQ, 30: _p_SE, 47: _p_ATR}
+_D_TYPE = {16: _casar_atual, 17: _casar_atual, 18: _casar_atual, 19: _casar_atual}
+_D_OP_REL = {41: _casar_atual, 42: _casar_atual, 43: _casar_atual, 44: _casar_atual, 45: _casar_atual, 46: _casar_atual}
+
+
+def parse(tokens, medidor=NULO):
+    """
+    Árvore de derivação de um iterável de tokens (lista, TokenBuffer ou
+    gerador). Os tokens são consumidos sob demanda; tokens depois do fim
+    do programa são ignorados. O tempo de parsing é registrado na fase
+    "sintático" do medidor (ver instrumentacao.py). A árvore já é montada
+    em dicionários: a fase "to_dict" do ASTParser aparece com tempo zero.
+    """
+    if isinstance(tokens, TokenBuffer):
+        pares = zip(tokens.ids_terminais(TERMINAIS), tokens)
+    else:
+        pares = ((ID_POR_TIPO[tok.type], tok) for tok in tokens)
+    with pausar_coletor(), medidor.fase("sintático"):
+        arvore = _p_S(_Entrada(pares), 1)
+    medidor.fase("to_dict")
+    return arvore
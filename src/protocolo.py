@@ -0,0 +1,50 @@
+# protocolo.py
+"""
+Protocolo do servidor de compilação (servidor.py) e do seu cliente
+(cliente.py): JSON delimitado por quebras de linha (NDJSON), uma mensagem
+por linha, em UTF-8.
+
+Pedidos:
+    {"id": 1, "op": "compile", "source": "inicio ... fim"}
+    {"id": 2, "op": "health"}
+    {"id": 3, "op": "metrics"}
+
+Respostas (com o mesmo "id"; em uma conexão, respostas de pedidos diferentes
+podem chegar fora de ordem):
+    {"id": 1, "ok": true, "code": "...", "from_cache": false}
+    {"id": 1, "ok": false, "errors": [{"phase": "sintático", "message": "...", "line": 3}]}
+    {"id": 2, "ok": true, "status": "ok", "uptime": 12.5}
+    {"id": 3, "ok": true, "metrics": {...}}
+
+Falhas do próprio servidor (pedido inválido, fila cheia, erro interno) usam
+a fase "servidor".
+
+Este módulo não importa o compilador, para que o cliente inicie rápido.
+"""
+import json
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+
+# Tamanho máximo de uma linha (pedido ou resposta), em bytes.
+LIMITE_LINHA = 64 * 1024 * 1024
+
+SERVIDOR = "servidor"
+
+
+def codificar(mensagem):
+    """Mensagem (dicionário) -> linha NDJSON em bytes."""
+    return json.dumps(mensagem, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decodificar(linha):
+    """Linha NDJSON (bytes) -> mensagem; ValueError se não for um objeto JSON."""
+    mensagem = json.loads(linha)
+    if not isinstance(mensagem, dict):
+        raise ValueError("a mensagem deve ser um objeto JSON")
+    return mensagem
+
+
+def erro_servidor(mensagem, id_pedido=None):
+    """Resposta de falha do servidor (fora das fases do compilador)."""
+    return {"id": id_pedido, "ok": False, "errors": [{"phase": SERVIDOR, "message": mensagem, "line": None}]}
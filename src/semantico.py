@@ -1,14 +1,45 @@
 # semantic.py
+from lowering import lower
+from utils import NodeVisitor, tabela_de_despacho
+from ast_nodes import OPERADORES_RELACIONAIS
+from diagnostico import PADRAO
 
 class SemanticError(Exception):
     """Classe de exceção para erros semânticos."""
     def __init__(self, message, line=None):
+        self.message = message
+        self.line = line
         full_message = f"Erro Semântico"
         if line:
             full_message += f" (linha {line})"
         full_message += f": {message}"
         super().__init__(full_message)
 
+NUMERICOS = ('inteiro', 'real')
+
+def tipo_resultado(op, left_type, right_type):
+    """
+    Tipo do resultado de `left_type op right_type`, ou None se o operador
+    não se aplica a esses tipos:
+      - relacionais: operandos numéricos, ou do mesmo tipo ('==' e '!=' para
+        qualquer tipo, '<', '>', '<=' e '>=' também para texto) -> logico;
+      - '+', '-', '*' com números: inteiro se os dois forem inteiros, senão real;
+      - '/' com números: sempre real (a divisão do Python não trunca);
+      - '+' entre textos: concatenação -> texto.
+    """
+    numericos = left_type in NUMERICOS and right_type in NUMERICOS
+    if op in OPERADORES_RELACIONAIS:
+        if numericos or (left_type == right_type and (op in ('==', '!=') or left_type == 'texto')):
+            return 'logico'
+        return None
+    if numericos:
+        if op == '/' or 'real' in (left_type, right_type):
+            return 'real'
+        return 'inteiro'
+    if op == '+' and left_type == right_type == 'texto':
+        return 'texto'
+    return None
+
 class Symbol:
     def __init__(self, name, type):
         self.name = name
@@ -28,6 +59,9 @@ class SymbolTable:
             raise SemanticError(f"Variável '{name}' já foi declarada.")
         self._symbols[name] = Symbol(name, type)
 
+    def __len__(self):
+        return len(self._symbols)
+
     def lookup(self, name):
         """Busca por uma variável na tabela."""
         symbol = self._symbols.get(name)
@@ -35,252 +69,180 @@ class SymbolTable:
             raise SemanticError(f"Variável '{name}' não foi declarada.")
         return symbol
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(NodeVisitor):
     """
     Percorre a AST para realizar a análise semântica.
-    Utiliza o padrão de projeto Visitor.
+    Utiliza o padrão de projeto Visitor (NodeVisitor despacha visit_<nó>;
+    as verificações check_<comando> ficam em uma tabela semelhante).
     """
-    def __init__(self, ast_tree):
-        self.ast = ast_tree
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._verificacoes = tabela_de_despacho(cls, "check_")
+
+    def __init__(self, ast_tree, diagnostico=None):
+        # Aceita a AST (ast_nodes) ou a árvore de derivação do parser
+        self.ast = lower(ast_tree)
         self.symbol_table = SymbolTable()
+        self.diag = diagnostico or PADRAO
 
     def analyze(self):
         """Método principal para iniciar a análise."""
-        print("\n--- Iniciando Análise Semântica ---")
+        self.diag.info("\n--- Iniciando Análise Semântica ---")
         self.visit(self.ast)
-        print("--- Análise Semântica Concluída com Sucesso! ---")
-
-    def visit(self, node):
-        """Método visitante genérico que despacha para o método específico do nó."""
-        method_name = f'visit_{node["tag"]}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        # Passa o nó inteiro para o método visitante
-        return visitor(node)
-
-    def generic_visit(self, node):
-        """Método para visitar nós que não têm uma regra específica."""
-        if 'filhos' in node:
-            for child in node['filhos']:
-                self.visit(child)
+        self.diag.info("--- Análise Semântica Concluída com Sucesso! ---")
 
     # --- Métodos de Visita Específicos para cada tipo de nó da AST ---
 
-    def visit_Bloco(self, node):
-        # O bloco principal apenas contém uma lista de comandos
-        self.generic_visit(node)
+    def visit_Program(self, node):
+        # O programa apenas contém uma lista de comandos
+        self._visit_comandos(node.body)
 
-    def visit_DECL(self, node):
-        """Processa a declaração de uma variável."""
-        # Estrutura do nó DECL: [var, TYPE, :, ID, ;]
-        var_type_node = node['filhos'][1] # Nó TYPE
-        var_type = var_type_node['filhos'][0]['tag'] # 'inteiro', 'texto', etc.
+    def _visit_comandos(self, comandos):
+        for comando in comandos:
+            self.visit(comando)
 
-        var_id_node = node['filhos'][3] # Nó ID
-        var_name = var_id_node['filhos'][0]['tag'] # 'identificador'
-        
-        # O nome real do identificador está no valor literal, que não está na AST.
-        # Para simplificar, vamos assumir que o nome é "identificador" para fins de exemplo
-        # ou ajustar o parser para incluir o valor literal.
-        # Por simplicidade aqui, vamos usar o nome 'identificador' como placeholder.
-        # Idealmente, o tokenizer/parser deveria anexar o valor literal ao nó.
-        # Assumindo que o nome do identificador é seu valor:
-        var_name = var_id_node['filhos'][0]['valor'] if 'valor' in var_id_node['filhos'][0] else 'identificador_desconhecido'
-
-        print(f"Declarando variável '{var_name}' do tipo '{var_type}' na linha {node['linha']}.")
-        self.symbol_table.define(var_name, var_type)
+    def visit_VarDecl(self, node):
+        """Processa a declaração de uma variável."""
+        self.diag.debug("Declarando variável '{}' do tipo '{}' na linha {}.", node.name, node.var_type, node.linha)
+        self.symbol_table.define(node.name, node.var_type)
     
-    def visit_ATR(self, node):
-        """Processa uma atribuição (ATT -> ID = REL)."""
-        # Nó ATT: filhos [ID, =, REL]
-        att_node = node['filhos'][0] 
-        var_name_node = att_node['filhos'][0]['filhos'][0]
-        var_name = var_name_node['valor'] # Assumindo que o parser adiciona o valor
+    def visit_Assign(self, node):
+        """Processa uma atribuição (ID = REL)."""
+        var_name = node.name
         
         # Verifica se a variável foi declarada
         symbol = self.symbol_table.lookup(var_name)
         
         # Avalia o tipo da expressão à direita
-        expr_type = self.visit(att_node['filhos'][2]) # Visita o nó REL
+        expr_type = self.visit(node.value)
         
-        print(f"Verificando atribuição para '{var_name}' na linha {node['linha']}. Tipo esperado: '{symbol.type}', Tipo encontrado: '{expr_type}'.")
+        self.diag.debug("Verificando atribuição para '{}' na linha {}. Tipo esperado: '{}', Tipo encontrado: '{}'.", var_name, node.linha, symbol.type, expr_type)
 
         # Regra de verificação de tipo
         # Permite atribuir inteiro a real, mas não o contrário sem coerção.
         if symbol.type == 'real' and expr_type == 'inteiro':
             pass # Válido
         elif symbol.type != expr_type:
-            raise SemanticError(f"Não é possível atribuir um valor do tipo '{expr_type}' à variável '{var_name}' do tipo '{symbol.type}'.", node['linha'])
-
-    def visit_REL(self, node):
-        # Para expressões, o tipo da expressão é o tipo do seu primeiro operando.
-        # Uma análise mais completa resolveria o tipo resultante da operação.
-        return self.visit(node['filhos'][0])
-
-    def visit_ADD(self, node):
-        return self.visit(node['filhos'][0])
-    
-    def visit_MUL(self, node):
-        return self.visit(node['filhos'][0])
-
-    def visit_FACTOR(self, node):
-        """Retorna o tipo de um fator base da expressão."""
-        factor_child = node['filhos'][0]
-        tag = factor_child['tag']
-        
-        if tag == 'NUM':
-            num_type = factor_child['filhos'][0]['tag'] # numero_inteiro ou numero_real
-            return 'inteiro' if num_type == 'numero_inteiro' else 'real'
-        elif tag == 'TEXT':
-            return 'texto'
-        elif tag == 'BOOL':
-            return 'logico'
-        elif tag == 'ID':
-            var_name = factor_child['filhos'][0]['valor'] # Assumindo que o parser adiciona o valor
-            return self.symbol_table.lookup(var_name).type
-        elif tag == '(': # ( REL )
-            return self.visit(factor_child['filhos'][1]) # Visita o nó REL interno
-        else:
-            # Para nós como 'avancar', 'recuar' que podem estar aqui por erro de gramática
-            raise SemanticError(f"Fator inesperado na expressão: {tag}", node['linha'])
-
-    def visit_AV(self, node):
-        """Verifica o comando 'avancar'."""
-        arg_type = self.visit(node['filhos'][1]) # Visita o nó REL
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(f"O comando 'avancar' espera um argumento numérico (inteiro ou real), mas recebeu '{arg_type}'.", node['linha'])
-            
-    def visit_definir_cor(self, node):
-        """Verifica o comando 'definir_cor'."""
-        arg_type = self.visit(node['filhos'][1]) # Visita o nó REL
-        if arg_type != 'texto':
-            raise SemanticError(f"O comando 'definir_cor' espera um argumento do tipo texto, mas recebeu '{arg_type}'.", node['linha'])
-            
-    # Adicione métodos 'visit_*' para outros comandos (REC, GD, GE, etc.) seguindo o mesmo padrão.
-    def visit_REC(self, node):
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(f"O comando 'recuar' espera um argumento numérico, mas recebeu '{arg_type}'.", node['linha'])
+            raise SemanticError(f"Não é possível atribuir um valor do tipo '{expr_type}' à variável '{var_name}' do tipo '{symbol.type}'.", node.linha)
+
+    # --- Expressões: o tipo de cada uma é devolvido e guardado em node.tipo ---
+
+    def visit_BinOp(self, node):
+        """Retorna o tipo do resultado da operação (ver tipo_resultado)."""
+        left_type = self.visit(node.left)
+        right_type = self.visit(node.right)
+        node.tipo = tipo_resultado(node.op, left_type, right_type)
+        if node.tipo is None:
+            raise SemanticError(f"O operador '{node.op}' não se aplica aos tipos '{left_type}' e '{right_type}'.", node.linha)
+        return node.tipo
+
+    def visit_Literal(self, node):
+        """Retorna o tipo de uma constante."""
+        node.tipo = node.kind
+        return node.tipo
+
+    def visit_Name(self, node):
+        """Retorna o tipo declarado da variável."""
+        node.tipo = self.symbol_table.lookup(node.name).type
+        return node.tipo
+
+    def visit_Repeat(self, node):
+        """Verifica o contador de um comando 'repita'."""
+        counter_type = self.visit(node.count)
+        if counter_type != 'inteiro':
+            raise SemanticError(f"O contador do 'repita' deve ser do tipo inteiro, mas é '{counter_type}'.", node.linha)
+        self._visit_comandos(node.body)
 
-    def visit_SE(self, node):
+    def visit_If(self, node):
         """Verifica a condição de um comando 'se'."""
-        condition_type = self.visit(node['filhos'][1]) # Nó REL
+        condition_type = self.visit(node.cond)
         if condition_type != 'logico':
-            raise SemanticError(f"A condição do 'se' deve ser do tipo logico, mas é '{condition_type}'.", node['linha'])
+            raise SemanticError(f"A condição do 'se' deve ser do tipo logico, mas é '{condition_type}'.", node.linha)
         # Visita os blocos 'entao' e 'senao'
-        self.visit(node['filhos'][3]) # Nó CMDS (entao)
-        self.visit(node['filhos'][4]) # Nó SE_CONT (senao/fim_se)
+        self._visit_comandos(node.then)
+        if node.orelse is not None:
+            self._visit_comandos(node.orelse)
         
-    def visit_ENQ(self, node):
+    def visit_While(self, node):
         """Verifica a condição de um comando 'enquanto'."""
-        condition_type = self.visit(node['filhos'][1]) # Nó REL
+        condition_type = self.visit(node.cond)
         if condition_type != 'logico':
-            raise SemanticError(f"A condição do 'enquanto' deve ser do tipo logico, mas é '{condition_type}'.", node['linha'])
-        self.visit(node['filhos'][3]) # Nó CMDS (faca)
-        
-    def visit_REP(self, node):
-        """Verifica o contador de um comando 'repita'."""
-        counter_type = self.visit(node['filhos'][1]) # Nó REL
-        if counter_type != 'inteiro':
-            raise SemanticError(f"O contador do 'repita' deve ser do tipo inteiro, mas é '{counter_type}'.", node['linha'])
-        self.visit(node['filhos'][3]) # Nó CMDS
-    
-    def generic_visit(self, node):
-        """Método para visitar nós que não têm uma regra específica."""
-        if 'filhos' in node:
-            for child in node['filhos']:
-                self.visit(child)
-    
-    # Adicione este método dentro da classe SemanticAnalyzer em semantic.py
+            raise SemanticError(f"A condição do 'enquanto' deve ser do tipo logico, mas é '{condition_type}'.", node.linha)
+        self._visit_comandos(node.body)
+
+    # --- Comandos da tartaruga (Call) ---
+
+    def visit_Call(self, node):
+        """
+        Despacha para a verificação do comando (check_<cmd>), que visita os
+        argumentos; sem verificação, os argumentos são apenas visitados.
+        """
+        checker = self._verificacoes.get(node.cmd)
+        if checker:
+            checker(self, node)
+        else:
+            for arg in node.args:
+                self.visit(arg)
 
-    def visit_GE(self, node):
-        """Verifica o comando 'girar_esquerda'."""
-        # O nó GE tem como filhos [girar_esquerda, REL, ;]
-        # O argumento está no segundo filho (índice 1)
-        arg_type = self.visit(node['filhos'][1]) # Visita o nó REL para obter seu tipo
-        
+    def _tipo_numerico(self, node, mensagem, indice=0):
+        """Verifica se o argumento de índice `indice` é numérico."""
+        arg_type = self.visit(node.args[indice])
         if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(
-                f"O comando 'girar_esquerda' espera um argumento numérico (inteiro ou real), mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
-    
-    # Adicione também estes métodos ao semantic.py
+            raise SemanticError(mensagem.format(arg_type), node.linha)
 
-    def visit_GD(self, node):
-        """Verifica o comando 'girar_direita'."""
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(
-                f"O comando 'girar_direita' espera um argumento numérico (inteiro ou real), mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
+    def _tipo_texto(self, node, mensagem, indice=0):
+        """Verifica se o argumento de índice `indice` é do tipo texto."""
+        arg_type = self.visit(node.args[indice])
+        if arg_type != 'texto':
+            raise SemanticError(mensagem.format(arg_type), node.linha)
 
-    def visit_DE(self, node):
-        """Verifica o comando 'definir_espessura'."""
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(
-                f"O comando 'definir_espessura' espera um argumento numérico (inteiro ou real), mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
-    
-    # Adicione estes métodos à classe SemanticAnalyzer em semantic.py
+    def check_avancar(self, node):
+        self._tipo_numerico(node, "O comando 'avancar' espera um argumento numérico (inteiro ou real), mas recebeu '{}'.")
 
-    def visit_DC(self, node):
-        """Verifica o comando 'definir_cor'."""
-        # Gramática: DC -> definir_cor REL ;
-        arg_type = self.visit(node['filhos'][1]) # Visita o nó REL
-        if arg_type != 'texto':
-            raise SemanticError(
-                f"O comando 'definir_cor' espera um argumento do tipo texto, mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
+    def check_recuar(self, node):
+        self._tipo_numerico(node, "O comando 'recuar' espera um argumento numérico, mas recebeu '{}'.")
 
-    def visit_CDF(self, node):
-        """Verifica o comando 'cor_de_fundo'."""
-        # Gramática: CDF -> cor_de_fundo REL ;
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type != 'texto':
-            raise SemanticError(
-                f"O comando 'cor_de_fundo' espera um argumento do tipo texto, mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
+    def check_girar_esquerda(self, node):
+        self._tipo_numerico(node, "O comando 'girar_esquerda' espera um argumento numérico (inteiro ou real), mas recebeu '{}'.")
 
-    def visit_DSQ(self, node):
-        """Verifica o comando 'desenhar_quadrado'."""
-        # Gramática: DSQ -> desenhar_quadrado REL ;
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(
-                f"O comando 'desenhar_quadrado' espera um argumento numérico, mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
+    def check_girar_direita(self, node):
+        self._tipo_numerico(node, "O comando 'girar_direita' espera um argumento numérico (inteiro ou real), mas recebeu '{}'.")
 
-    def visit_DSC(self, node):
-        """Verifica o comando 'desenhar_circulo'."""
-        # Gramática: DSC -> desenhar_circulo REL ;
-        arg_type = self.visit(node['filhos'][1])
-        if arg_type not in ['inteiro', 'real']:
-            raise SemanticError(
-                f"O comando 'desenhar_circulo' espera um argumento numérico, mas recebeu '{arg_type}'.", 
-                node['linha']
-            )
+    def check_definir_espessura(self, node):
+        self._tipo_numerico(node, "O comando 'definir_espessura' espera um argumento numérico (inteiro ou real), mas recebeu '{}'.")
 
-    def visit_IRP(self, node):
+    def check_definir_cor(self, node):
+        self._tipo_texto(node, "O comando 'definir_cor' espera um argumento do tipo texto, mas recebeu '{}'.")
+
+    def check_cor_de_fundo(self, node):
+        self._tipo_texto(node, "O comando 'cor_de_fundo' espera um argumento do tipo texto, mas recebeu '{}'.")
+
+    def check_desenhar_quadrado(self, node):
+        self._tipo_numerico(node, "O comando 'desenhar_quadrado' espera um argumento numérico, mas recebeu '{}'.")
+        self._tipo_texto(node, "A cor do comando 'desenhar_quadrado' deve ser do tipo texto, mas é '{}'.", 1)
+
+    def check_desenhar_circulo(self, node):
+        self._tipo_numerico(node, "O comando 'desenhar_circulo' espera um argumento numérico, mas recebeu '{}'.")
+        self._tipo_texto(node, "A cor de fundo do comando 'desenhar_circulo' deve ser do tipo texto, mas é '{}'.", 1)
+        self._tipo_texto(node, "A cor da borda do comando 'desenhar_circulo' deve ser do tipo texto, mas é '{}'.", 2)
+
+    def check_ir_para(self, node):
         """Verifica o comando 'ir_para', que possui dois argumentos."""
-        # Gramática: IRP -> ir_para REL REL ;
-        # Os filhos do nó são [ir_para, REL, REL, ;]
-        arg1_type = self.visit(node['filhos'][1]) # Primeiro argumento REL
-        arg2_type = self.visit(node['filhos'][2]) # Segundo argumento REL
+        arg1_type = self.visit(node.args[0]) # Coordenada x
+        arg2_type = self.visit(node.args[1]) # Coordenada y
 
         if arg1_type not in ['inteiro', 'real']:
             raise SemanticError(
                 f"O primeiro argumento do comando 'ir_para' (coordenada x) deve ser numérico, mas recebeu '{arg1_type}'.",
-                node['linha']
+                node.linha
             )
         
         if arg2_type not in ['inteiro', 'real']:
             raise SemanticError(
                 f"O segundo argumento do comando 'ir_para' (coordenada y) deve ser numérico, mas recebeu '{arg2_type}'.",
-                node['linha']
-            )
\ No newline at end of file
+                node.linha
+            )
+
+
+SemanticAnalyzer._verificacoes = tabela_de_despacho(SemanticAnalyzer, "check_")
@@ -0,0 +1,292 @@
+# servidor.py
+"""
+Servidor de compilação: processo residente que mantém o parser e a tabela
+LL(1) prontos e atende pedidos NDJSON (ver protocolo.py) em um socket Unix
+ou em uma porta TCP local.
+
+A compilação (trabalho de CPU) roda em um ProcessPoolExecutor cujos
+processos recebem o Compiler já preparado. No máximo --concorrencia pedidos
+são compilados ao mesmo tempo; até --fila outros esperam a vez e, além
+disso, o pedido é recusado na hora com um erro "servidor".
+
+    python servidor.py --unix /tmp/turtlescript.sock --workers 4
+    python servidor.py --porta 8765
+"""
+import os
+import sys
+import stat
+import time
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from tokenizer import MOTORES
+from compilador import Compiler
+from cache_compilacao import CacheCompilacao
+from diagnostico import Diagnostico, DestinoStderr, DestinoArquivo, PADRAO, DEBUG, INFO, AVISO
+from protocolo import (
+    HOST_PADRAO, PORTA_PADRAO, LIMITE_LINHA, codificar, decodificar, erro_servidor,
+)
+
+# Compilador de cada processo trabalhador, preenchido por _iniciar_trabalhador.
+_compilador = None
+
+
+def _iniciar_trabalhador(compilador):
+    global _compilador
+    # As mensagens das fases de cada pedido não vão para o log do servidor
+    compilador.diag = PADRAO
+    _compilador = compilador
+    # Ctrl+C é tratado pelo processo principal, que encerra o pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _compilar(fonte):
+    """Executado nos processos trabalhadores: a resposta de um pedido compile (sem o id)."""
+    resultado = _compilador.compile(fonte, keep_tokens=False)
+    if resultado.ok:
+        return {"ok": True, "code": resultado.code, "from_cache": resultado.from_cache}
+    return {"ok": False, "errors": [erro.para_dict() for erro in resultado.errors]}
+
+
+class ServidorCompilacao:
+    """
+    Atende conexões NDJSON; cada linha recebida vira uma tarefa, de modo que
+    um cliente pode enviar vários pedidos sem esperar as respostas.
+    """
+
+    def __init__(self, compilador, workers=None, concorrencia=None, fila=64, diagnostico=None):
+        self.compilador = compilador
+        self.workers = workers or os.cpu_count() or 1
+        self.concorrencia = concorrencia or self.workers
+        self.fila = fila
+        self.diag = diagnostico or compilador.diag
+        self.inicio = time.monotonic()
+        self.metricas = {
+            "requests": 0,        # Pedidos recebidos (qualquer op)
+            "compiled": 0,        # Compilações sem erro
+            "failed": 0,          # Compilações com erro léxico, sintático ou semântico
+            "cache_hits": 0,      # Compilações respondidas pelo cache
+            "rejected": 0,        # Pedidos recusados (fila cheia ou inválidos)
+            "internal_errors": 0, # Exceções inesperadas durante a compilação
+            "compile_seconds": 0.0,
+        }
+        self.em_andamento = 0
+        self.esperando = 0
+        self._vagas = None
+        self._executor = None
+
+    async def iniciar(self, unix=None, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        """Cria o pool de processos e começa a escutar; devolve o asyncio.Server."""
+        if unix:
+            remover_socket(unix)
+        self._vagas = asyncio.Semaphore(self.concorrencia)
+        self._executor = ProcessPoolExecutor(
+            self.workers, initializer=_iniciar_trabalhador, initargs=(self.compilador,))
+        if unix:
+            servidor = await asyncio.start_unix_server(self._atender, unix, limit=LIMITE_LINHA)
+            self.diag.info("Servidor de compilação ouvindo em {}", unix)
+        else:
+            servidor = await asyncio.start_server(self._atender, host, porta, limit=LIMITE_LINHA)
+            self.diag.info("Servidor de compilação ouvindo em {}:{}", host, porta)
+        return servidor
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    # -- Conexões --
+
+    async def _atender(self, reader, writer):
+        pendentes = set()
+        try:
+            while True:
+                try:
+                    linha = await reader.readline()
+                except ValueError:
+                    # Linha maior que LIMITE_LINHA: o restante do fluxo não é confiável
+                    writer.write(codificar(erro_servidor("pedido maior que o limite do servidor")))
+                    break
+                except ConnectionError:
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                tarefa = asyncio.ensure_future(self._responder(linha, writer))
+                pendentes.add(tarefa)
+                tarefa.add_done_callback(pendentes.discard)
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _responder(self, linha, writer):
+        resposta = await self.processar(linha)
+        try:
+            writer.write(codificar(resposta))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def processar(self, linha):
+        """Resposta (dicionário) para uma linha de pedido."""
+        self.metricas["requests"] += 1
+        try:
+            pedido = decodificar(linha)
+        except ValueError as e:
+            self.metricas["rejected"] += 1
+            return erro_servidor(f"pedido inválido: {e}")
+
+        id_pedido = pedido.get("id")
+        op = pedido.get("op", "compile")
+        if op == "health":
+            resposta = {"ok": True, "status": "ok", "uptime": round(time.monotonic() - self.inicio, 3)}
+        elif op == "metrics":
+            resposta = {"ok": True, "metrics": self.obter_metricas()}
+        elif op == "compile":
+            fonte = pedido.get("source")
+            if not isinstance(fonte, str):
+                self.metricas["rejected"] += 1
+                return erro_servidor("o pedido compile precisa do campo 'source' (texto)", id_pedido)
+            resposta = await self.compilar(fonte)
+        else:
+            self.metricas["rejected"] += 1
+            return erro_servidor(f"operação desconhecida: {op!r}", id_pedido)
+        resposta["id"] = id_pedido
+        return resposta
+
+    async def compilar(self, fonte):
+        """Compila fonte no pool, respeitando o limite de concorrência e o tamanho da fila."""
+        if self._vagas.locked() and self.esperando >= self.fila:
+            self.metricas["rejected"] += 1
+            return erro_servidor("servidor ocupado: fila de compilação cheia")
+
+        self.esperando += 1
+        try:
+            await self._vagas.acquire()
+        finally:
+            self.esperando -= 1
+        self.em_andamento += 1
+        inicio = time.perf_counter()
+        try:
+            resposta = await asyncio.get_running_loop().run_in_executor(self._executor, _compilar, fonte)
+        except Exception as e:
+            self.metricas["internal_errors"] += 1
+            self.diag.erro("Erro interno ao compilar: {}: {}", type(e).__name__, e)
+            return erro_servidor(f"erro interno ({type(e).__name__}): {e}")
+        finally:
+            self.metricas["compile_seconds"] += time.perf_counter() - inicio
+            self.em_andamento -= 1
+            self._vagas.release()
+
+        if resposta["ok"]:
+            self.metricas["compiled"] += 1
+            self.metricas["cache_hits"] += resposta["from_cache"]
+        else:
+            self.metricas["failed"] += 1
+        return resposta
+
+    def obter_metricas(self):
+        metricas = dict(self.metricas)
+        compilacoes = metricas["compiled"] + metricas["failed"]
+        metricas["compile_seconds"] = round(metricas["compile_seconds"], 6)
+        metricas["mean_compile_ms"] = round(metricas["compile_seconds"] / compilacoes * 1000, 3) if compilacoes else 0.0
+        metricas.update({
+            "in_flight": self.em_andamento,
+            "queued": self.esperando,
+            "workers": self.workers,
+            "concurrency": self.concorrencia,
+            "queue_limit": self.fila,
+            "uptime": round(time.monotonic() - self.inicio, 3),
+        })
+        return metricas
+
+
+def remover_socket(caminho):
+    """
+    Remove o socket Unix em caminho, se existir. Qualquer outro tipo de
+    arquivo (ex.: um --unix digitado errado) não é apagado: FileExistsError.
+    """
+    try:
+        modo = os.stat(caminho).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(modo):
+        raise FileExistsError(f"{caminho} existe e não é um socket Unix; o servidor não o remove")
+    os.unlink(caminho)
+
+
+async def servir(servidor_compilacao, unix=None, host=HOST_PADRAO, porta=PORTA_PADRAO):
+    """Atende até receber SIGINT ou SIGTERM."""
+    servidor = await servidor_compilacao.iniciar(unix, host, porta)
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        async with servidor:
+            await parar.wait()
+    finally:
+        servidor_compilacao.encerrar()
+        if unix:
+            remover_socket(unix)
+        servidor_compilacao.diag.info("Servidor de compilação encerrado.")
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    endereco = args.add_mutually_exclusive_group()
+    endereco.add_argument("--unix", default=None, help="caminho do socket Unix")
+    endereco.add_argument("--porta", type=int, default=PORTA_PADRAO,
+                          help=f"porta TCP em {HOST_PADRAO} (padrão: %(default)s)")
+    args.add_argument("--host", default=HOST_PADRAO, help="endereço TCP (padrão: %(default)s)")
+    args.add_argument("--workers", type=int, default=None,
+                      help="processos de compilação (padrão: número de CPUs)")
+    args.add_argument("--concorrencia", type=int, default=None,
+                      help="compilações simultâneas (padrão: igual a --workers)")
+    args.add_argument("--fila", type=int, default=64,
+                      help="pedidos que podem esperar por uma vaga antes de serem recusados (padrão: %(default)s)")
+    args.add_argument("--lexer", choices=list(MOTORES), default="regex",
+                      help="motor do analisador léxico (padrão: regex)")
+    args.add_argument("--parser", choices=["gerado", "tabela"], default="gerado",
+                      help="parser gerado (padrão) ou ASTParser dirigido pela tabela LL(1)")
+    args.add_argument("--cache-dir", default=None,
+                      help="diretório do cache da tabela LL(1) e das saídas (padrão: ~/.cache/turtlescript)")
+    args.add_argument("--sem-cache", action="store_true",
+                      help="não usa o cache de compilação")
+    args.add_argument("-v", "--verbose", action="count", default=0,
+                      help="mostra mensagens de progresso (-v) e de depuração (-vv)")
+    args.add_argument("--log", default=None,
+                      help="grava as mensagens neste arquivo em vez de stderr")
+    opcoes = args.parse_args()
+
+    nivel = [AVISO, INFO, DEBUG][min(opcoes.verbose, 2)]
+    diag = Diagnostico(nivel, DestinoArquivo(opcoes.log) if opcoes.log else DestinoStderr())
+    cache = None if opcoes.sem_cache else CacheCompilacao(opcoes.cache_dir)
+    compilador = Compiler(opcoes.parser, opcoes.lexer, cache, diag, cache_dir=opcoes.cache_dir)
+    servidor = ServidorCompilacao(compilador, opcoes.workers, opcoes.concorrencia, opcoes.fila, diag)
+    try:
+        asyncio.run(servir(servidor, opcoes.unix, opcoes.host, opcoes.porta))
+    except KeyboardInterrupt:
+        pass
+    except FileExistsError as e:
+        diag.erro("Erro: {}", e)
+        return 1
+    finally:
+        diag.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
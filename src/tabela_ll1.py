@@ -0,0 +1,112 @@
+# tabela_ll1.py
+import re
+from array import array
+from collections import namedtuple
+
+# Uma célula com mais de uma produção possível. producoes guarda os ids das
+# produções na ordem em que foram inseridas (a primeira fica na célula).
+Conflito = namedtuple("Conflito", ["nao_terminal", "terminal", "producoes"])
+
+VAZIA = -1 # Célula sem produção
+
+
+class TabelaLL1:
+    """
+    Tabela LL(1) densa e codificada em inteiros.
+
+    Terminais recebem ids 0..T-1 (a posição em `terminais`) e não-terminais
+    ids T..T+N-1, de modo que um símbolo `s` é terminal se `s < T`. Cada
+    produção é guardada uma única vez como (id do lado esquerdo, tupla com os
+    ids do lado direito), já sem o '#'. A célula (não-terminal n, terminal t)
+    fica em celulas[n * T + t] e guarda o id da produção, ou VAZIA.
+    """
+
+    def __init__(self, nao_terminais, terminais):
+        self.terminais = list(terminais)
+        self.nao_terminais = list(nao_terminais)
+        self.num_terminais = len(self.terminais)
+        self.simbolos = self.terminais + self.nao_terminais
+        self.ids = {simbolo: i for i, simbolo in enumerate(self.terminais)}
+        self.ids.update({nt: self.num_terminais + i for i, nt in enumerate(self.nao_terminais)})
+
+        self.producoes = []        # (id do lado esquerdo, ids do lado direito)
+        self.producoes_texto = []  # "LHS->RHS", como nas células da tabela em texto
+        self._id_producao = {}
+        self.celulas = array('i', [VAZIA]) * (len(self.nao_terminais) * self.num_terminais)
+        self.conflitos = []
+
+    @property
+    def is_LL1(self):
+        return not self.conflitos
+
+    def codigo(self, simbolo):
+        """Id de um símbolo da gramática."""
+        return self.ids[simbolo]
+
+    def adicionar_producao(self, lhs, rhs):
+        """Registra (uma única vez) a produção lhs -> rhs e devolve seu id."""
+        chave = (lhs, tuple(rhs))
+        id_producao = self._id_producao.get(chave)
+        if id_producao is None:
+            id_producao = len(self.producoes)
+            self._id_producao[chave] = id_producao
+            codigos = tuple(self.ids[s] for s in rhs if s != '#')
+            self.producoes.append((self.ids[lhs], codigos))
+            self.producoes_texto.append(f"{lhs}->{' '.join(rhs)}")
+        return id_producao
+
+    def definir(self, lhs, terminal, id_producao):
+        """Coloca a produção na célula [lhs][terminal], registrando conflitos."""
+        n = self.ids[lhs] - self.num_terminais
+        t = self.ids[terminal]
+        indice = n * self.num_terminais + t
+        atual = self.celulas[indice]
+        if atual == VAZIA:
+            self.celulas[indice] = id_producao
+            return
+        if atual == id_producao:
+            return
+        for conflito in self.conflitos:
+            if conflito.nao_terminal == lhs and conflito.terminal == terminal:
+                if id_producao not in conflito.producoes:
+                    conflito.producoes.append(id_producao)
+                return
+        self.conflitos.append(Conflito(lhs, terminal, [atual, id_producao]))
+
+    def producao(self, nao_terminal, terminal):
+        """Id da produção na célula (ids de símbolo), ou VAZIA."""
+        return self.celulas[(nao_terminal - self.num_terminais) * self.num_terminais + terminal]
+
+    def como_matriz(self):
+        """
+        Tabela no formato textual de createParseTable: uma linha por
+        não-terminal e, em cada célula, "LHS->RHS" (produções em conflito
+        separadas por vírgula) ou ''.
+        """
+        em_conflito = {(c.nao_terminal, c.terminal): c.producoes for c in self.conflitos}
+        matriz = []
+        for n, nt in enumerate(self.nao_terminais):
+            linha = []
+            for t, terminal in enumerate(self.terminais):
+                producoes = em_conflito.get((nt, terminal))
+                if producoes is None:
+                    p = self.celulas[n * self.num_terminais + t]
+                    producoes = [] if p == VAZIA else [p]
+                linha.append(",".join(self.producoes_texto[p] for p in producoes))
+            matriz.append(linha)
+        return matriz
+
+    @classmethod
+    def from_matriz(cls, matriz, nao_terminais, terminais):
+        """Converte uma tabela no formato textual de createParseTable."""
+        tabela = cls(nao_terminais, terminais)
+        for nt, linha in zip(nao_terminais, matriz):
+            for terminal, celula in zip(terminais, linha):
+                if not celula:
+                    continue
+                # Regras em conflito são separadas por vírgula (que também pode
+                # ser um terminal): só separa antes de um novo "LHS->"
+                for regra in re.split(r",(?=[^\s,]+->)", celula):
+                    lhs, rhs = regra.split("->")
+                    tabela.definir(nt, terminal, tabela.adicionar_producao(lhs.strip(), rhs.split()))
+        return tabela
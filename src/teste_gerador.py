@@ -1,5 +1,6 @@
 import os
 from gerador import GeradorCodigoVisitor
+from ast_nodes import Program, VarDecl, Assign, Repeat, Call, BinOp, Name, Literal
 
 """Exemplo de entrada para o teste escopado do gerador de código:
   inicio
@@ -17,53 +18,21 @@ from gerador import GeradorCodigoVisitor
   fim
 """
 
-ast_exemplo = {
-    "tag": "Bloco",
-    "linha": 1,
-    "filhos": [
-        {
-            "tag": "DeclaracaoVar",
-            "linha": 2,
-            "tipo": "inteiro",
-            "ident": "lado",
-            "filhos": []
-        },
-        {
-            "tag": "Atribuicao",
-            "linha": 4,
-            "filhos": [
-                {"tag": "Identificador", "linha": 4, "lexema": "lado"},
-                {"tag": "Literal", "linha": 4, "tipo": "inteiro", "valor": 10}
-            ]
-        },
-        {
-            "tag": "FuncaoCall",
-            "linha": 5,
-            "nome": "definir_cor",
-            "filhos": [
-                {"tag": "Literal", "linha": 5, "tipo": "texto", "valor": "cyan"}
-            ]
-        },
-        {
-            "tag": "FuncaoCall",
-            "linha": 6,
-            "nome": "cor_de_fundo",
-            "filhos": [
-                {"tag": "Literal", "linha": 6, "tipo": "texto", "valor": "black"}
-            ]
-        },
-        {
-            "tag": "FuncaoCall",
-            "linha": 7,
-            "nome": "desenhar_quadrado",
-            "filhos": [
-                { "tag": "Literal", "linha": 7, "tipo": "inteiro", "valor": 100 },
-                { "tag": "Literal", "linha": 7, "tipo": "inteiro", "valor": 90 },
-                { "tag": "Literal", "linha": 7, "tipo": "texto", "valor": "cyan" },
-            ]
-        },
-    ]
-}
+ast_exemplo = Program([
+    VarDecl("inteiro", "lado", 2),
+    Assign("lado", Literal("inteiro", 10, 4), 4),
+    Call("definir_cor", [Literal("texto", "cyan", 5)], 5),
+    Call("cor_de_fundo", [Literal("texto", "black", 6)], 6),
+    Repeat(Literal("inteiro", 50, 8), [
+        Call("avancar", [Name("lado", 9)], 9),
+        Call("girar_direita", [Literal("inteiro", 91, 10)], 10),
+        Assign("lado", BinOp("+", Name("lado", 11), Literal("inteiro", 5, 11), 11), 11),
+    ], 8),
+    Call("desenhar_quadrado", [
+        Literal("inteiro", 100, 13),
+        Literal("texto", "cyan", 13),
+    ], 13),
+])
 
 gerador = GeradorCodigoVisitor()
 
@@ -0,0 +1,216 @@
+import sys
+import types
+import random
+
+from compilador import Compiler, SEMANTICO
+
+"""Teste do otimizador (Compiler(otimizar=True)): programas aleatórios são
+  compilados com e sem otimização, nos dois modos de saída, e executados com
+  um módulo turtle falso que registra as chamadas. Cada desenho deve
+  acontecer, na mesma ordem, com os mesmos argumentos e com o mesmo estado
+  da caneta nas duas versões (comandos de estado podem ser removidos ou
+  movidos, mas não mudar o estado de nenhum desenho). Programas com erros
+  de tipo devem dar erro semântico, com ou sem otimização.
+"""
+
+
+class TartarugaFalsa:
+    """Registra em log as chamadas de métodos (e as dos objetos devolvidos)."""
+
+    def __init__(self, log, nome):
+        self._log = log
+        self._nome = nome
+
+    def __getattr__(self, metodo):
+        def chamada(*args):
+            self._log.append((self._nome, metodo, args))
+            return TartarugaFalsa(self._log, f"{self._nome}.{metodo}")
+        return chamada
+
+
+def executar(codigo):
+    """Chamadas feitas ao turtle pelo programa gerado (e o erro, se houver)."""
+    log = []
+    modulo = types.ModuleType("turtle")
+    raiz = TartarugaFalsa(log, "turtle")
+    modulo.__getattr__ = lambda nome: getattr(raiz, nome)
+    anterior = sys.modules.get("turtle")
+    sys.modules["turtle"] = modulo
+    try:
+        exec(codigo, {"__name__": "__main__"})
+    except ZeroDivisionError:
+        log.append(("erro", "ZeroDivisionError", ()))
+    finally:
+        if anterior is None:
+            del sys.modules["turtle"]
+        else:
+            sys.modules["turtle"] = anterior
+    return log
+
+
+ESTADO = ("penup", "pendown", "color", "pensize", "bgcolor")
+
+
+def desenhos(log):
+    """As chamadas que não mudam o estado, cada uma com o estado da caneta no momento."""
+    estado, saida = {}, []
+    for objeto, metodo, args in log:
+        if metodo in ESTADO:
+            estado[objeto, "caneta" if metodo in ("penup", "pendown") else metodo] = (metodo, args)
+        else:
+            saida.append((objeto, metodo, args, sorted(estado.items())))
+    return saida
+
+
+# -- Programas aleatórios --
+
+def expressao(r, variaveis, profundidade=0):
+    if profundidade > 3 or r.random() < 0.3:
+        escolha = r.random()
+        if escolha < 0.3 and variaveis:
+            return r.choice(variaveis)
+        if escolha < 0.6:
+            return str(r.randint(0, 9))
+        return f"{r.randint(0, 9)}.{r.randint(0, 99)}"
+    return f"({expressao(r, variaveis, profundidade + 1)} {r.choice('+-*/')} {expressao(r, variaveis, profundidade + 1)})"
+
+
+def comparacao(r, variaveis):
+    return f"{expressao(r, variaveis, 1)} {r.choice(['<', '>', '=='])} {expressao(r, variaveis, 1)}"
+
+
+def programa_expressoes(semente):
+    """Expressões constantes e variáveis atribuídas uma ou mais vezes."""
+    r = random.Random(semente)
+    linhas = ["inicio", "var real: a;", "var real: b;", "var inteiro: n;", "var texto: t;", "var logico: l;",
+              f"a = {expressao(r, [])};", f"n = {r.randint(0, 3)};", 't = "x" + "y";',
+              f"l = {comparacao(r, ['a', 'b'])};"]
+    for _ in range(8):
+        escolha = r.random()
+        if escolha < 0.3:
+            linhas.append(f"avancar {expressao(r, ['a', 'b'])};")
+        elif escolha < 0.45:
+            linhas.append(f"b = {expressao(r, ['a', 'b'])};")
+        elif escolha < 0.6:
+            linhas.append(f"se {comparacao(r, ['a', 'b'])} entao girar_direita {expressao(r, ['a'])}; "
+                          f"senao recuar {expressao(r, ['a', 'b'])}; fim_se;")
+        elif escolha < 0.75:
+            linhas.append(f"repita n vezes avancar {expressao(r, ['a', 'b'])}; b = b + 1; fim_repita;")
+        elif escolha < 0.85:
+            linhas.append("ir_para a n * 2;")
+        else:
+            linhas.append("repita 3 + 1 vezes girar_esquerda a * 2; fim_repita;")
+    linhas.append("fim")
+    return "\n".join(linhas)
+
+
+def comando(r, profundidade):
+    """Comando aleatório, com muitos comandos de estado repetidos."""
+    escolha = r.random()
+    literais = ['"red"', '"cyan"']
+    cor = r.choice(literais + ["c"])
+    if escolha < 0.12:
+        return "levantar_caneta;"
+    if escolha < 0.24:
+        return "abaixar_caneta;"
+    if escolha < 0.38:
+        return f"definir_cor {cor};"
+    if escolha < 0.48:
+        return f"definir_espessura {r.choice(['1', '2', 'w', '1 + 1'])};"
+    if escolha < 0.53:
+        return f"cor_de_fundo {cor};"
+    if escolha < 0.63:
+        return f"avancar {r.randint(1, 9)};"
+    if escolha < 0.67:
+        return f"desenhar_quadrado 5 {cor};"
+    if escolha < 0.70:
+        return f'desenhar_circulo 5 "red" {cor};'
+    if escolha < 0.74:
+        return f"c = {r.choice(literais)};"
+    if escolha < 0.78:
+        return "w = w + 1;"
+    if escolha < 0.80:
+        return "limpar_tela;"
+    if profundidade > 2:
+        return "girar_direita 90;"
+    corpo = " ".join(comando(r, profundidade + 1) for _ in range(r.randint(0, 5)))
+    if escolha < 0.88:
+        return f"repita {r.choice(['0', '1', '3', 'n'])} vezes {corpo} fim_repita;"
+    if escolha < 0.94:
+        senao = " ".join(comando(r, profundidade + 1) for _ in range(r.randint(0, 3)))
+        return f"se w < {r.randint(1, 5)} entao {corpo} senao {senao} fim_se;"
+    return f"enquanto k < 2 faca {corpo} k = k + 1; fim_enquanto;"
+
+
+def programa_estado(semente):
+    """Comandos de estado da tartaruga em sequência, em laços e em condicionais."""
+    r = random.Random(semente)
+    linhas = ["inicio", "var texto: c;", "var inteiro: w;", "var inteiro: n;", "var inteiro: k;",
+              'c = "blue";', "w = 1;", f"n = {r.randint(0, 2)};"]
+    linhas += [comando(r, 0) for _ in range(12)]
+    linhas.append("fim")
+    return "\n".join(linhas)
+
+
+programas = [programa_expressoes(semente) for semente in range(300)]
+programas += [programa_estado(semente) for semente in range(300)]
+
+programas += [
+    # A divisão por zero continua acontecendo no programa
+    "inicio var real: x; x = 0; avancar 1 / x; avancar 1 / 0; fim",
+    # Antes da atribuição, a variável tem o valor inicial da declaração
+    "inicio var inteiro: x; avancar x; x = 7; avancar x + 1; fim",
+    # Atribuída duas vezes: não é propagada
+    "inicio var inteiro: x; x = 2; repita 3 vezes avancar x; x = x + 1; fim_repita; fim",
+    # Variável real com valor inteiro; divisão de inteiros dá real
+    "inicio var real: x; x = 10; avancar x / 4; avancar 7 / 2 * 2; fim",
+    'inicio var texto: c; c = "ci" + "an"; definir_cor c; se c == "cian" entao avancar 1; fim_se; fim',
+    # Um laço que não executa não pode ter comandos movidos para fora
+    'inicio repita 0 vezes definir_cor "red"; avancar 1; fim_repita; avancar 2; fim',
+    'inicio var inteiro: n; repita n vezes definir_espessura 3; avancar 1; fim_repita; avancar 2; fim',
+    # Só os comandos de estado que abrem o corpo podem sair
+    'inicio repita 3 vezes avancar 1; definir_cor "red"; fim_repita; fim',
+    'inicio var texto: c; c = "red"; repita 3 vezes definir_cor c; avancar 1; c = "blue"; fim_repita; fim',
+]
+
+falhas = 0
+dobradas = 0
+for em_funcao in (False, True):
+    normal, otimizado = Compiler(em_funcao=em_funcao), Compiler(em_funcao=em_funcao, otimizar=True)
+    for programa in programas:
+        esperado, obtido = normal.compile(programa), otimizado.compile(programa)
+        assert esperado.ok and obtido.ok, (programa, esperado.errors, obtido.errors)
+        dobradas += esperado.code != obtido.code
+        if desenhos(executar(esperado.code)) != desenhos(executar(obtido.code)):
+            falhas += 1
+            print(f"DIFERENTE (em_funcao={em_funcao}):\n{programa}\n--- otimizado:\n{obtido.code}")
+
+print(f"{len(programas)} programas comparados nos dois modos, {dobradas} saídas otimizadas, {falhas} diferenças.")
+assert falhas == 0
+assert dobradas > 0
+
+# Expressões com erros de tipo dão erro semântico, nunca uma exceção do otimizador
+mal_tipados = [
+    'inicio desenhar_quadrado 10 ("a" + 1); fim',
+    'inicio desenhar_circulo 10 "red" (1 < "a"); fim',
+    'inicio desenhar_circulo 10 (1 + 2) "red"; fim',
+    "inicio desenhar_quadrado 10 naodecl; fim",
+    "inicio avancar (verdadeiro * 2); fim",
+    'inicio var inteiro: x; x = 1; avancar x + "a"; fim',
+]
+for otimizar in (False, True):
+    compilador = Compiler(otimizar=otimizar)
+    for programa in mal_tipados:
+        resultado = compilador.compile(programa)
+        assert [erro.phase for erro in resultado.errors] == [SEMANTICO], (programa, resultado.errors)
+print(f"{len(mal_tipados)} programas com erros de tipo rejeitados.")
+
+# Comandos de estado removidos e movidos para fora do 'repita'
+otimizado = Compiler(otimizar=True)
+codigo = otimizado.compile('inicio repita 50 vezes definir_cor "cyan"; avancar 1; fim_repita; '
+                           'definir_cor "cyan"; levantar_caneta; levantar_caneta; fim').code
+assert codigo.count('turtle.color("cyan")') == 1 and codigo.count("turtle.penup()") == 1, codigo
+assert codigo.index('turtle.color("cyan")') < codigo.index("for _ in range(50):"), codigo
+codigo = otimizado.compile('inicio repita 0 vezes definir_cor "red"; avancar 1; fim_repita; fim').code
+assert codigo.index("for _ in range(0):") < codigo.index('turtle.color("red")'), codigo
+print("Comandos de estado redundantes removidos e invariantes movidos.")
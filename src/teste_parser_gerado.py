@@ -0,0 +1,105 @@
+import os
+import time
+
+from tokenizer import RegexTokenizer
+from token_buffer import TokenBuffer
+from parser import ASTParser
+from utils import rules, nonterm_userdef, term_userdef
+from cache_tabela import construir_tabela, hash_gramatica
+from gerador_parser import gerar_parser, SAIDA_PADRAO
+from benchmarks.bench_estresse import programa_sintetico
+import parser_gerado
+
+"""Teste de consistência do parser gerado por gerador_parser.py:
+  para cada programa, parser_gerado.parse deve devolver a mesma árvore de
+  derivação que ASTParser.parse_with_ast, ou lançar o mesmo SyntaxError.
+"""
+
+caminho_script = os.path.dirname(__file__)
+
+programas = []
+for nome in ["entrada1.txt", "entrada2.txt", "entrada3.txt"]:
+    with open(os.path.join(caminho_script, 'tests', nome), 'r', encoding="utf-8") as arquivo:
+        programas.append(arquivo.read())
+
+programas += [
+    programa_sintetico(300),
+    "inicio fim",
+    "inicio fim avancar 1; fim",
+    """inicio
+    var logico: ok;
+    var real: x;
+    x = (1 + 2.5) * 3 / (4 - 1) - 2;
+    ok = x >= 2 == verdadeiro;
+    se ok entao
+        enquanto x < 10 faca
+            x = x + 1;
+            ir_para x x * 2;
+        fim_enquanto;
+    senao
+        levantar_caneta;
+        abaixar_caneta;
+        limpar_tela;
+    fim_se;
+    se falso entao fim_se;
+    desenhar_circulo x "red" "blue";
+    desenhar_quadrado 10 "green";
+fim""",
+    # Programas com erros de sintaxe
+    "",
+    "inicio",
+    "avancar 10;",
+    "inicio avancar 10 fim",
+    "inicio avancar ; fim",
+    "inicio x = ; fim",
+    "inicio x = 1 + * 2; fim",
+    "inicio var inteiro x; fim",
+    "inicio se x entao avancar 1; fim",
+    "inicio repita 3 vezes avancar 1; fim_enquanto; fim",
+    "inicio avancar (1 + 2; fim",
+    "inicio avancar 10 % 3; fim",
+    "inicio ir_para 1; fim",
+]
+
+arvore_parser = ASTParser(rules, nonterm_userdef, term_userdef)
+tabela = construir_tabela(arvore_parser)
+
+
+def resultado(parse, tokens):
+    try:
+        return parse(tokens)
+    except SyntaxError as e:
+        return f"SyntaxError: {e}"
+
+
+falhas = 0
+for programa in programas:
+    esperado = resultado(lambda tokens: arvore_parser.parse_with_ast(*tabela, tokens),
+                         list(RegexTokenizer(programa).iter_tokens()))
+    for entrada in (RegexTokenizer(programa).iter_tokens(), TokenBuffer.from_source(programa)):
+        obtido = resultado(parser_gerado.parse, entrada)
+        if obtido != esperado:
+            falhas += 1
+            print(f"DIFERENTE ({type(entrada).__name__}): {programa[:60]!r}")
+            print(f"  parse_with_ast: {str(esperado)[:200]}")
+            print(f"  parser_gerado:  {str(obtido)[:200]}")
+
+print(f"{len(programas)} programas comparados, {falhas} diferenças.")
+assert falhas == 0
+
+# O módulo gerado deve corresponder à gramática atual
+assert parser_gerado.HASH_GRAMATICA == hash_gramatica(rules, nonterm_userdef, term_userdef), \
+    "parser_gerado.py desatualizado: execute `python gerador_parser.py`"
+with open(SAIDA_PADRAO, encoding="utf-8") as arquivo:
+    assert arquivo.read() == gerar_parser(), "parser_gerado.py desatualizado: execute `python gerador_parser.py`"
+
+# Comparação de tempo (informativa)
+tokens = list(RegexTokenizer(programa_sintetico(5000)).iter_tokens())
+inicio = time.perf_counter()
+arvore_parser.parse_with_ast(*tabela, tokens)
+tempo_tabela = time.perf_counter() - inicio
+inicio = time.perf_counter()
+parser_gerado.parse(tokens)
+tempo_gerado = time.perf_counter() - inicio
+print(f"5000 comandos: parse_with_ast {tempo_tabela:.3f}s, parser_gerado {tempo_gerado:.3f}s "
+      f"({tempo_tabela / tempo_gerado:.1f}x)")
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from tokenizer import ScanError
+from token_buffer import TokenBuffer, pontos_de_corte, tokenizar_paralelo
+from benchmarks.bench_estresse import programa_sintetico
+
+"""Teste da varredura paralela (token_buffer.tokenizar_paralelo): cada
+  programa é dividido em 2 a 8 trechos e o TokenBuffer montado a partir dos
+  trechos deve ter os mesmos tokens (tipo, literal, linha e coluna) da
+  varredura serial, ou lançar o mesmo primeiro ScanError, com o mesmo buffer
+  parcial. Os programas colocam literais de texto com quebras de linha e
+  comentários '//' onde a divisão em partes iguais cortaria.
+"""
+
+caminho_script = os.path.dirname(__file__)
+
+programas = []
+for nome in ["entrada1.txt", "entrada2.txt", "entrada3.txt"]:
+    with open(os.path.join(caminho_script, 'tests', nome), 'r', encoding="utf-8") as arquivo:
+        programas.append(arquivo.read())
+
+corpo = "".join(f"avancar {i};\n" for i in range(40))
+programas += [
+    programa_sintetico(300),
+    # Um literal de texto de várias linhas ocupa o meio do programa
+    "inicio\nvar texto: t;\n" + corpo + 't = "' + "linha do texto;\n" * 200 + '";\n' + corpo + "fim",
+    # Comentários longos, com aspas e barras dentro, em todas as linhas
+    "inicio\n" + "".join(f'// comentário {i} com "aspas" e // barras {"x" * 50}\navancar {i};\n'
+                         for i in range(100)) + "fim",
+    # Textos com '//' e quebras de linha, e comentários com aspas
+    "inicio\n" + "".join(f'definir_cor "http://{i}\n// não é comentário\n";\n// "não é texto\n'
+                         for i in range(100)) + "fim",
+    # Erros léxicos: o primeiro deve ser o da varredura serial
+    "inicio\n" + corpo + "avancar $;\n" + corpo + "avancar @;\n" + corpo + "fim",
+    "inicio\n" + corpo * 3 + "avancar 1 @;\nfim",
+    "inicio\n" + corpo + 't = "sem fim;\n' + corpo + "fim",
+    "inicio\n" + corpo + "// comentário sem quebra de linha no fim",
+    "",
+    "\n\n\n",
+]
+
+
+def varrer(funcao):
+    """Tokens (tipo, literal, linha, coluna) e o erro léxico, se houver."""
+    try:
+        buffer, erro = funcao(), None
+    except ScanError as e:
+        buffer, erro = e.buffer, (str(e), e.line)
+    return [(t.type, t.literal, t.line, t.column) for t in buffer], erro
+
+
+falhas = 0
+comparacoes = 0
+
+
+def comparar(programa, esperado, obtido, descricao):
+    global falhas, comparacoes
+    comparacoes += 1
+    if obtido != esperado:
+        falhas += 1
+        print(f"DIFERENTE ({descricao}): {programa[:60]!r}")
+        print(f"  serial:   {esperado[1]} {esperado[0][:5]}")
+        print(f"  paralelo: {obtido[1]} {obtido[0][:5]}")
+
+
+def verificar_cortes(programa, partes, tokens):
+    """Os cortes ficam logo após quebras de linha e nenhum token os atravessa."""
+    global falhas
+    cortes = pontos_de_corte(programa, partes)
+    spans = [(tokens.inicios[i], tokens.fins[i]) for i in range(len(tokens))]
+    ok = len(cortes) < partes and cortes == sorted(set(cortes))
+    ok = ok and all(programa[corte - 1] == "\n" for corte in cortes)
+    ok = ok and not any(inicio < corte < fim for corte in cortes for inicio, fim in spans)
+    if not ok:
+        falhas += 1
+        print(f"CORTES INVÁLIDOS ({partes} partes): {cortes} em {programa[:60]!r}")
+
+
+if __name__ == "__main__":
+    # Um só pool para todas as divisões; max_workers escolhe o número de trechos
+    with ProcessPoolExecutor(2) as executor:
+        for programa in programas:
+            esperado = varrer(lambda: TokenBuffer.from_source(programa))
+            try:
+                serial = TokenBuffer.from_source(programa)
+            except ScanError as e:
+                serial = e.buffer
+            for partes in range(2, 9):
+                verificar_cortes(programa, partes, serial)
+                obtido = varrer(lambda: tokenizar_paralelo(programa, partes, limiar=0, executor=executor))
+                comparar(programa, esperado, obtido, f"{partes} trechos")
+
+    # Sem executor: o pool é criado e encerrado pela própria função
+    programa = programas[4]
+    comparar(programa, varrer(lambda: TokenBuffer.from_source(programa)),
+             varrer(lambda: tokenizar_paralelo(programa, 3, limiar=0)), "pool próprio")
+    # Abaixo do limiar, a varredura é serial
+    assert isinstance(tokenizar_paralelo(programas[0], 4), TokenBuffer)
+
+    # A divisão em partes iguais cairia dentro do literal de texto; os cortes ficam fora dele
+    inicio, fim = programa.index('t = "') + 4, programa.index('";') + 1
+    assert any(inicio < len(programa) * k // 8 < fim for k in range(1, 8))
+    assert not any(inicio < corte <= fim for corte in pontos_de_corte(programa, 8))
+
+    print(f"{len(programas)} programas, {comparacoes} varreduras paralelas comparadas, {falhas} diferenças.")
+    assert falhas == 0
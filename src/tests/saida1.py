@@ -11,7 +11,7 @@ cor_de_fundo_quadrado = ""
 lado = 10
 turtle.bgcolor("black")
 turtle.pensize(2)
-for _ in range(int(50)):
+for _ in range(50):
     turtle.color("cyan")
     turtle.forward(lado)
     lado = lado + 5
@@ -9,7 +9,7 @@ cor = ""
 lado = 5
 turtle.bgcolor("black")
 turtle.pensize(2)
-for _ in range(int(50)):
+for _ in range(50):
     turtle.color("cyan")
     turtle.forward(lado)
     turtle.right(90)
@@ -0,0 +1,290 @@
+# token_buffer.py
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from tokenizer import (
+    Token, TokenType, ScanError, KEYWORDS, OPERADORES, nome_terminal,
+    _PADRAO_MESTRE, _PADRAO_PULO, _erro_lexico, _scan_error,
+    _GRUPO_REAL, _GRUPO_INTEIRO, _GRUPO_PALAVRA, _GRUPO_OPERADOR,
+)
+
+# Código numérico (uma posição do array 'B') de cada TokenType.
+TIPOS = list(TokenType)
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+_COD_IDENTIFICADOR = CODIGO_TIPO[TokenType.IDENTIFICADOR]
+_COD_INTEIRO = CODIGO_TIPO[TokenType.NUMERO_INTEIRO]
+_COD_REAL = CODIGO_TIPO[TokenType.NUMERO_REAL]
+_COD_TEXTO = CODIGO_TIPO[TokenType.LITERAL_TEXTO]
+_CODIGO_PALAVRA = {lexema: CODIGO_TIPO[tipo] for lexema, tipo in KEYWORDS.items()}
+_CODIGO_OPERADOR = {lexema: CODIGO_TIPO[tipo] for lexema, tipo in OPERADORES.items()}
+
+# Id usado em ids_terminais() para tokens sem terminal na gramática (ex.: '%').
+SEM_TERMINAL = 255
+
+# Abaixo deste tamanho (em caracteres) a varredura paralela não compensa o
+# custo de enviar os trechos aos processos e é feita em um único processo.
+LIMIAR_PARALELO = 1 << 20
+
+# Trechos em que uma quebra de linha não separa tokens: literais de texto
+# (inclusive não terminados) e comentários.
+_PADRAO_PROTEGIDO = re.compile(r'"[^"]*"?|//[^\n]*')
+
+
+class TokenView:
+    """
+    Visão preguiçosa de uma posição do TokenBuffer, com a mesma interface de
+    Token (type, literal, line). O literal só é recortado do código-fonte
+    quando é lido.
+    """
+    __slots__ = ("_buffer", "_indice")
+
+    def __init__(self, buffer, indice):
+        self._buffer = buffer
+        self._indice = indice
+
+    @property
+    def type(self):
+        return TIPOS[self._buffer.tipos[self._indice]]
+
+    @property
+    def literal(self):
+        return self._buffer.literal(self._indice)
+
+    @property
+    def line(self):
+        return self._buffer.linhas[self._indice]
+
+    @property
+    def column(self):
+        return self._buffer.colunas[self._indice]
+
+    def __repr__(self):
+        return f"Token(type={self.type.name}, literal='{self.literal}', line={self.line})"
+
+
+class TokenBuffer:
+    """
+    Sequência de tokens em formato de "estrutura de arrays": o tipo de cada
+    token é um código de 1 byte e linha, coluna e posições de início/fim no
+    código-fonte ficam em arrays de inteiros. Os literais não são guardados;
+    são recortados do código-fonte sob demanda.
+    """
+
+    def __init__(self, source=""):
+        self.source = source
+        self.tipos = array('B')
+        self.linhas = array('I')
+        self.colunas = array('I')
+        self.inicios = array('I')
+        self.fins = array('I')
+        self._ids_terminais = {}
+
+    @classmethod
+    def from_source(cls, source, linha_inicial=1):
+        """
+        Varre o código-fonte inteiro para um novo buffer. Em caso de erro
+        léxico, lança o mesmo ScanError que o Tokenizer lançaria; o buffer
+        parcial fica disponível em erro.buffer.
+        """
+        buffer = cls(source)
+        try:
+            buffer._varrer(linha_inicial)
+        except ScanError as erro:
+            erro.buffer = buffer
+            raise
+        return buffer
+
+    def _varrer(self, line, deslocamento=0):
+        """
+        Preenche os arrays a partir de self.source. deslocamento é somado às
+        posições de início/fim (usado quando self.source é um trecho de um
+        código maior, na varredura paralela).
+        """
+        source = self.source
+        tipos, linhas, colunas = self.tipos.append, self.linhas.append, self.colunas.append
+        inicios, fins = self.inicios.append, self.fins.append
+        palavras = _CODIGO_PALAVRA
+        operadores = _CODIGO_OPERADOR
+        pos = 0
+        inicio_linha = 0 # Posição do primeiro caractere da linha atual
+
+        for m in _PADRAO_MESTRE.finditer(source):
+            inicio, fim_pulo = m.span(1)
+            if inicio != pos:
+                break
+            if fim_pulo != inicio:
+                quebras = source.count('\n', inicio, fim_pulo)
+                if quebras:
+                    line += quebras
+                    inicio_linha = source.rfind('\n', inicio, fim_pulo) + 1
+            pos = m.end()
+            coluna = fim_pulo - inicio_linha + 1
+
+            grupo = m.lastindex
+            if grupo == _GRUPO_PALAVRA:
+                lexema = m.group(grupo)
+                if lexema[0] > 'z' and not lexema[0].isalpha():
+                    raise _erro_lexico(source, fim_pulo, line)[0]
+                codigo = palavras.get(lexema, _COD_IDENTIFICADOR)
+            elif grupo == _GRUPO_OPERADOR:
+                codigo = operadores[m.group(grupo)]
+            elif grupo == _GRUPO_INTEIRO:
+                codigo = _COD_INTEIRO
+            elif grupo == _GRUPO_REAL:
+                codigo = _COD_REAL
+            else:
+                codigo = _COD_TEXTO
+                quebras = source.count('\n', fim_pulo, pos)
+                if quebras:
+                    line += quebras
+                    inicio_linha = source.rfind('\n', fim_pulo, pos) + 1
+
+            tipos(codigo)
+            linhas(line)
+            colunas(coluna)
+            inicios(fim_pulo + deslocamento)
+            fins(pos + deslocamento)
+
+        if _PADRAO_PULO.match(source, pos).end() != len(source):
+            raise _erro_lexico(source, pos, line)[0]
+
+    # -- Acesso aos tokens --
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self.tipos)
+        if not 0 <= indice < len(self.tipos):
+            raise IndexError("índice de token fora do buffer")
+        return TokenView(self, indice)
+
+    def __iter__(self):
+        for indice in range(len(self.tipos)):
+            yield TokenView(self, indice)
+
+    def literal(self, indice):
+        """Literal do token, com a mesma conversão feita pelo Tokenizer."""
+        codigo = self.tipos[indice]
+        texto = self.source[self.inicios[indice]:self.fins[indice]]
+        if codigo == _COD_INTEIRO:
+            return int(texto)
+        if codigo == _COD_REAL:
+            return float(texto)
+        if codigo == _COD_TEXTO:
+            return texto[1:-1]
+        return texto
+
+    def tokens(self):
+        """Materializa a lista de objetos Token (para chamadores antigos)."""
+        return [Token(TIPOS[self.tipos[i]], self.literal(i), self.linhas[i]) for i in range(len(self.tipos))]
+
+    def ids_terminais(self, terminais):
+        """
+        Id do terminal da gramática de cada token, isto é, sua posição na
+        lista de terminais do parser (a lista devolvida por createParseTable).
+        Tokens sem terminal correspondente recebem SEM_TERMINAL. O resultado
+        é calculado uma vez por lista de terminais.
+        """
+        chave = tuple(terminais)
+        ids = self._ids_terminais.get(chave)
+        if ids is None:
+            posicao = {nome: i for i, nome in enumerate(terminais)}
+            traducao = bytes(posicao.get(nome_terminal(tipo), SEM_TERMINAL) for tipo in TIPOS)
+            traducao += bytes([SEM_TERMINAL]) * (256 - len(traducao))
+            ids = array('B', self.tipos.tobytes().translate(traducao))
+            self._ids_terminais[chave] = ids
+        return ids
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays (sem contar o código-fonte)."""
+        return sum(a.itemsize * len(a) for a in (self.tipos, self.linhas, self.colunas, self.inicios, self.fins))
+
+
+def pontos_de_corte(source, partes):
+    """
+    Escolhe até partes - 1 posições para dividir o código-fonte, cada uma logo
+    após uma quebra de linha que não esteja dentro de um literal de texto nem
+    de um comentário. Nenhum token atravessa esses pontos.
+    """
+    cortes = []
+    protegidos = _PADRAO_PROTEGIDO.finditer(source)
+    trecho = next(protegidos, None)
+    anterior = 0
+    for k in range(1, partes):
+        quebra = source.find('\n', max(anterior, len(source) * k // partes))
+        while quebra != -1:
+            while trecho is not None and trecho.end() <= quebra:
+                trecho = next(protegidos, None)
+            if trecho is None or quebra < trecho.start():
+                break
+            quebra = source.find('\n', trecho.end())
+        if quebra == -1:
+            break
+        anterior = quebra + 1
+        cortes.append(anterior)
+    return cortes
+
+
+def _varrer_trecho(trecho, linha_inicial, deslocamento):
+    """Executado nos processos auxiliares: varre um trecho para arrays."""
+    buffer = TokenBuffer(trecho)
+    erro = None
+    try:
+        buffer._varrer(linha_inicial, deslocamento)
+    except ScanError as e:
+        erro = (e.message, e.line)
+    return buffer.tipos, buffer.linhas, buffer.colunas, buffer.inicios, buffer.fins, erro
+
+
+def tokenizar_paralelo(source, max_workers=None, limiar=LIMIAR_PARALELO, executor=None):
+    """
+    Varre um código-fonte grande dividindo-o em trechos (ver pontos_de_corte)
+    processados em paralelo por um ProcessPoolExecutor. As linhas de cada
+    trecho começam na linha em que ele começa no arquivo, e os resultados
+    são concatenados na ordem original: o TokenBuffer devolvido, e o primeiro
+    ScanError lançado, são idênticos aos da varredura serial.
+
+    Abaixo de limiar caracteres a varredura é feita no processo atual. O
+    código é dividido em max_workers trechos (padrão: os.cpu_count()), mesmo
+    quando executor é um ProcessPoolExecutor já existente.
+
+    Função de biblioteca: Compiler, main.py e lote.py não a usam (lote.py já
+    compila um arquivo por processo, e um segundo pool dentro de cada
+    processo só disputaria os mesmos núcleos).
+    """
+    if executor is None and len(source) < limiar:
+        return TokenBuffer.from_source(source)
+
+    dono = executor is None
+    if dono:
+        executor = ProcessPoolExecutor(max_workers)
+    try:
+        partes = max_workers or os.cpu_count() or 1
+        inicios = [0] + pontos_de_corte(source, partes)
+        fins = inicios[1:] + [len(source)]
+        linhas = [1]
+        for inicio, fim in zip(inicios, fins[:-1]):
+            linhas.append(linhas[-1] + source.count('\n', inicio, fim))
+
+        buffer = TokenBuffer(source)
+        resultados = executor.map(_varrer_trecho, (source[i:f] for i, f in zip(inicios, fins)), linhas, inicios)
+        for tipos, linhas_, colunas, inicios_, fins_, erro in resultados:
+            buffer.tipos.extend(tipos)
+            buffer.linhas.extend(linhas_)
+            buffer.colunas.extend(colunas)
+            buffer.inicios.extend(inicios_)
+            buffer.fins.extend(fins_)
+            if erro is not None:
+                erro = _scan_error(*erro)
+                erro.buffer = buffer
+                raise erro
+        return buffer
+    finally:
+        if dono:
+            executor.shutdown(cancel_futures=True)
@@ -1,17 +1,35 @@
 # tokenizer.py
+import io
+import os
 import re
+import mmap
+import codecs
 from enum import Enum
 
 #Tipos de tokens da nossa linguagem,
 class ScanError(Exception):
     """Classe de exceção para erros léxicos."""
     def __init__(self, message, line=None):
+        self.message = message
+        self.line = line
         full_message = f"Erro Léxico"
         if line:
             full_message += f" (linha {line})"
         full_message += f": {message}"
         super().__init__(full_message)
 
+def _scan_error(message, line):
+    """ScanError cuja mensagem já cita a linha: line é guardada sem repeti-la na mensagem."""
+    erro = ScanError(message)
+    erro.line = line
+    return erro
+
+class ErroSintatico(SyntaxError):
+    """SyntaxError lançado pelos parsers, com a linha do token onde o erro foi detectado."""
+    def __init__(self, message, line=None):
+        self.line = line
+        super().__init__(message)
+
 class TokenType(Enum):
 
     # Palavras-chave
@@ -82,6 +100,74 @@ class Token:
     def __repr__(self):
         return f"Token(type={self.type.name}, literal='{self.literal}', line={self.line})"
 
+# Tokens de pontuação/operadores cujo símbolo terminal na gramática é o
+# próprio caractere, e não o nome da classe gramatical.
+TERMINAIS_LITERAIS = frozenset({
+    TokenType.ATRIBUICAO,
+    TokenType.DOIS_PONTOS,
+    TokenType.PONTO_VIRGULA,
+    TokenType.VIRGULA,
+    TokenType.SOMA,
+    TokenType.SUBTRACAO,
+    TokenType.MULTIPLICACAO,
+    TokenType.DIVISAO,
+    TokenType.RESTO,
+    TokenType.IGUAL,
+    TokenType.MENOR,
+    TokenType.MAIOR,
+    TokenType.PARENTESE_ESQ,
+    TokenType.PARENTESE_DIR,
+})
+
+
+def nome_terminal(tipo):
+    """Nome do símbolo terminal da gramática (utils.term_userdef) de um TokenType."""
+    if tipo is TokenType.EOF:
+        return '$'
+    if tipo in TERMINAIS_LITERAIS:
+        return tipo.value
+    return tipo.name.lower()
+
+
+# Mapeamento de palavras-chave para seus tipos de token
+KEYWORDS = {
+    "inicio": TokenType.INICIO,
+    "fim": TokenType.FIM,
+    "var": TokenType.VAR,
+    "número_inteiro": TokenType.INTEIRO,
+    "inteiro": TokenType.INTEIRO,
+    "texto": TokenType.TEXTO,
+    "número_real": TokenType.REAL,
+    "real": TokenType.REAL,
+    "logico": TokenType.LOGICO,
+    "avancar": TokenType.AVANCAR,
+    "recuar": TokenType.RECUAR,
+    "girar_direita": TokenType.GIRAR_DIREITA,
+    "girar_esquerda": TokenType.GIRAR_ESQUERDA,
+    "ir_para": TokenType.IR_PARA,
+    "levantar_caneta": TokenType.LEVANTAR_CANETA,
+    "abaixar_caneta": TokenType.ABAIXAR_CANETA,
+    "definir_cor": TokenType.DEFINIR_COR,
+    "desenhar_quadrado": TokenType.DESENHAR_QUADRADO,
+    "desenhar_circulo": TokenType.DESENHAR_CIRCULO,
+    "definir_espessura": TokenType.DEFINIR_ESPESSURA,
+    "cor_de_fundo": TokenType.COR_DE_FUNDO,
+    "limpar_tela": TokenType.LIMPAR_TELA,
+    "repita": TokenType.REPITA,
+    "vezes": TokenType.VEZES,
+    "fim_repita": TokenType.FIM_REPITA,
+    "se": TokenType.SE,
+    "entao": TokenType.ENTAO,
+    "senao": TokenType.SENAO,
+    "fim_se": TokenType.FIM_SE,
+    "enquanto": TokenType.ENQUANTO,
+    "faca": TokenType.FACA,
+    "fim_enquanto": TokenType.FIM_ENQUANTO,
+    "verdadeiro": TokenType.VERDADEIRO,
+    "falso": TokenType.FALSO,
+}
+
+
 class Tokenizer:
     def __init__(self, source_code):
         self.source = source_code
@@ -93,42 +179,7 @@ class Tokenizer:
         self.line = 1 # Contador de linha para mensagens de erro
 
         # Mapeamento de palavras-chave para seus tipos de token
-        self.keywords = {
-            "inicio": TokenType.INICIO,
-            "fim": TokenType.FIM,
-            "var": TokenType.VAR,
-            "número_inteiro": TokenType.INTEIRO,
-            "inteiro": TokenType.INTEIRO,
-            "texto": TokenType.TEXTO,
-            "número_real": TokenType.REAL,
-            "real": TokenType.REAL,
-            "logico": TokenType.LOGICO,
-            "avancar": TokenType.AVANCAR,
-            "recuar": TokenType.RECUAR,
-            "girar_direita": TokenType.GIRAR_DIREITA,
-            "girar_esquerda": TokenType.GIRAR_ESQUERDA,
-            "ir_para": TokenType.IR_PARA,
-            "levantar_caneta": TokenType.LEVANTAR_CANETA,
-            "abaixar_caneta": TokenType.ABAIXAR_CANETA,
-            "definir_cor": TokenType.DEFINIR_COR,
-            "desenhar_quadrado": TokenType.DESENHAR_QUADRADO,
-            "desenhar_circulo": TokenType.DESENHAR_CIRCULO,
-            "definir_espessura": TokenType.DEFINIR_ESPESSURA,
-            "cor_de_fundo": TokenType.COR_DE_FUNDO,
-            "limpar_tela": TokenType.LIMPAR_TELA,
-            "repita": TokenType.REPITA,
-            "vezes": TokenType.VEZES,
-            "fim_repita": TokenType.FIM_REPITA,
-            "se": TokenType.SE,
-            "entao": TokenType.ENTAO,
-            "senao": TokenType.SENAO,
-            "fim_se": TokenType.FIM_SE,
-            "enquanto": TokenType.ENQUANTO,
-            "faca": TokenType.FACA,
-            "fim_enquanto": TokenType.FIM_ENQUANTO,
-            "verdadeiro": TokenType.VERDADEIRO,
-            "falso": TokenType.FALSO,
-        }
+        self.keywords = KEYWORDS
 
     # -- Métodos auxiliares --
 
@@ -202,7 +253,7 @@ class Tokenizer:
             self.advance()
         
         if self.current_char is None:
-            raise ScanError(f"Erro Léxico: String não terminada na linha {self.line}")
+            raise _scan_error(f"Erro Léxico: String não terminada na linha {self.line}", self.line)
 
         self.advance() # Pula a aspa final
         return Token(TokenType.LITERAL_TEXTO, result, self.line)
@@ -254,11 +305,263 @@ class Tokenizer:
                 # Se não for um token válido, lança um erro
                 char = self.current_char
                 self.advance()
-                raise ScanError(f"Erro Léxico: Caractere inesperado '{char}' na linha {self.line}")
+                raise _scan_error(f"Erro Léxico: Caractere inesperado '{char}' na linha {self.line}", self.line)
 
         # Se o loop terminar, chegamos ao fim do arquivo
         return Token(TokenType.EOF, None, self.line)
 
+    def iter_tokens(self):
+        """
+        Gera os tokens sob demanda, um a um, até o fim do código (o token EOF
+        não é incluído). Permite entregar tokens ao parser à medida que são
+        reconhecidos, sem montar a lista completa antes.
+        """
+        token = self.obter_next_token()
+        while token.type != TokenType.EOF:
+            yield token
+            token = self.obter_next_token()
+
+
+# Operadores e pontuação indexados pelo próprio lexema (inclui "==").
+OPERADORES = {t.value: t for t in TokenType if not (t.value[0].isalnum() or t.value[0] == '_')}
+
+# Expressão mestre do motor de varredura por regex. O grupo 1 absorve
+# espaços e comentários antes do lexema; o lookahead seguido de \1 o torna
+# atômico, impedindo que o motor de regex "volte" para dentro de um
+# comentário e recorte tokens de lá. Os grupos 2 a 6 reconhecem, nesta
+# ordem, números reais, inteiros, palavras, literais de texto e operadores.
+_PULO = r"(?:\s|//[^\n]*)*"
+_PADRAO_MESTRE = re.compile(
+    r"(?=(" + _PULO + r"))\1(?:"
+    r"(\d+\.\d*)"
+    r"|(\d+)"
+    r"|([^\W\d]\w*)"
+    r'|("[^"]*")'
+    r"|(" + "|".join(re.escape(op) for op in sorted(OPERADORES, key=len, reverse=True)) + r"))"
+)
+_PADRAO_PULO = re.compile(_PULO)
+
+_GRUPO_REAL, _GRUPO_INTEIRO, _GRUPO_PALAVRA, _GRUPO_TEXTO, _GRUPO_OPERADOR = range(2, 7)
+
+
+def _erro_lexico(source, pos, line):
+    """
+    Monta o ScanError do trecho não reconhecido que começa em pos (depois de
+    eventuais espaços e comentários). Devolve (erro, pos, line) com a posição
+    e a linha em que a varredura pode continuar.
+    """
+    pulo = _PADRAO_PULO.match(source, pos)
+    line += source.count('\n', pos, pulo.end())
+    pos = pulo.end()
+    char = source[pos]
+    if char == '"':
+        # A string nunca é fechada: o Tokenizer original consome
+        # o resto do arquivo antes de reportar o erro.
+        line += source.count('\n', pos)
+        return _scan_error(f"Erro Léxico: String não terminada na linha {line}", line), len(source), line
+    return _scan_error(f"Erro Léxico: Caractere inesperado '{char}' na linha {line}", line), pos + 1, line
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Motor de varredura alternativo ao Tokenizer caractere a caractere.
+    Cada lexema é reconhecido por uma única busca na expressão mestre e
+    recortado do código-fonte por fatiamento; palavras-chave são resolvidas
+    com uma consulta ao dicionário KEYWORDS. Produz a mesma sequência de
+    Tokens e as mesmas mensagens de ScanError que o Tokenizer original.
+
+    O código pode vir inteiro (source_code) ou em blocos (de_blocos), caso
+    em que self.source guarda apenas o trecho ainda não consumido.
+    """
+
+    def __init__(self, source_code):
+        super().__init__(source_code)
+        self._blocos = iter(())
+        self._final = True # Não há mais blocos a ler além de self.source
+        self._tokens = self._varrer()
+
+    @classmethod
+    def de_blocos(cls, blocos):
+        """Cria um tokenizer que lê o código-fonte de um iterável de strings."""
+        tokenizer = cls("")
+        tokenizer._blocos = iter(blocos)
+        tokenizer._final = False
+        return tokenizer
+
+    def obter_next_token(self):
+        try:
+            return next(self._tokens)
+        except ScanError:
+            # Assim como no Tokenizer original, a varredura pode continuar
+            # depois do caractere inválido.
+            self._tokens = self._varrer()
+            raise
+
+    def iter_tokens(self):
+        for token in self._tokens:
+            if token.type is TokenType.EOF:
+                return
+            yield token
+
+    def _erro(self, pos):
+        """Gera o ScanError do trecho não reconhecido que começa em pos."""
+        erro, self.pos, self.line = _erro_lexico(self.source, pos, self.line)
+        return erro
+
+    def _varrer(self):
+        """Gerador com o laço de varredura; o estado fica em variáveis locais."""
+        keywords = self.keywords
+        source = self.source
+        pos = self.pos
+        line = self.line
+        final = self._final
+
+        while True:
+            fim = len(source)
+            for m in _PADRAO_MESTRE.finditer(source, pos):
+                inicio, fim_pulo = m.span(1)
+                if inicio != pos:
+                    break # Trecho não reconhecido em pos
+                if not final and m.end() == fim:
+                    break # O lexema pode continuar no próximo bloco
+                if fim_pulo != inicio:
+                    line += source.count('\n', inicio, fim_pulo)
+                pos = m.end()
+
+                grupo = m.lastindex
+                if grupo == _GRUPO_PALAVRA:
+                    lexema = m.group(grupo)
+                    if lexema[0] > 'z' and not lexema[0].isalpha():
+                        # \w aceita caracteres numéricos não decimais (ex.: '½'),
+                        # que o Tokenizer original não aceita como início de nome.
+                        self.source, self.line = source, line
+                        raise self._erro(fim_pulo)
+                    yield Token(keywords.get(lexema, TokenType.IDENTIFICADOR), lexema, line)
+                elif grupo == _GRUPO_OPERADOR:
+                    lexema = m.group(grupo)
+                    yield Token(OPERADORES[lexema], lexema, line)
+                elif grupo == _GRUPO_INTEIRO:
+                    yield Token(TokenType.NUMERO_INTEIRO, int(m.group(grupo)), line)
+                elif grupo == _GRUPO_REAL:
+                    yield Token(TokenType.NUMERO_REAL, float(m.group(grupo)), line)
+                else:
+                    lexema = m.group(grupo)
+                    line += lexema.count('\n')
+                    yield Token(TokenType.LITERAL_TEXTO, lexema[1:-1], line)
+
+            # Depois do último lexema completo só podem restar espaços e
+            # comentários, um trecho que continua no próximo bloco ou um erro.
+            pulo = _PADRAO_PULO.match(source, pos).end()
+            if not final:
+                if pulo == fim:
+                    # Tudo até a última quebra de linha já pode ser descartado:
+                    # comentários nunca atravessam uma quebra de linha.
+                    ultima_quebra = source.rfind('\n', pos, fim)
+                    if ultima_quebra != -1:
+                        line += source.count('\n', pos, ultima_quebra + 1)
+                        pos = ultima_quebra + 1
+                    incompleto = True
+                else:
+                    m = _PADRAO_MESTRE.match(source, pos)
+                    incompleto = source[pulo] == '"' or (m is not None and m.end() == fim)
+                if incompleto:
+                    bloco = next(self._blocos, None)
+                    if bloco is None:
+                        final = self._final = True
+                    else:
+                        source = self.source = source[pos:] + bloco
+                        pos = 0
+                    continue
+
+            self.source, self.line = source, line
+            if pulo != fim:
+                raise self._erro(pos)
+            break
+
+        self.line += source.count('\n', pos)
+        self.pos = len(source)
+        eof = Token(TokenType.EOF, None, self.line)
+        while True:
+            yield eof
+
+
+# Motores de varredura disponíveis, para permitir comparações lado a lado.
+MOTORES = {
+    "caractere": Tokenizer,
+    "regex": RegexTokenizer,
+}
+
+
+def criar_tokenizer(source_code, motor="regex"):
+    """Instancia o analisador léxico do motor escolhido ('regex' ou 'caractere')."""
+    try:
+        classe = MOTORES[motor]
+    except KeyError:
+        raise ValueError(f"Motor léxico desconhecido: '{motor}'. Opções: {', '.join(MOTORES)}")
+    return classe(source_code)
+
+
+# Tamanho padrão (em caracteres ou bytes) dos blocos lidos de arquivos.
+TAMANHO_BLOCO = 1 << 16
+
+
+def ler_blocos(fluxo, tamanho_bloco=TAMANHO_BLOCO, encoding="utf-8"):
+    """
+    Lê um fluxo em blocos de texto. Aceita arquivos de texto, arquivos
+    binários e objetos mmap; bytes são decodificados de forma incremental,
+    sem quebrar caracteres multibyte nem pares \\r\\n entre dois blocos.
+    """
+    decodificador = None
+    while True:
+        bloco = fluxo.read(tamanho_bloco)
+        if not bloco:
+            break
+        if not isinstance(bloco, str):
+            if decodificador is None:
+                decodificador = io.IncrementalNewlineDecoder(
+                    codecs.getincrementaldecoder(encoding)(), translate=True)
+            bloco = decodificador.decode(bloco)
+            if not bloco:
+                continue
+        yield bloco
+    if decodificador is not None:
+        resto = decodificador.decode(b"", final=True)
+        if resto:
+            yield resto
+
+
+def tokenize_stream(fluxo, motor="regex", tamanho_bloco=TAMANHO_BLOCO, encoding="utf-8"):
+    """
+    Gera os tokens (sem o EOF) de um fluxo lido em blocos. Com o motor
+    'regex' a memória usada não depende do tamanho do fluxo; o motor
+    'caractere' precisa do código inteiro e lê o fluxo todo antes.
+    """
+    blocos = ler_blocos(fluxo, tamanho_bloco, encoding)
+    if motor == "regex":
+        tokenizer = RegexTokenizer.de_blocos(blocos)
+    else:
+        tokenizer = criar_tokenizer("".join(blocos), motor)
+    return tokenizer.iter_tokens()
+
+
+def tokenize_file(caminho, motor="regex", tamanho_bloco=TAMANHO_BLOCO, usar_mmap=False, encoding="utf-8"):
+    """
+    Gera os tokens (sem o EOF) de um arquivo, lendo-o em blocos. Com
+    usar_mmap=True o arquivo é mapeado em memória em vez de lido por read().
+    """
+    if not usar_mmap:
+        with open(caminho, "r", encoding=encoding) as arquivo:
+            yield from tokenize_stream(arquivo, motor, tamanho_bloco, encoding)
+        return
+
+    with open(caminho, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            # mmap não aceita arquivos vazios
+            yield from tokenize_stream(arquivo, motor, tamanho_bloco, encoding)
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            yield from tokenize_stream(mapa, motor, tamanho_bloco, encoding)
+
 
 def lista_tokens(source_code):
 
@@ -269,61 +572,8 @@ def lista_tokens(source_code):
     
     token = tokenizer.obter_next_token()
 
-    # Mapeamento de tokens pontuação/operadores para usar o literal (caractere) em vez do nome
-    literal_tokens = {
-        TokenType.ATRIBUICAO,
-        TokenType.DOIS_PONTOS,
-        TokenType.PONTO_VIRGULA,
-        TokenType.VIRGULA,
-        TokenType.SOMA,
-        TokenType.SUBTRACAO,
-        TokenType.MULTIPLICACAO,
-        TokenType.DIVISAO,
-        TokenType.RESTO,
-        TokenType.IGUAL,
-        TokenType.MENOR,
-        TokenType.MAIOR,
-        TokenType.PARENTESE_ESQ,
-        TokenType.PARENTESE_DIR,
-    }
-
     while token.type != TokenType.EOF:
-        if token.type in literal_tokens:
-            classes_gram.append(str(token.literal))  # usa o caractere/literal do próprio token
-        else:
-            classes_gram.append(token.type.name.lower())  # usa o nome da classe gramatical
+        classes_gram.append(nome_terminal(token.type))
         token = tokenizer.obter_next_token()
     
     return " ".join(classes_gram)
-
-
-code = """
-    inicio
-        var inteiro: lado;
-        var texto: cor;
-
-        lado = 5;
-        cor_de_fundo "black";
-        definir_espessura 2;
-
-        // Laço para desenhar a espiral
-        repita 50 vezes
-            definir_cor "cyan"; // Muda a cor da linha a cada iteração
-            
-            avancar lado;
-            girar_direita 90;
-
-            lado = lado + 5;
-        fim_repita;
-    fim
-    """
-
-tokens = lista_tokens(code)
-
-print(tokens)
-
-
-
-
-
-
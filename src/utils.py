@@ -1,3 +1,9 @@
+import gc
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
 from typing import Dict, Any
 from typing import Dict, Any
 
@@ -59,8 +65,23 @@ class NodeVisitor:
     Uma classe base para percorrer uma Árvore Sintática Abstrata (AST).
     Utiliza o padrão de projeto Visitor, onde para cada tipo de nó na árvore,
     um método 'visit_TIPO_DO_NO' é chamado.
+
+    Aceita tanto a árvore de derivação do parser (dicionários, despachados
+    por node['tag']) quanto os nós de ast_nodes (despachados pelo nome da
+    classe, ex.: visit_Repeat).
+
+    Os métodos visit_* de cada subclasse são reunidos uma única vez, na
+    criação da classe, em _visitantes (tag -> função): visit não monta o
+    nome do método nem chama getattr a cada nó. Métodos acrescentados à
+    classe depois de criada não entram na tabela.
     """
-    def visit(self, node: Dict[str, Any]):
+    _visitantes: Dict[str, Any] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visitantes = tabela_de_despacho(cls, "visit_")
+
+    def visit(self, node):
         """
         Inicia a visita a um nó. Atua como um despachante que chama o método
         visitante específico para o tipo do nó.
@@ -68,14 +89,12 @@ class NodeVisitor:
         Por exemplo, se node['tag'] for 'Repita', este método tentará chamar
         self.visit_Repita(node).
         """
-        
-        method_name = f'visit_{node["tag"]}'
-        
-        visitor = getattr(self, method_name, self.generic_visit)
-        
-        return visitor(node)
+        visitor = self._visitantes.get(node["tag"] if isinstance(node, dict) else type(node).__name__)
+        if visitor is None:
+            return self.generic_visit(node)
+        return visitor(self, node)
 
-    def generic_visit(self, node: Dict[str, Any]):
+    def generic_visit(self, node):
         """
         Método chamado se nenhum método visitante específico for encontrado para um nó.
         A ação padrão é visitar todos os filhos do nó atual.
@@ -83,5 +102,112 @@ class NodeVisitor:
         # A implementação padrão de um nó genérico é visitar seus filhos.
         # Útil para nós estruturais como 'BlocoDeComandos' que não têm
         # lógica própria, mas contêm outros nós a serem processados.
-        for child_node in node.get('filhos', []):
-            self.visit(child_node)
+        #
+        # Descendentes sem visitante específico são percorridos com uma pilha
+        # explícita, e não por recursão: cadeias como CMDS -> CMD CMDS têm
+        # profundidade proporcional ao número de comandos.
+        iterativo = type(self).generic_visit is NodeVisitor.generic_visit
+        visitantes = self._visitantes
+        pendentes = list(_filhos(node))
+        pendentes.reverse()
+        while pendentes:
+            child_node = pendentes.pop()
+            if isinstance(child_node, dict):
+                tag = child_node["tag"]
+                visitor = visitantes.get(tag)
+                if visitor is None and iterativo and tag in ESTRUTURAIS:
+                    # Nós estruturais (S, B, CMDS, CMD) sem visitante: só os filhos
+                    filhos = child_node.get("filhos")
+                    if filhos:
+                        pendentes.extend(reversed(filhos))
+                    continue
+            else:
+                visitor = visitantes.get(type(child_node).__name__)
+            if visitor is not None:
+                visitor(self, child_node)
+            elif iterativo:
+                filhos = list(_filhos(child_node))
+                filhos.reverse()
+                pendentes.extend(filhos)
+            else:
+                self.generic_visit(child_node)
+
+
+# Não terminais da árvore de derivação que apenas agrupam comandos.
+ESTRUTURAIS = frozenset(("S", "B", "CMDS", "CMD"))
+
+
+def tabela_de_despacho(cls, prefixo):
+    """Métodos de cls cujo nome começa com prefixo, indexados pelo restante do nome."""
+    return {
+        nome[len(prefixo):]: getattr(cls, nome)
+        for nome in dir(cls) if nome.startswith(prefixo) and callable(getattr(cls, nome))
+    }
+
+
+def _filhos(node):
+    return node.get('filhos', []) if isinstance(node, dict) else node.iter_filhos()
+
+
+def escrever_atomicamente(caminho: str, dados) -> None:
+    """
+    Escreve dados (str ou bytes) em caminho de forma atômica: o conteúdo vai
+    para um arquivo temporário no mesmo diretório, que então substitui o
+    destino com os.replace. Leitores concorrentes nunca veem um arquivo pela
+    metade. O arquivo mantém as permissões do destino existente (ou 0644).
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix=".tmp")
+    try:
+        if isinstance(dados, bytes):
+            arquivo = os.fdopen(fd, "wb")
+        else:
+            arquivo = os.fdopen(fd, "w", encoding="utf-8")
+        with arquivo:
+            arquivo.write(dados)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        # mkstemp cria o temporário com modo 0600
+        try:
+            modo = stat.S_IMODE(os.stat(caminho).st_mode)
+        except FileNotFoundError:
+            modo = 0o644
+        os.chmod(temporario, modo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+# Blocos pausar_coletor em andamento e se o coletor estava ligado antes do primeiro.
+_trava_coletor = threading.Lock()
+_pausas = 0
+_religar_coletor = False
+
+
+@contextmanager
+def pausar_coletor():
+    """
+    Desliga o coletor de lixo cíclico dentro do bloco (e o religa ao sair,
+    se estava ligado). Para fases que só criam estruturas sem ciclos.
+
+    O coletor é global: com blocos simultâneos (em várias threads ou
+    aninhados), ele só é religado quando o último deles termina.
+    """
+    global _pausas, _religar_coletor
+    with _trava_coletor:
+        if _pausas == 0:
+            _religar_coletor = gc.isenabled()
+            gc.disable()
+        _pausas += 1
+    try:
+        yield
+    finally:
+        with _trava_coletor:
+            _pausas -= 1
+            if _pausas == 0 and _religar_coletor:
+                gc.enable()